@@ -0,0 +1,271 @@
+"""
+Masowy import i eksport danych (CSV / JSONL).
+
+Import czyta plik wiersz po wierszu, waliduje każdy wiersz schematem
+`*Create` i zapisuje partiami (executemany) w osobnych transakcjach.
+Błędne wiersze są raportowane z numerem i nie przerywają importu.
+Eksport strumieniuje wiersze z kursora bazy (yield_per), bez ładowania
+całej tabeli do pamięci.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.intervals import IntervalIndex, to_minutes
+from app.occupancy import occupancy
+from app.refdata import DATASETS, reference_cache
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("csv", "jsonl")
+
+ENTITIES = {
+    "subjects": (models.Subject, schemas.SubjectCreate),
+    "exams": (models.Exam, schemas.ExamCreate),
+    "rooms": (models.Room, schemas.RoomCreate),
+    "terms": (models.ExamTerm, schemas.ExamTermCreate),
+}
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """Format z parametru lub rozszerzenia pliku (.csv / .jsonl)"""
+    if fmt:
+        return fmt
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+# Parsowanie
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Zwraca (numer_wiersza, dane) dla kolejnych wierszy pliku.
+    Dane to dict lub wyjątek, jeśli wiersza nie da się sparsować.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for line_no, row in enumerate(csv.DictReader(text), start=2):
+            yield line_no, {k: (v if v != "" else None) for k, v in row.items()}
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+            continue
+        if not isinstance(row, dict):
+            yield line_no, ValueError("Wiersz musi być obiektem JSON")
+            continue
+        yield line_no, row
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Walidacja powiązań dla całej partii (jedno zapytanie na partię)
+class _Checker:
+    def __init__(self, db: Session, entity: str):
+        self.db = db
+        self.entity = entity
+        self.seen_rooms = set()
+        self.batch_rooms = IntervalIndex()
+        self.batch_cohort_days = set()
+        self.cohorts: Dict[int, tuple] = {}
+
+    def prepare(self, items: List[Tuple[int, dict]]) -> None:
+        if self.entity == "exams":
+            ids = {item["subject_id"] for _, item in items}
+            self.known = {
+                row.id for row in
+                self.db.query(models.Subject.id).filter(models.Subject.id.in_(ids))
+            }
+        elif self.entity == "rooms":
+            names = {item["nazwa"] for _, item in items}
+            self.known = {
+                row.nazwa for row in
+                self.db.query(models.Room.nazwa).filter(models.Room.nazwa.in_(names))
+            }
+        elif self.entity == "terms":
+            occupancy.ensure_loaded(self.db)
+            ids = {item["exam_id"] for _, item in items}
+            rows = (
+                self.db.query(
+                    models.Exam.id,
+                    models.Subject.kierunek,
+                    models.Subject.typ_studiow,
+                    models.Subject.rok
+                )
+                .join(models.Subject)
+                .filter(models.Exam.id.in_(ids))
+            )
+            self.cohorts = {row.id: (row.kierunek, row.typ_studiow, row.rok) for row in rows}
+
+    def check(self, item: dict) -> Optional[str]:
+        if self.entity == "exams" and item["subject_id"] not in self.known:
+            return f"Przedmiot {item['subject_id']} nie istnieje"
+
+        if self.entity == "rooms":
+            if item["nazwa"] in self.known or item["nazwa"] in self.seen_rooms:
+                return f"Sala '{item['nazwa']}' już istnieje"
+            self.seen_rooms.add(item["nazwa"])
+
+        if self.entity == "terms":
+            cohort = self.cohorts.get(item["exam_id"])
+            if cohort is None:
+                return f"Egzamin {item['exam_id']} nie istnieje"
+            start = to_minutes(item["godzina"])
+            end = start + item["czas_trwania"]
+            room_key = (item["data"], item["sala"])
+            if self.batch_rooms.overlapping(room_key, start, end) or not crud.check_room_availability(
+                self.db, item["data"], item["godzina"], item["sala"], czas_trwania=item["czas_trwania"]
+            ):
+                return f"Sala {item['sala']} jest już zajęta w dniu {item['data']} o godzinie {item['godzina']}"
+            cohort_day = (item["data"], *cohort)
+            if cohort_day in self.batch_cohort_days or not crud.check_student_availability(
+                self.db, item["data"], *cohort
+            ):
+                return f"Studenci {cohort[0]} (rok {cohort[2]}) mają już egzamin w dniu {item['data']}"
+            self.batch_rooms.add(room_key, start, end, 0)
+            self.batch_cohort_days.add(cohort_day)
+
+        return None
+
+
+def _format_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
+def _insert_batch(db: Session, model, items: List[Tuple[int, dict]], report: dict) -> List[int]:
+    """
+    Wstawia partię jednym executemany. Jeśli baza odrzuci partię (np. naruszenie
+    ograniczenia), wiersze wstawiane są pojedynczo, żeby wskazać błędne.
+    Zwraca id wstawionych wierszy. Terminy zapisuje crud.import_exam_terms.
+    """
+    try:
+        with db.begin_nested():
+            result = db.execute(
+                insert(model).returning(model.id), [item for _, item in items]
+            )
+            ids = list(result.scalars())
+        report["inserted"] += len(items)
+        return ids
+    except IntegrityError:
+        pass
+
+    ids = []
+    for line_no, item in items:
+        try:
+            with db.begin_nested():
+                ids.append(db.execute(insert(model).returning(model.id), item).scalar_one())
+            report["inserted"] += 1
+        except IntegrityError as e:
+            _add_error(report, line_no, str(e.orig))
+    return ids
+
+
+def _add_error(report: dict, line_no: int, message: str) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": line_no, "error": message})
+
+
+def import_rows(db: Session, entity: str, stream: IO[bytes], fmt: str) -> dict:
+    """Importuje plik CSV/JSONL partiami; zwraca raport z błędami per wiersz"""
+    model, schema = ENTITIES[entity]
+    report = {"entity": entity, "inserted": 0, "failed": 0, "errors": []}
+    checker = _Checker(db, entity)
+
+    for batch in _batches(iter_rows(stream, fmt), BATCH_SIZE):
+        valid = []
+        for line_no, row in batch:
+            if isinstance(row, Exception):
+                _add_error(report, line_no, f"Nieprawidłowy wiersz: {row}")
+                continue
+            try:
+                valid.append((line_no, schema(**row).dict()))
+            except (ValidationError, TypeError) as e:
+                _add_error(report, line_no, _format_error(e))
+
+        checker.prepare(valid)
+        accepted = []
+        for line_no, item in valid:
+            error = checker.check(item)
+            if error:
+                _add_error(report, line_no, error)
+            else:
+                accepted.append((line_no, item))
+
+        if accepted and entity == "terms":
+            # Kolizje sprawdzone wyżej w pamięci; crud powtarza je w bazie pod blokadą zapisu
+            ids, errors = crud.import_exam_terms(db, accepted)
+            report["inserted"] += len(ids)
+            for line_no, message in errors:
+                _add_error(report, line_no, message)
+        elif accepted:
+            _insert_batch(db, model, accepted, report)
+            db.commit()
+            if entity in DATASETS:
+                reference_cache.invalidate(entity)
+
+    report["errors"].sort(key=lambda e: e["row"])
+    return report
+
+
+# Eksport
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_rows(db: Session, entity: str, fmt: str) -> Iterator[str]:
+    """Generator kolejnych fragmentów pliku CSV/JSONL z całą tabelą"""
+    model, _ = ENTITIES[entity]
+    fields = crud.model_fields(model)
+    columns = [getattr(model, f) for f in fields]
+    rows = db.query(*columns).order_by(model.id).yield_per(BATCH_SIZE)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for batch in _batches(rows, BATCH_SIZE):
+            for row in batch:
+                writer.writerow(["" if v is None else _plain(v) for v in row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    for batch in _batches(rows, BATCH_SIZE):
+        yield "".join(
+            json.dumps(dict(zip(fields, map(_plain, row))), ensure_ascii=False) + "\n"
+            for row in batch
+        )
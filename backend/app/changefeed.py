@@ -0,0 +1,161 @@
+"""
+Strumień zmian terminów egzaminów (Server-Sent Events).
+
+Zdarzenia czytane są z bazy, więc widać w nich zapisy wszystkich instancji
+backendu: terminy o row_version wyższym od ostatnio wysłanego (created /
+approved / rejected / updated z pełnym terminem) i usunięte terminy
+z exam_term_tombstones (deleted z id). Identyfikator zdarzenia to wersja
+terminów (change_counters) - klient po zerwaniu połączenia wznawia strumień
+od swojej wersji na dowolnej instancji (nagłówek Last-Event-ID lub parametr
+since). Zmiany tej samej wersji wysyłane są razem, a identyfikator niesie
+dopiero ostatnie z nich. Gdy brakujących zmian jest więcej niż MAX_EVENTS
+(albo identyfikator jest nieznany), klient dostaje zdarzenie "reset"
+i powinien pobrać listę terminów od nowa.
+
+Zapisy w tym procesie budzą subskrybentów od razu (notify po commicie); zapisy
+innych instancji wykrywa jedno na proces odpytywanie licznika wersji co
+CHANGES_POLL_SECONDS sekund.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app import models, schemas
+
+logger = logging.getLogger("app.changefeed")
+
+MAX_EVENTS = 10000
+KEEPALIVE_SECONDS = 15
+POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "2"))
+
+# (since, limit) -> {"version", "changed": terminy ORM, "deleted": [(term_id, row_version)]}
+FetchChanges = Callable[[int, int], Awaitable[dict]]
+ReadVersion = Callable[[], Awaitable[int]]
+TermEvent = Tuple[int, int, str, dict]  # (row_version, id terminu, zdarzenie, dane)
+
+
+def event_type(term: models.ExamTerm) -> str:
+    # Nowy termin ma created_at równe updated_at (crud._stamp_terms)
+    if term.created_at == term.updated_at:
+        return "created"
+    if term.status == models.TermStatus.APPROVED:
+        return "approved"
+    if term.status == models.TermStatus.REJECTED:
+        return "rejected"
+    return "updated"
+
+
+def format_event(event_id: Optional[int], event: str, data) -> str:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {payload}\n\n"
+
+
+def parse_id(last_event_id: Optional[str]) -> Optional[int]:
+    """Wersja z identyfikatora zdarzenia; None gdy to nie jest wersja"""
+    if last_event_id is None or not last_event_id.isdigit():
+        return None
+    return int(last_event_id)
+
+
+def term_events(changes: dict) -> List[TermEvent]:
+    """Zdarzenia zmian do wersji changes["version"] posortowane po (row_version, id)"""
+    version = changes["version"]
+    events = [
+        (term.row_version, term.id, event_type(term),
+         jsonable_encoder(schemas.ExamTermResponse.model_validate(term)))
+        for term in changes["changed"]
+        # Wiersze nowsze niż odczytany licznik przyjdą przy następnym odczycie
+        if term.row_version <= version
+    ]
+    events.extend(
+        (row_version, term_id, "deleted", {"id": term_id})
+        for term_id, row_version in changes["deleted"]
+    )
+    return sorted(events, key=lambda e: e[:2])
+
+
+class ChangeFeed:
+    def __init__(self, poll_seconds: float = POLL_SECONDS):
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._poller: Optional[asyncio.Task] = None
+        self.poll_seconds = poll_seconds
+
+    def notify(self) -> None:
+        """Budzi subskrybentów po zapisie terminów (wywoływane po commicie, z dowolnego wątku)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, wakeup in subscribers:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _poll(self, read_version: ReadVersion, version: int) -> None:
+        """Budzi subskrybentów, gdy licznik wersji zmieni się w bazie (zapisy innych instancji)"""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                current = await read_version()
+            except Exception:
+                logger.exception("Odczyt wersji terminów dla strumienia zmian nie powiódł się")
+                continue
+            if current != version:
+                version = current
+                self.notify()
+
+    def _subscribe(self, wakeup: asyncio.Event, read_version: ReadVersion, version: int) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.append((loop, wakeup))
+            if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+                self._poller = loop.create_task(self._poll(read_version, version))
+
+    def _unsubscribe(self, wakeup: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.remove((loop, wakeup))
+            if not self._subscribers and self._poller is not None and self._poller.get_loop() is loop:
+                self._poller.cancel()
+                self._poller = None
+
+    async def stream(
+        self, last_event_id: Optional[str], fetch: FetchChanges, read_version: ReadVersion
+    ) -> AsyncIterator[str]:
+        """Generator SSE: zaległe zmiany od last_event_id, potem nowe na bieżąco"""
+        wakeup = asyncio.Event()
+        current = await read_version()
+        self._subscribe(wakeup, read_version, current)
+        try:
+            seq = parse_id(last_event_id) if last_event_id else current
+            if seq is None or seq > current:
+                yield format_event(current, "reset", {})
+                seq = current
+            # Klient zna bieżącą wersję jeszcze przed pierwszą zmianą
+            yield f"retry: 3000\nid: {seq}\n\n"
+
+            while True:
+                wakeup.clear()
+                changes = await fetch(seq, MAX_EVENTS + 1)
+                if len(changes["changed"]) + len(changes["deleted"]) > MAX_EVENTS:
+                    seq = changes["version"]
+                    yield format_event(seq, "reset", {})
+                else:
+                    events = term_events(changes)
+                    for i, (row_version, _, event, data) in enumerate(events):
+                        last = i + 1 == len(events) or events[i + 1][0] != row_version
+                        yield format_event(row_version if last else None, event, data)
+                    seq = max(seq, changes["version"])
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self._unsubscribe(wakeup)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,150 @@
+"""
+Negocjowana kompresja odpowiedzi (gzip, brotli) - czyste ASGI.
+
+Kodowanie wybierane jest z nagłówka Accept-Encoding (wagi q; przy równych
+wagach brotli przed gzip), a brotli dostępne jest tylko z zainstalowanym
+pakietem brotli. Kompresowane są typy tekstowe (JSON, CSV, JSONL) o rozmiarze
+co najmniej COMPRESSION_MIN_SIZE bajtów - mniejsze odpowiedzi idą bez zmian,
+bo nagłówki i ramka kompresji zjadłyby zysk. Strumienie (StreamingResponse)
+kompresowane są na bieżąco: każda część ciała jest od razu opróżniana
+z kompresora (sync flush), więc klient dostaje dane w miarę ich powstawania.
+Server-Sent Events nie są kompresowane.
+"""
+import os
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # opcjonalna zależność - tylko gzip
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+def available_encodings() -> list:
+    """Obsługiwane kodowania w kolejności preferencji serwera"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def choose_encoding(accept_encoding: str, encodings: Optional[list] = None) -> Optional[str]:
+    """Kodowanie o najwyższej wadze q z Accept-Encoding (None = bez kompresji)"""
+    encodings = available_encodings() if encodings is None else encodings
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name, q = name.strip().lower(), 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Kompresuje część ciała i opróżnia kompresor (klient może ją od razu zdekodować)"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None        # wstrzymany http.response.start
+        buffer = b""        # ciało zbierane do progu minimum_size
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_start(compress: bool, length: Optional[int] = None):
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if compress:
+                headers["Content-Encoding"] = encoding
+                if length is None:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(length)
+            await send(start)
+
+        async def send_wrapper(message):
+            nonlocal start, buffer, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not _compressible(Headers(raw=message["headers"]))
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if compressor is not None:
+                # Strumień już kompresowany
+                data = compressor.compress(body) if more_body else compressor.finish(body)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            buffer += body
+            if not more_body and len(buffer) < self.minimum_size:
+                await send_start(compress=False)
+                await send({"type": "http.response.body", "body": buffer})
+            elif not more_body:
+                data = _Compressor(encoding).finish(buffer)
+                await send_start(compress=True, length=len(data))
+                await send({"type": "http.response.body", "body": data})
+            elif len(buffer) >= self.minimum_size:
+                compressor = _Compressor(encoding)
+                await send_start(compress=True)
+                await send({"type": "http.response.body", "body": compressor.compress(buffer), "more_body": True})
+            else:
+                return
+            buffer = b""
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,12 +1,81 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
-from typing import List, Optional
+from sqlalchemy import DateTime, Select, and_, delete, func, insert, literal, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, contains_eager, joinedload
+from app import models, schemas, serialization
+from app.changefeed import change_feed
+from app.intervals import DEFAULT_DURATION, IntervalIndex
+from app.occupancy import occupancy
+from app.refdata import reference_cache
+from app.sessions import session_calendar
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime
+import threading
+
+
+# Paginacja i projekcja
+#
+# Zapytania list budowane są jako obiekty select() (funkcje *_query), dzięki
+# czemu te same zapytania wykonuje sesja synchroniczna (tutaj) i asynchroniczna
+# (app.crud_async).
+def model_fields(model) -> List[str]:
+    """Nazwy kolumn modelu dostępne w projekcji fields="""
+    return [column.key for column in model.__table__.columns]
+
+
+def _paginate(
+    query: Select,
+    keys: Sequence,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Sortowanie po kluczu i paginacja keyset (WHERE klucz > kursor)"""
+    if after is not None:
+        if len(keys) == 1:
+            query = query.filter(keys[0] > after[0])
+        else:
+            query = query.filter(tuple_(*keys) > tuple_(*after))
+    query = query.order_by(*keys)
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def _project(query: Select, model, fields: List[str], keys: Sequence) -> Select:
+    """Pobiera tylko wybrane kolumny (plus kolumny klucza kursora)"""
+    columns = [getattr(model, f) for f in fields]
+    extra = [k for k in keys if k.key not in fields]
+    return query.with_only_columns(*columns, *extra)
+
+
+def _fetch(db: Session, query: Select, fields: Optional[List[str]] = None) -> list:
+    """Obiekty ORM albo - przy projekcji - wiersze z wybranymi kolumnami"""
+    if fields:
+        return db.execute(query).all()
+    return db.scalars(query).all()
 
 
 # Demo Users
-def get_demo_users(db: Session) -> List[models.DemoUser]:
-    return db.query(models.DemoUser).all()
+DEMO_USER_KEYS = (models.DemoUser.id,)
+
+
+def demo_users_query(
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Select:
+    query = select(models.DemoUser)
+    if fields:
+        query = _project(query, models.DemoUser, fields, DEMO_USER_KEYS)
+    return _paginate(query, DEMO_USER_KEYS, after, limit)
+
+
+def get_demo_users(
+    db: Session,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.DemoUser]:
+    return _fetch(db, demo_users_query(after, limit, fields), fields)
 
 
 # Subjects
@@ -15,23 +84,44 @@ def create_subject(db: Session, subject: schemas.SubjectCreate) -> models.Subjec
     db.add(db_subject)
     db.commit()
     db.refresh(db_subject)
+    reference_cache.invalidate("subjects")
     return db_subject
 
 
-def get_subjects(
-    db: Session, 
+SUBJECT_KEYS = (models.Subject.id,)
+
+
+def subjects_query(
     kierunek: Optional[str] = None,
     typ_studiow: Optional[models.TypStudiow] = None,
-    rok: Optional[int] = None
-) -> List[models.Subject]:
-    query = db.query(models.Subject)
+    rok: Optional[int] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Select:
+    query = select(models.Subject)
     if kierunek:
         query = query.filter(models.Subject.kierunek == kierunek)
     if typ_studiow:
         query = query.filter(models.Subject.typ_studiow == typ_studiow)
     if rok:
         query = query.filter(models.Subject.rok == rok)
-    return query.all()
+    if fields:
+        query = _project(query, models.Subject, fields, SUBJECT_KEYS)
+    return _paginate(query, SUBJECT_KEYS, after, limit)
+
+
+def get_subjects(
+    db: Session, 
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Subject]:
+    query = subjects_query(kierunek, typ_studiow, rok, after, limit, fields)
+    return _fetch(db, query, fields)
 
 
 # Exams
@@ -43,15 +133,17 @@ def create_exam(db: Session, exam: schemas.ExamCreate) -> models.Exam:
     return db_exam
 
 
-def get_exams(
-    db: Session,
+EXAM_KEYS = (models.Exam.id,)
+
+
+def _filter_exams(
+    query: Select,
     kierunek: Optional[str] = None,
     typ_studiow: Optional[models.TypStudiow] = None,
     rok: Optional[int] = None,
     prowadzacy_name: Optional[str] = None
-) -> List[models.Exam]:
-    query = db.query(models.Exam).join(models.Subject)
-    
+) -> Select:
+    """Filtry list egzaminów (zapytanie musi mieć join Subject)"""
     if kierunek:
         query = query.filter(models.Subject.kierunek == kierunek)
     if typ_studiow:
@@ -60,32 +152,289 @@ def get_exams(
         query = query.filter(models.Subject.rok == rok)
     if prowadzacy_name:
         query = query.filter(models.Exam.prowadzacy_name == prowadzacy_name)
+    return query
+
+
+def exams_query(
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    prowadzacy_name: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Select:
+    query = select(models.Exam).join(models.Subject)
+    query = _filter_exams(query, kierunek, typ_studiow, rok, prowadzacy_name)
     
-    return query.all()
+    if fields:
+        query = _project(query, models.Exam, fields, EXAM_KEYS)
+    else:
+        # Przedmiot jest już w JOIN-ie - ładujemy go z tego samego zapytania (bez N+1)
+        query = query.options(contains_eager(models.Exam.subject))
+    return _paginate(query, EXAM_KEYS, after, limit)
+
+
+def exam_rows_query(
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    prowadzacy_name: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Jak exams_query, ale płaskie krotki kolumn egzaminu i przedmiotu (app.serialization)"""
+    query = select(*serialization.EXAM_COLUMNS).select_from(models.Exam).join(models.Subject)
+    query = _filter_exams(query, kierunek, typ_studiow, rok, prowadzacy_name)
+    return _paginate(query, EXAM_KEYS, after, limit)
+
+
+def get_exams(
+    db: Session,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    prowadzacy_name: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Exam]:
+    query = exams_query(kierunek, typ_studiow, rok, prowadzacy_name, after, limit, fields)
+    return _fetch(db, query, fields)
+
+
+def get_unscheduled_exams(
+    db: Session, exam_ids: Optional[List[int]] = None
+) -> List[models.Exam]:
+    """Egzaminy bez żadnego terminu, który nie został odrzucony"""
+    scheduled = db.query(models.ExamTerm.exam_id).filter(
+        models.ExamTerm.status != models.TermStatus.REJECTED
+    )
+    query = (
+        db.query(models.Exam)
+        .options(joinedload(models.Exam.subject))
+        .filter(models.Exam.id.not_in(scheduled))
+    )
+    if exam_ids is not None:
+        query = query.filter(models.Exam.id.in_(exam_ids))
+    return query.order_by(models.Exam.id).all()
+
+
+def exam_query(exam_id: int) -> Select:
+    return (
+        select(models.Exam)
+        .options(joinedload(models.Exam.subject))
+        .where(models.Exam.id == exam_id)
+    )
 
 
 def get_exam(db: Session, exam_id: int) -> Optional[models.Exam]:
-    return db.query(models.Exam).filter(models.Exam.id == exam_id).first()
+    return db.scalars(exam_query(exam_id)).first()
+
+
+# Wersje wierszy terminów (synchronizacja przyrostowa)
+TERM_VERSION_COUNTER = models.TERM_VERSION_COUNTER
+ROW_VERSION_HEADER = "X-Row-Version"
+
+
+def next_term_version(db: Session) -> int:
+    """
+    Kolejny numer zmiany terminów. UPDATE blokuje licznik do końca transakcji,
+    więc wersje rosną w kolejności commitów (żaden klient nie pominie zmiany).
+    """
+    counter = models.ChangeCounter
+    return db.execute(
+        update(counter)
+        .where(counter.name == TERM_VERSION_COUNTER)
+        .values(value=counter.value + 1)
+        .returning(counter.value)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+def term_version_query() -> Select:
+    counter = models.ChangeCounter
+    return select(counter.value).where(counter.name == TERM_VERSION_COUNTER)
+
+
+def _stamp_terms(db: Session, terms: List[models.ExamTerm], created: bool = False) -> None:
+    """Nowa wersja wiersza; nowe terminy (created) dostają created_at równe updated_at"""
+    version = next_term_version(db)
+    now = datetime.utcnow()
+    for term in terms:
+        term.row_version = version
+        term.updated_at = now
+        if created:
+            term.created_at = now
 
 
 # Exam Terms
+#
+# Walidacja w routerze (indeks zajętości w pamięci) to szybka ścieżka, ale
+# sprawdzenie i zapis to osobne kroki - dwie równoległe propozycje tej samej
+# sali mogłyby obie przejść walidację. Dlatego zapis nowych terminów:
+# 1. podbija licznik wersji (next_term_version) - UPDATE blokuje wiersz licznika
+#    do commita, więc zapisy terminów w bazie (także z innych instancji
+#    backendu) wykonują się po kolei,
+# 2. wstawia terminy i sprawdza kolizje zapytaniem do bazy w tej samej
+#    transakcji - widzi wszystkie wcześniej zatwierdzone zapisy,
+# 3. przy kolizji wycofuje transakcję (TermConflict).
+# Unikalny indeks uq_exam_terms_room_slot jest dodatkowym zabezpieczeniem
+# w bazie dla tej samej sali, dnia i godziny.
+# Blokada w procesie ustawia wątki w kolejce przed bazą, zamiast kazać im
+# czekać na blokadę SQLite (busy_timeout) przy serii równoległych propozycji.
+_term_write_lock = threading.Lock()
+
+
+class TermConflict(Exception):
+    """Nowy (lub przywrócony) termin koliduje z terminem zapisanym w międzyczasie"""
+
+
+def room_slot_violation(error: IntegrityError) -> bool:
+    """Czy IntegrityError to naruszenie uq_exam_terms_room_slot (sala zajęta przez inny egzamin)"""
+    message = str(error.orig)
+    if "uq_exam_terms_room_slot" in message:  # PostgreSQL podaje nazwę indeksu
+        return True
+    # SQLite podaje kolumny; uq_exam_terms_exam_slot zawiera dodatkowo exam_id
+    return (
+        "exam_terms.data, exam_terms.godzina, exam_terms.sala" in message
+        and "exam_terms.exam_id" not in message
+    )
+
+
+def _term_conflict(db: Session, term_ids: List[int]) -> Optional[str]:
+    """Opis pierwszej kolizji wstawionych terminów z innymi nieodrzuconymi terminami"""
+    new, other = aliased(models.ExamTerm), aliased(models.ExamTerm)
+    active = and_(
+        other.id != new.id,
+        other.data == new.data,
+        other.status != models.TermStatus.REJECTED,
+    )
+    room = db.execute(
+        select(new.data, new.godzina, new.sala)
+        .join(other, and_(
+            active,
+            other.sala == new.sala,
+            other.start_min < new.end_min,
+            other.end_min > new.start_min,
+        ))
+        .where(new.id.in_(term_ids))
+        .limit(1)
+    ).first()
+    if room is not None:
+        return f"Sala {room.sala} jest już zajęta w dniu {room.data} o godzinie {room.godzina}"
+
+    new_exam, other_exam = aliased(models.Exam), aliased(models.Exam)
+    new_subject, other_subject = aliased(models.Subject), aliased(models.Subject)
+    cohort = db.execute(
+        select(new.data, new_subject.kierunek, new_subject.typ_studiow, new_subject.rok)
+        .join(new_exam, new.exam_id == new_exam.id)
+        .join(new_subject, new_exam.subject_id == new_subject.id)
+        .join(other, active)
+        .join(other_exam, other.exam_id == other_exam.id)
+        .join(other_subject, and_(
+            other_exam.subject_id == other_subject.id,
+            other_subject.kierunek == new_subject.kierunek,
+            other_subject.typ_studiow == new_subject.typ_studiow,
+            other_subject.rok == new_subject.rok,
+        ))
+        .where(new.id.in_(term_ids))
+        .limit(1)
+    ).first()
+    if cohort is not None:
+        return (
+            f"Studenci {cohort.kierunek} ({cohort.typ_studiow.value}, rok {cohort.rok}) "
+            f"mają już egzamin w dniu {cohort.data}"
+        )
+    return None
+
+
+def _insert_terms(db: Session, db_terms: List[models.ExamTerm]) -> List[int]:
+    """Wstawia terminy i zatwierdza transakcję, jeśli nie kolidują (TermConflict)"""
+    _stamp_terms(db, db_terms, created=True)
+    db.add_all(db_terms)
+    db.flush()
+    term_ids = [t.id for t in db_terms]
+    conflict = _term_conflict(db, term_ids)
+    if conflict is not None:
+        db.rollback()
+        raise TermConflict(conflict)
+    db.commit()
+    return term_ids
+
+
 def create_exam_term(db: Session, term: schemas.ExamTermCreate) -> models.ExamTerm:
     db_term = models.ExamTerm(**term.dict())
-    db.add(db_term)
-    db.commit()
-    db.refresh(db_term)
+    with _term_write_lock:
+        _insert_terms(db, [db_term])
+        db.refresh(db_term)
+        occupancy.apply(db_term)
+    change_feed.notify()
     return db_term
 
 
-def get_exam_terms(
-    db: Session,
+def create_exam_terms(db: Session, terms: List[schemas.ExamTermCreate]) -> List[int]:
+    """Tworzy wiele terminów w jednej transakcji; zwraca ich id"""
+    db_terms = [models.ExamTerm(**term.dict()) for term in terms]
+    with _term_write_lock:
+        term_ids = _insert_terms(db, db_terms)
+        occupancy.apply_many(db, term_ids)
+    change_feed.notify()
+    return term_ids
+
+
+def import_exam_terms(db: Session, items: List[Tuple[int, dict]]) -> Tuple[List[int], List[Tuple[int, str]]]:
+    """
+    Zapisuje partię terminów z importu masowego (app.bulk) z tą samą gwarancją co
+    create_exam_terms: pod _term_write_lock, z kolizjami sprawdzanymi w bazie po
+    wstawieniu. Jeśli partia koliduje lub narusza ograniczenie, terminy wstawiane są
+    pojedynczo, a błędne pomijane. Zatwierdza transakcję; zwraca id wstawionych
+    terminów i błędy (numer wiersza, opis).
+    """
+    statement = insert(models.ExamTerm).returning(models.ExamTerm.id)
+    with _term_write_lock:
+        now = datetime.utcnow()
+        stamp = {"row_version": next_term_version(db), "created_at": now, "updated_at": now}
+        rows = [(line_no, {**item, **stamp}) for line_no, item in items]
+        try:
+            with db.begin_nested():
+                term_ids = list(db.execute(statement, [row for _, row in rows]).scalars())
+                conflict = _term_conflict(db, term_ids)
+                if conflict is not None:
+                    raise TermConflict(conflict)
+            errors = []
+        except (IntegrityError, TermConflict):
+            term_ids, errors = [], []
+            for line_no, row in rows:
+                try:
+                    with db.begin_nested():
+                        term_id = db.execute(statement, row).scalar_one()
+                        conflict = _term_conflict(db, [term_id])
+                        if conflict is not None:
+                            raise TermConflict(conflict)
+                    term_ids.append(term_id)
+                except IntegrityError as e:
+                    errors.append((line_no, str(e.orig)))
+                except TermConflict as e:
+                    errors.append((line_no, str(e)))
+        db.commit()
+        occupancy.apply_many(db, term_ids)
+    if term_ids:
+        change_feed.notify()
+    return term_ids, errors
+
+
+EXAM_TERM_KEYS = (models.ExamTerm.data, models.ExamTerm.godzina, models.ExamTerm.id)
+
+
+def _filter_terms(
+    query: Select,
     kierunek: Optional[str] = None,
     typ_studiow: Optional[models.TypStudiow] = None,
     rok: Optional[int] = None,
     status: Optional[models.TermStatus] = None
-) -> List[models.ExamTerm]:
-    query = db.query(models.ExamTerm).join(models.Exam).join(models.Subject)
-    
+) -> Select:
+    """Filtry list terminów (zapytanie musi mieć join Exam i Subject)"""
     if kierunek:
         query = query.filter(models.Subject.kierunek == kierunek)
     if typ_studiow:
@@ -94,12 +443,120 @@ def get_exam_terms(
         query = query.filter(models.Subject.rok == rok)
     if status:
         query = query.filter(models.ExamTerm.status == status)
+    return query
+
+
+def exam_terms_query(
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Select:
+    query = select(models.ExamTerm).join(models.Exam).join(models.Subject)
+    query = _filter_terms(query, kierunek, typ_studiow, rok, status)
     
-    return query.order_by(models.ExamTerm.data, models.ExamTerm.godzina).all()
+    if fields:
+        query = _project(query, models.ExamTerm, fields, EXAM_TERM_KEYS)
+    else:
+        # Cały graf Term -> Exam -> Subject w jednym zapytaniu (bez N+1 przy serializacji)
+        query = query.options(
+            contains_eager(models.ExamTerm.exam).contains_eager(models.Exam.subject)
+        )
+    return _paginate(query, EXAM_TERM_KEYS, after, limit)
+
+
+def exam_term_rows_query(
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Jak exam_terms_query, ale płaskie krotki kolumn terminu, egzaminu i przedmiotu (app.serialization)"""
+    query = (
+        select(*serialization.EXAM_TERM_COLUMNS)
+        .select_from(models.ExamTerm).join(models.Exam).join(models.Subject)
+    )
+    query = _filter_terms(query, kierunek, typ_studiow, rok, status)
+    return _paginate(query, EXAM_TERM_KEYS, after, limit)
+
+
+def get_exam_terms(
+    db: Session,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.ExamTerm]:
+    query = exam_terms_query(kierunek, typ_studiow, rok, status, after, limit, fields)
+    return _fetch(db, query, fields)
+
+
+TERM_CHANGE_KEYS = (models.ExamTerm.row_version, models.ExamTerm.id)
+
+
+def exam_term_changes_query(
+    since: int,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Terminy zmienione po wersji since, posortowane po (row_version, id)"""
+    query = exam_terms_query(kierunek, typ_studiow, rok, status).order_by(None)
+    query = query.filter(models.ExamTerm.row_version > since)
+    return _paginate(query, TERM_CHANGE_KEYS, after, limit)
+
+
+def timetable_query(
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None
+) -> Select:
+    """Płaskie wiersze terminów z danymi egzaminu i przedmiotu dla app.timetable"""
+    term, exam, subject = models.ExamTerm, models.Exam, models.Subject
+    query = (
+        select(
+            term.id, term.data, term.godzina, term.sala, term.status, term.exam_id,
+            term.proposed_by_name,
+            exam.prowadzacy_name, subject.nazwa, subject.kierunek, subject.typ_studiow, subject.rok
+        )
+        .join(exam, term.exam_id == exam.id)
+        .join(subject, exam.subject_id == subject.id)
+    )
+    return _filter_terms(query, kierunek, typ_studiow, rok, status).order_by(*EXAM_TERM_KEYS)
+
+
+def term_tombstones_query(since: int, until: int) -> Select:
+    """Usunięte terminy (term_id, row_version) z wersji w przedziale (since, until]"""
+    tombstone = models.ExamTermTombstone
+    return (
+        select(tombstone.term_id, tombstone.row_version)
+        .where(tombstone.row_version > since, tombstone.row_version <= until)
+        .order_by(tombstone.term_id)
+    )
+
+
+def exam_term_query(term_id: int) -> Select:
+    return (
+        select(models.ExamTerm)
+        .options(joinedload(models.ExamTerm.exam).joinedload(models.Exam.subject))
+        .where(models.ExamTerm.id == term_id)
+    )
 
 
 def get_exam_term(db: Session, term_id: int) -> Optional[models.ExamTerm]:
-    return db.query(models.ExamTerm).filter(models.ExamTerm.id == term_id).first()
+    return db.scalars(exam_term_query(term_id)).first()
 
 
 def update_exam_term(
@@ -109,86 +566,251 @@ def update_exam_term(
 ) -> Optional[models.ExamTerm]:
     db_term = get_exam_term(db, term_id)
     if db_term:
-        db_term.approved_by_role = approval.approved_by_role
-        db_term.approved_by_name = approval.approved_by_name
-        db_term.status = approval.status
-        db.commit()
-        db.refresh(db_term)
+        # Przywrócony odrzucony termin znów zajmuje salę i rocznik - sprawdzamy
+        # kolizje w bazie jak przy tworzeniu (TermConflict)
+        reopened = (
+            db_term.status == models.TermStatus.REJECTED
+            and approval.status != models.TermStatus.REJECTED
+        )
+        with _term_write_lock:
+            db_term.approved_by_role = approval.approved_by_role
+            db_term.approved_by_name = approval.approved_by_name
+            db_term.status = approval.status
+            _stamp_terms(db, [db_term])
+            if reopened:
+                db.flush()
+                conflict = _term_conflict(db, [term_id])
+                if conflict is not None:
+                    db.rollback()
+                    raise TermConflict(conflict)
+            db.commit()
+            db.refresh(db_term)
+            occupancy.apply(db_term)
+        change_feed.notify()
     return db_term
 
 
+def _decision_terms_query() -> Select:
+    term, subject = models.ExamTerm, models.Subject
+    return (
+        select(
+            term.id, term.status, term.data, term.godzina, term.sala, term.start_min, term.end_min,
+            subject.kierunek, subject.typ_studiow, subject.rok
+        )
+        .join(models.Exam, term.exam_id == models.Exam.id)
+        .join(subject, models.Exam.subject_id == subject.id)
+    )
+
+
+def _cohort_key(row) -> tuple:
+    return row.data, row.kierunek, row.typ_studiow, row.rok
+
+
+def _room_taken(rooms: IntervalIndex, row) -> bool:
+    return bool(rooms.overlapping((row.data, row.sala), row.start_min, row.end_min))
+
+
+def _take_room(rooms: IntervalIndex, row) -> None:
+    rooms.add((row.data, row.sala), row.start_min, row.end_min, row.id)
+
+
+def bulk_update_exam_terms(db: Session, request: schemas.ExamTermBulkApprove) -> dict:
+    """
+    Zatwierdza/odrzuca wiele terminów w jednej transakcji (jeden UPDATE na status).
+
+    Zatwierdzane terminy sprawdzane są razem: żadne dwa zatwierdzone terminy
+    (już istniejące i z tej partii, w kolejności decyzji) nie mogą zajmować tej
+    samej sali w nachodzących na siebie przedziałach czasu ani tego samego
+    rocznika tego samego dnia.
+    Termin wcześniej odrzucony musi dodatkowo mieć wolną salę i rocznik
+    względem wszystkich nieodrzuconych terminów - jak w create_exam_term
+    sprawdzane jest to w bazie po zapisie, osobno dla każdego terminu.
+    Terminy czytane są pod _term_write_lock i po podbiciu licznika wersji, więc
+    widzą wszystkie wcześniej zapisane propozycje. Zwraca wynik dla każdego id.
+    """
+    term = models.ExamTerm
+    with _term_write_lock:
+        version = next_term_version(db)
+        if request.filter is not None:
+            f = request.filter
+            query = _filter_terms(_decision_terms_query(), f.kierunek, f.typ_studiow, f.rok, f.status)
+            rows = db.execute(query.order_by(*EXAM_TERM_KEYS)).all()
+            decisions = [(row.id, request.status) for row in rows]
+        else:
+            decisions = [(d.term_id, d.status) for d in request.decisions]
+            ids = list({term_id for term_id, _ in decisions})
+            rows = db.execute(_decision_terms_query().where(term.id.in_(ids))).all() if ids else []
+        terms = {row.id: row for row in rows}
+
+        # Nieodrzucone terminy spoza partii w dniach, których dotyczy partia
+        dates = {row.data for row in rows}
+        others = [
+            row for row in db.execute(
+                _decision_terms_query().where(
+                    term.data.in_(dates), term.status != models.TermStatus.REJECTED
+                )
+            ).all()
+            if row.id not in terms
+        ] if dates else []
+        approved_rooms, approved_cohorts = IntervalIndex(), set()
+        active_rooms, active_cohorts = IntervalIndex(), set()
+        for row in others:
+            _take_room(active_rooms, row)
+            active_cohorts.add(_cohort_key(row))
+            if row.status == models.TermStatus.APPROVED:
+                _take_room(approved_rooms, row)
+                approved_cohorts.add(_cohort_key(row))
+
+        results = []
+        by_status = {models.TermStatus.APPROVED: [], models.TermStatus.REJECTED: []}
+        reopened = []
+        decided = set()
+        for term_id, status in decisions:
+            row = terms.get(term_id)
+            message = None
+            if row is None:
+                message = "Termin nie znaleziony"
+            elif status not in by_status:
+                message = "Dozwolone decyzje: approved, rejected"
+            elif term_id in decided:
+                message = "Powtórzona decyzja dla terminu"
+            elif status == models.TermStatus.APPROVED:
+                cohort_key = _cohort_key(row)
+                is_reopened = row.status == models.TermStatus.REJECTED
+                if _room_taken(approved_rooms, row) or (is_reopened and _room_taken(active_rooms, row)):
+                    message = f"Sala {row.sala} jest już zajęta w dniu {row.data} o godzinie {row.godzina}"
+                elif cohort_key in approved_cohorts or (is_reopened and cohort_key in active_cohorts):
+                    message = (
+                        f"Studenci {row.kierunek} ({row.typ_studiow.value}, rok {row.rok}) "
+                        f"mają już egzamin w dniu {row.data}"
+                    )
+                else:
+                    _take_room(approved_rooms, row)
+                    approved_cohorts.add(cohort_key)
+
+            if message is None:
+                if status == models.TermStatus.APPROVED and row.status == models.TermStatus.REJECTED:
+                    reopened.append(term_id)
+                else:
+                    by_status[status].append(term_id)
+                decided.add(term_id)
+            results.append({"term_id": term_id, "status": status, "ok": message is None, "message": message})
+
+        if not reopened and not any(by_status.values()):
+            db.rollback()  # bez zmian - licznik wersji zostaje
+            return _bulk_summary(results)
+
+        values = {
+            "approved_by_role": request.approved_by_role,
+            "approved_by_name": request.approved_by_name,
+            "row_version": version,
+            "updated_at": datetime.utcnow(),
+        }
+        for status, ids in by_status.items():
+            if ids:
+                db.execute(
+                    update(term)
+                    .where(term.id.in_(ids))
+                    .values(status=status, **values)
+                    .execution_options(synchronize_session=False)
+                )
+
+        # Przywracane terminy: zapis i sprawdzenie kolizji w bazie, każdy w osobnym punkcie zapisu
+        failed = {}
+        for term_id in reopened:
+            try:
+                with db.begin_nested():
+                    db.execute(
+                        update(term)
+                        .where(term.id == term_id)
+                        .values(status=models.TermStatus.APPROVED, **values)
+                        .execution_options(synchronize_session=False)
+                    )
+                    conflict = _term_conflict(db, [term_id])
+                    if conflict is not None:
+                        raise TermConflict(conflict)
+                by_status[models.TermStatus.APPROVED].append(term_id)
+            except TermConflict as e:
+                failed[term_id] = str(e)
+            except IntegrityError as e:
+                row = terms[term_id]
+                failed[term_id] = (
+                    f"Sala {row.sala} jest już zajęta w dniu {row.data} o godzinie {row.godzina}"
+                    if room_slot_violation(e)
+                    else "Ten egzamin ma już aktywny termin w tym samym dniu, godzinie i sali"
+                )
+        for result in results:
+            if result["ok"] and result["term_id"] in failed:
+                result.update(ok=False, message=failed[result["term_id"]])
+
+        changed = [term_id for ids in by_status.values() for term_id in ids]
+        if not changed:
+            db.rollback()
+            return _bulk_summary(results)
+        db.commit()
+        occupancy.apply_many(db, changed)
+    change_feed.notify()
+    return _bulk_summary(results)
+
+
+def _bulk_summary(results: List[dict]) -> dict:
+    ok = [r for r in results if r["ok"]]
+    return {
+        "approved": sum(1 for r in ok if r["status"] == models.TermStatus.APPROVED),
+        "rejected": sum(1 for r in ok if r["status"] == models.TermStatus.REJECTED),
+        "failed": len(results) - len(ok),
+        "results": results,
+    }
+
+
 # Session Periods
 def create_session_period(db: Session, period: schemas.SessionPeriodCreate) -> models.SessionPeriod:
     db_period = models.SessionPeriod(**period.dict())
     db.add(db_period)
     db.commit()
     db.refresh(db_period)
+    session_calendar.invalidate()
     return db_period
 
 
+def session_periods_query() -> Select:
+    return select(models.SessionPeriod).order_by(models.SessionPeriod.data_start.desc())
+
+
 def get_session_periods(db: Session) -> List[models.SessionPeriod]:
-    return db.query(models.SessionPeriod).order_by(models.SessionPeriod.data_start.desc()).all()
+    return db.scalars(session_periods_query()).all()
 
 
 def get_current_sessions(db: Session) -> dict:
     """
-    Pobiera aktualne/nadchodzące sesje (zasadniczą i poprawkową).
-    Na razie zwraca zasymulowane dane.
+    Pobiera aktualne/nadchodzące sesje (zasadniczą i poprawkową) z tabeli
+    session_periods (kalendarz sesji w pamięci, bez zapytania po wczytaniu).
     """
-    # Symulowane dane sesji
-    zasadnicza = models.SessionPeriod(
-        id=1,
-        semestr="zimowy",
-        rok_akademicki="2025/2026",
-        data_start="2026-02-01",
-        data_end="2026-02-07"
-    )
-    poprawkowa = models.SessionPeriod(
-        id=2,
-        semestr="zimowy_poprawkowa",
-        rok_akademicki="2025/2026",
-        data_start="2026-02-13",
-        data_end="2026-02-27"
-    )
-
-    today = datetime.now().strftime("%Y-%m-%d")
-    is_active = (zasadnicza.data_start <= today <= zasadnicza.data_end or
-                 poprawkowa.data_start <= today <= poprawkowa.data_end)
-
-    return {
-        "zasadnicza": zasadnicza,
-        "poprawkowa": poprawkowa,
-        "is_session_active": is_active,
-        "message": "Sesja zimowa 2025/2026"
-    }
+    session_calendar.ensure_loaded(db)
+    return session_calendar.current()
 
 
 def is_date_in_session(db: Session, data: str) -> bool:
-    """Sprawdza czy podana data mieści się w terminie sesji."""
-    sessions = get_current_sessions(db)
-    zasadnicza = sessions["zasadnicza"]
-    poprawkowa = sessions["poprawkowa"]
-
-    in_zasadnicza = zasadnicza.data_start <= data <= zasadnicza.data_end
-    in_poprawkowa = poprawkowa.data_start <= data <= poprawkowa.data_end
-
-    return in_zasadnicza or in_poprawkowa
+    """Sprawdza czy podana data mieści się w którymkolwiek okresie sesji."""
+    session_calendar.ensure_loaded(db)
+    return session_calendar.contains(data)
 
 
 # Walidacje
-def check_room_availability(db: Session, data: str, godzina: str, sala: str, exclude_term_id: Optional[int] = None) -> bool:
-    """Sprawdza czy sala jest wolna w danym terminie"""
-    query = db.query(models.ExamTerm).filter(
-        models.ExamTerm.data == data,
-        models.ExamTerm.godzina == godzina,
-        models.ExamTerm.sala == sala,
-        models.ExamTerm.status != models.TermStatus.REJECTED
-    )
-    
-    if exclude_term_id:
-        query = query.filter(models.ExamTerm.id != exclude_term_id)
-    
-    return query.first() is None
+def check_room_availability(
+    db: Session,
+    data: str,
+    godzina: str,
+    sala: str,
+    exclude_term_id: Optional[int] = None,
+    czas_trwania: int = DEFAULT_DURATION
+) -> bool:
+    """
+    Sprawdza czy sala jest wolna w przedziale [godzina, godzina + czas_trwania)
+    (kolizja przedziałów w indeksie zajętości w pamięci)
+    """
+    occupancy.ensure_loaded(db)
+    return occupancy.is_room_free(data, godzina, sala, exclude_term_id, czas_trwania)
 
 
 def check_student_availability(
@@ -199,19 +821,9 @@ def check_student_availability(
     rok: int,
     exclude_term_id: Optional[int] = None
 ) -> bool:
-    """Sprawdza czy studenci danego kierunku nie mają już egzaminu tego dnia"""
-    query = db.query(models.ExamTerm).join(models.Exam).join(models.Subject).filter(
-        models.ExamTerm.data == data,
-        models.Subject.kierunek == kierunek,
-        models.Subject.typ_studiow == typ_studiow,
-        models.Subject.rok == rok,
-        models.ExamTerm.status != models.TermStatus.REJECTED
-    )
-
-    if exclude_term_id:
-        query = query.filter(models.ExamTerm.id != exclude_term_id)
-
-    return query.first() is None
+    """Sprawdza czy studenci danego kierunku nie mają już egzaminu tego dnia (z indeksu zajętości)"""
+    occupancy.ensure_loaded(db)
+    return occupancy.is_cohort_free(data, kierunek, typ_studiow, rok, exclude_term_id)
 
 
 # Rooms
@@ -221,87 +833,150 @@ def create_room(db: Session, room: schemas.RoomCreate) -> models.Room:
     db.add(db_room)
     db.commit()
     db.refresh(db_room)
+    reference_cache.invalidate("rooms")
     return db_room
 
 
-def get_rooms(db: Session) -> List[models.Room]:
-    """Pobiera wszystkie sale"""
-    return db.query(models.Room).order_by(models.Room.nazwa).all()
+ROOM_KEYS = (models.Room.nazwa,)
+
+
+def rooms_query(
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Select:
+    query = select(models.Room)
+    if fields:
+        query = _project(query, models.Room, fields, ROOM_KEYS)
+    return _paginate(query, ROOM_KEYS, after, limit)
+
+
+def get_rooms(
+    db: Session,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Room]:
+    """Pobiera sale posortowane po nazwie"""
+    return _fetch(db, rooms_query(after, limit, fields), fields)
 
 
 def get_room_by_name(db: Session, nazwa: str) -> Optional[models.Room]:
-    """Pobiera salę po nazwie"""
-    return db.query(models.Room).filter(models.Room.nazwa == nazwa).first()
+    """Pobiera salę po nazwie (z cache danych referencyjnych)"""
+    return reference_cache.get(db, "rooms").by_key.get(nazwa)
+
+
+# Klucze naturalne używane do wykrywania duplikatów (pokrywają się z unikalnymi indeksami)
+NATURAL_KEYS = {
+    "subjects": (models.Subject, ("nazwa", "kierunek", "typ_studiow", "rok")),
+    "exams": (models.Exam, ("subject_id", "prowadzacy_name")),
+    "exam_terms": (models.ExamTerm, ("exam_id", "data", "godzina", "sala")),
+    "rooms": (models.Room, ("nazwa",)),
+    "demo_users": (models.DemoUser, ("name", "role")),
+}
+
+# Terminy odrzucone nie są duplikatami - ten sam slot można zaproponować ponownie
+NATURAL_KEY_FILTERS = {
+    "exam_terms": models.ExamTerm.status != models.TermStatus.REJECTED,
+}
+
+
+def _canonical_id(model, key: Sequence[str], id_column):
+    """Podzapytanie: najmniejsze id wiersza o tym samym kluczu co wiersz id_column"""
+    original = aliased(model)
+    canonical = aliased(model)
+    return (
+        select(func.min(canonical.id))
+        .select_from(original)
+        .join(canonical, and_(*(getattr(canonical, c) == getattr(original, c) for c in key)))
+        .where(original.id == id_column)
+        .scalar_subquery()
+    )
+
+
+def _duplicate_ids(model, key: Sequence[str], condition=None):
+    """Podzapytanie: id wszystkich wierszy poza najstarszym (najmniejsze id) w grupie klucza"""
+    keep = select(func.min(model.id)).group_by(*(getattr(model, c) for c in key))
+    duplicates = select(model.id)
+    if condition is not None:
+        keep = keep.where(condition)
+        duplicates = duplicates.where(condition)
+    return duplicates.where(model.id.not_in(keep))
+
+
+def _delete_duplicates(db: Session, model, key: Sequence[str], condition=None) -> int:
+    result = db.execute(
+        delete(model)
+        .where(model.id.in_(_duplicate_ids(model, key, condition)))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
 
 
 def remove_duplicates(db: Session) -> dict:
     """
-    Usuwa duplikaty z wszystkich tabel.
+    Usuwa duplikaty z wszystkich tabel zapytaniami zbiorczymi (GROUP BY + DELETE).
+    Egzaminy i terminy wskazujące na usuwane duplikaty są przepinane na zachowany wiersz.
+    Przepięte terminy dostają nową wersję, a usunięte - wpis w exam_term_tombstones.
     Zwraca liczbę usuniętych rekordów dla każdej tabeli.
     """
-    removed = {
-        "subjects": 0,
-        "exams": 0,
-        "exam_terms": 0,
-        "rooms": 0,
-        "demo_users": 0
-    }
+    removed = {}
 
-    # Duplikaty Subject (ta sama nazwa, kierunek, typ_studiow, rok)
-    subjects = db.query(models.Subject).all()
-    seen_subjects = set()
-    for s in subjects:
-        key = (s.nazwa, s.kierunek, s.typ_studiow, s.rok)
-        if key in seen_subjects:
-            db.delete(s)
-            removed["subjects"] += 1
-        else:
-            seen_subjects.add(key)
-
-    # Duplikaty Exam (ten sam subject_id i prowadzacy_name)
-    exams = db.query(models.Exam).all()
-    seen_exams = set()
-    for e in exams:
-        key = (e.subject_id, e.prowadzacy_name)
-        if key in seen_exams:
-            db.delete(e)
-            removed["exams"] += 1
-        else:
-            seen_exams.add(key)
-
-    # Duplikaty ExamTerm (ten sam exam_id, data, godzina, sala)
-    terms = db.query(models.ExamTerm).all()
-    seen_terms = set()
-    for t in terms:
-        key = (t.exam_id, t.data, t.godzina, t.sala)
-        if key in seen_terms:
-            db.delete(t)
-            removed["exam_terms"] += 1
-        else:
-            seen_terms.add(key)
-
-    # Duplikaty Room (ta sama nazwa)
-    rooms = db.query(models.Room).all()
-    seen_rooms = set()
-    for r in rooms:
-        if r.nazwa in seen_rooms:
-            db.delete(r)
-            removed["rooms"] += 1
-        else:
-            seen_rooms.add(r.nazwa)
-
-    # Duplikaty DemoUser (ta sama nazwa i rola)
-    users = db.query(models.DemoUser).all()
-    seen_users = set()
-    for u in users:
-        key = (u.name, u.role)
-        if key in seen_users:
-            db.delete(u)
-            removed["demo_users"] += 1
-        else:
-            seen_users.add(key)
+    # Przedmioty: najpierw przepinamy egzaminy na zachowany przedmiot
+    subject, subject_key = NATURAL_KEYS["subjects"]
+    db.execute(
+        update(models.Exam)
+        .where(models.Exam.subject_id.in_(_duplicate_ids(subject, subject_key)))
+        .values(subject_id=_canonical_id(subject, subject_key, models.Exam.subject_id))
+        .execution_options(synchronize_session=False)
+    )
+    removed["subjects"] = _delete_duplicates(db, subject, subject_key)
+
+    # Nową wersję terminów bierzemy tylko, gdy jakiś termin zostanie przepięty lub usunięty
+    exam, exam_key = NATURAL_KEYS["exams"]
+    term, term_key = NATURAL_KEYS["exam_terms"]
+    touched = select(term.id).where(
+        term.exam_id.in_(_duplicate_ids(exam, exam_key))
+        | term.id.in_(_duplicate_ids(term, term_key, NATURAL_KEY_FILTERS["exam_terms"]))
+    ).exists()
+    stamp = None
+    if db.scalar(select(touched)):
+        stamp = {"row_version": next_term_version(db), "updated_at": datetime.utcnow()}
+        # Egzaminy: przepinamy terminy na zachowany egzamin
+        db.execute(
+            update(term)
+            .where(term.exam_id.in_(_duplicate_ids(exam, exam_key)))
+            .values(exam_id=_canonical_id(exam, exam_key, term.exam_id), **stamp)
+            .execution_options(synchronize_session=False)
+        )
+    removed["exams"] = _delete_duplicates(db, exam, exam_key)
+
+    if stamp is not None:
+        db.execute(
+            insert(models.ExamTermTombstone).from_select(
+                ["term_id", "row_version", "deleted_at"],
+                select(
+                    term.id,
+                    literal(stamp["row_version"]),
+                    literal(stamp["updated_at"], DateTime)
+                ).where(
+                    term.id.in_(_duplicate_ids(term, term_key, NATURAL_KEY_FILTERS["exam_terms"]))
+                )
+            )
+        )
 
+    for table in ("exam_terms", "rooms", "demo_users"):
+        model, key = NATURAL_KEYS[table]
+        removed[table] = _delete_duplicates(db, model, key, NATURAL_KEY_FILTERS.get(table))
+
+    if stamp is None and not any(removed.values()):
+        db.rollback()
+        return removed
     db.commit()
+    if stamp is not None:
+        occupancy.invalidate()
+        change_feed.notify()
+    reference_cache.invalidate()
     return removed
 
 
@@ -310,7 +985,8 @@ def check_room_capacity_and_availability(
     sala: str,
     data: str,
     godzina: str,
-    liczba_osob: int
+    liczba_osob: int,
+    czas_trwania: int = DEFAULT_DURATION
 ) -> dict:
     """
     Sprawdza czy sala istnieje, ma odpowiednią pojemność i jest dostępna w danym terminie
@@ -318,8 +994,19 @@ def check_room_capacity_and_availability(
     Returns:
         dict z kluczami: available (bool), message (str), room (Room lub None)
     """
+    return _room_verdict(db, get_room_by_name(db, sala), sala, data, godzina, liczba_osob, czas_trwania)
+
+
+def _room_verdict(
+    db: Session,
+    room: Optional[models.Room],
+    sala: str,
+    data: str,
+    godzina: str,
+    liczba_osob: int,
+    czas_trwania: int = DEFAULT_DURATION
+) -> dict:
     # Sprawdź czy sala istnieje
-    room = get_room_by_name(db, sala)
     if not room:
         return {
             "available": False,
@@ -336,7 +1023,7 @@ def check_room_capacity_and_availability(
         }
 
     # Sprawdź dostępność czasową
-    is_available = check_room_availability(db, data, godzina, sala)
+    is_available = check_room_availability(db, data, godzina, sala, czas_trwania=czas_trwania)
     if not is_available:
         return {
             "available": False,
@@ -349,3 +1036,60 @@ def check_room_capacity_and_availability(
         "message": f"Sala '{sala}' jest dostępna (pojemność: {room.pojemnosc} miejsc)",
         "room": room
     }
+
+
+def check_slots(
+    db: Session,
+    exam: models.Exam,
+    slots: List[schemas.SlotCandidate],
+    liczba_osob: int,
+    skip_session_check: bool = False
+) -> List[dict]:
+    """
+    Waliduje wiele kandydatów (data, godzina, sala) dla jednego egzaminu naraz.
+
+    Sale i okresy sesji pochodzą z cache'y w pamięci,
+    a zajętość sal i roczników sprawdzana jest w indeksie w pamięci.
+    Kandydaci oceniani są niezależnie od siebie.
+    """
+    rooms = reference_cache.get(db, "rooms").by_key
+    session_calendar.ensure_loaded(db)
+    subject = exam.subject
+
+    results = []
+    for slot in slots:
+        room = rooms.get(slot.sala)
+        room_result = _room_verdict(
+            db, room, slot.sala, slot.data, slot.godzina, liczba_osob, slot.czas_trwania
+        )
+        in_session = session_calendar.contains(slot.data)
+        students_free = check_student_availability(
+            db, slot.data, subject.kierunek, subject.typ_studiow, subject.rok
+        )
+
+        messages = []
+        if not room_result["available"]:
+            messages.append(room_result["message"])
+        if not students_free:
+            messages.append(
+                f"Studenci {subject.kierunek} ({subject.typ_studiow.value}, rok {subject.rok}) "
+                f"mają już egzamin w dniu {slot.data}"
+            )
+        if not in_session and not skip_session_check:
+            messages.append(f"Data {slot.data} jest poza okresem sesji")
+
+        results.append({
+            "data": slot.data,
+            "godzina": slot.godzina,
+            "sala": slot.sala,
+            "valid": not messages,
+            "room_exists": room is not None,
+            "capacity_ok": room is not None and room.pojemnosc >= liczba_osob,
+            "room_free": check_room_availability(
+                db, slot.data, slot.godzina, slot.sala, czas_trwania=slot.czas_trwania
+            ),
+            "students_free": students_free,
+            "in_session": in_session,
+            "messages": messages,
+        })
+    return results
@@ -0,0 +1,193 @@
+"""
+Asynchroniczne odpowiedniki funkcji odczytu z `app.crud`.
+
+Wykonują te same zapytania (crud.*_query) przez AsyncSession, więc endpointy
+`async def` nie zajmują wątku z puli Starlette na czas oczekiwania na bazę.
+
+Zapisy i walidacje celowo zostają synchroniczne: zapisy terminów i tak idą
+pojedynczo (blokada _term_write_lock i wiersz licznika wersji w change_counters),
+a walidacje czytają indeks zajętości w pamięci procesu, więc wątek nie czeka
+na bazę dłużej niż przy jednym zapytaniu.
+"""
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.refdata import reference_cache
+from app.timetable import TimetableEntry, build, timetable_cache
+
+
+async def _fetch(db: AsyncSession, query: Select, fields: Optional[List[str]] = None) -> list:
+    result = await db.execute(query)
+    if fields:
+        return result.all()
+    return result.scalars().all()
+
+
+# Demo Users
+async def get_demo_users(
+    db: AsyncSession,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.DemoUser]:
+    return await _fetch(db, crud.demo_users_query(after, limit, fields), fields)
+
+
+# Subjects
+async def get_subjects(
+    db: AsyncSession,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Subject]:
+    query = crud.subjects_query(kierunek, typ_studiow, rok, after, limit, fields)
+    return await _fetch(db, query, fields)
+
+
+# Exams
+async def get_exams(
+    db: AsyncSession,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    prowadzacy_name: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Exam]:
+    query = crud.exams_query(kierunek, typ_studiow, rok, prowadzacy_name, after, limit, fields)
+    return await _fetch(db, query, fields)
+
+
+async def get_exam_rows(
+    db: AsyncSession,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    prowadzacy_name: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> list:
+    query = crud.exam_rows_query(kierunek, typ_studiow, rok, prowadzacy_name, after, limit)
+    return (await db.execute(query)).all()
+
+
+async def get_exam(db: AsyncSession, exam_id: int) -> Optional[models.Exam]:
+    result = await db.execute(crud.exam_query(exam_id))
+    return result.scalars().first()
+
+
+# Exam Terms
+async def get_exam_terms(
+    db: AsyncSession,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.ExamTerm]:
+    query = crud.exam_terms_query(kierunek, typ_studiow, rok, status, after, limit, fields)
+    return await _fetch(db, query, fields)
+
+
+async def get_exam_term_rows(
+    db: AsyncSession,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> list:
+    query = crud.exam_term_rows_query(kierunek, typ_studiow, rok, status, after, limit)
+    return (await db.execute(query)).all()
+
+
+async def get_term_version(db: AsyncSession) -> int:
+    return (await db.execute(crud.term_version_query())).scalar_one_or_none() or 0
+
+
+async def get_exam_term_changes(
+    db: AsyncSession,
+    since: int,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None
+) -> dict:
+    """
+    Terminy zmienione i usunięte po wersji since. Licznik czytany jest przed
+    wierszami, więc zwrócona wersja nie obejmuje zmian, których nie ma w odpowiedzi.
+    Usunięte terminy zwracane są tylko na pierwszej stronie.
+    """
+    version = await get_term_version(db)
+    query = crud.exam_term_changes_query(since, kierunek, typ_studiow, rok, status, after, limit)
+    changed = await _fetch(db, query)
+    deleted = []
+    if after is None:
+        deleted = (await db.execute(crud.term_tombstones_query(since, version))).scalars().all()
+    return {"version": version, "changed": changed, "deleted": deleted}
+
+
+async def get_term_events(db: AsyncSession, since: int, limit: int) -> dict:
+    """
+    Zmiany terminów po wersji since dla strumienia zmian (app.changefeed):
+    najwyżej limit zmienionych terminów i usunięte jako (term_id, row_version)
+    """
+    version = await get_term_version(db)
+    changed = await _fetch(db, crud.exam_term_changes_query(since, limit=limit))
+    deleted = (await db.execute(crud.term_tombstones_query(since, version).limit(limit))).all()
+    return {"version": version, "changed": changed, "deleted": deleted}
+
+
+async def get_timetable(
+    db: AsyncSession,
+    layout: str,
+    kierunek: Optional[str] = None,
+    typ_studiow: Optional[models.TypStudiow] = None,
+    rok: Optional[int] = None,
+    status: Optional[models.TermStatus] = None
+) -> TimetableEntry:
+    """Siatka harmonogramu z cache; przebudowywana, gdy zmieniła się wersja terminów"""
+    key = (layout, kierunek, typ_studiow, rok, status)
+    version = await get_term_version(db)
+    entry = timetable_cache.get(key, version)
+    if entry is None:
+        rows = (await db.execute(crud.timetable_query(kierunek, typ_studiow, rok, status))).all()
+        entry = timetable_cache.store(key, version, build(rows, layout, version))
+    return entry
+
+
+async def get_exam_term(db: AsyncSession, term_id: int) -> Optional[models.ExamTerm]:
+    result = await db.execute(crud.exam_term_query(term_id))
+    return result.scalars().first()
+
+
+# Session Periods
+async def get_session_periods(db: AsyncSession) -> List[models.SessionPeriod]:
+    result = await db.execute(crud.session_periods_query())
+    return result.scalars().all()
+
+
+# Rooms
+async def get_rooms(
+    db: AsyncSession,
+    after: Optional[Sequence] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[models.Room]:
+    return await _fetch(db, crud.rooms_query(after, limit, fields), fields)
+
+
+async def get_room_by_name(db: AsyncSession, nazwa: str) -> Optional[models.Room]:
+    return (await reference_cache.get_async(db, "rooms")).by_key.get(nazwa)
@@ -1,14 +1,118 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Baza główna (zapisy) i opcjonalna replika tylko do odczytu (np. PostgreSQL
+# streaming replication). Bez DATABASE_REPLICA_URL odczyty idą do bazy głównej.
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/exam_system.db")
+REPLICA_DATABASE_URL = os.getenv("DATABASE_REPLICA_URL") or SQLALCHEMY_DATABASE_URL
+
+# Sterowniki asynchroniczne dla endpointów async (odczyty)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+# Profile ustawień SQLite (PRAGMA wykonywane przy każdym nowym połączeniu).
+# "production": WAL - odczyty nie czekają na trwający zapis, a równoległe
+# zapisy czekają busy_timeout zamiast od razu zgłaszać "database is locked".
+# "compat": domyślny tryb SQLite (rollback journal), np. dla baz na NFS.
+SQLITE_PROFILES = {
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+    "compat": {
+        "busy_timeout": 5000,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+
+# Na PostgreSQL backend zwykle działa w kilku instancjach na wspólnej bazie -
+# cache w pamięci procesu nie widzą wtedy zapisów innych instancji
+SHARED_DATABASE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() != "sqlite"
+
+
+def cache_max_age(variable: str, shared_default: float) -> float:
+    """Maksymalny wiek cache w sekundach ze zmiennej środowiskowej (0 = do unieważnienia)"""
+    value = os.getenv(variable)
+    if not value:
+        return shared_default if SHARED_DATABASE else 0.0
+    return float(value)
+
+# Pula połączeń: pool_size + max_overflow nie mniejsze niż pula wątków
+# Starlette (40), inaczej wątki czekające na połączenie blokują zwalnianie sesji
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+
+def async_url(url: str) -> URL:
+    """URL bazy z odpowiadającym sterownikiem asynchronicznym"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+
+
+def apply_sqlite_profile(engine, profile: str = DB_PROFILE) -> None:
+    """Rejestruje ustawienia PRAGMA profilu dla każdego nowego połączenia silnika"""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Nieznany profil bazy danych: {profile}")
+    pragmas = SQLITE_PROFILES[profile]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/exam_system.db"
+def create_db_engine(url: str) -> Engine:
+    """Silnik synchroniczny: SQLite (z profilem PRAGMA) lub PostgreSQL"""
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = create_engine(url, connect_args={"check_same_thread": False}, **POOL_OPTIONS)
+        apply_sqlite_profile(engine)
+        return engine
+    return create_engine(url, pool_pre_ping=True, **POOL_OPTIONS)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
+
+def create_async_db_engine(url: str):
+    """Silnik asynchroniczny; dla aiosqlite z pulą zamiast domyślnego NullPool"""
+    parsed = async_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        engine = create_async_engine(parsed, poolclass=AsyncAdaptedQueuePool, **POOL_OPTIONS)
+        apply_sqlite_profile(engine.sync_engine)
+        return engine
+    return create_async_engine(parsed, pool_pre_ping=True, **POOL_OPTIONS)
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = (
+    engine if REPLICA_DATABASE_URL == SQLALCHEMY_DATABASE_URL
+    else create_db_engine(REPLICA_DATABASE_URL)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Endpointy async tylko czytają, więc łączą się z repliką (jeśli jest)
+async_engine = create_async_db_engine(REPLICA_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 
 def get_db():
@@ -18,3 +122,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Dependency dla endpointów tylko do odczytu (replika, jeśli skonfigurowana)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency dla FastAPI (endpointy async)"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,299 @@
+"""
+Generator syntetycznych danych w skali wydziałów (python generate_data.py).
+
+Dane są deterministyczne: wydział f generowany jest z własnego ziarna (seed, f),
+więc ten sam wydział ma zawsze te same sale, roczniki, egzaminy i terminy
+niezależnie od liczby generowanych wydziałów. Nazwy zawierają prefiks wydziału
+(np. "G12"), a wydziały już obecne w bazie są pomijane - ponowne uruchomienie
+nic nie dubluje, a uruchomienie z większym --faculties dokłada tylko nowe.
+
+Ładowanie jest zbiorcze: identyfikatory nadawane są po stronie klienta, wiersze
+wstawiane partiami (executemany) w jednej transakcji, a indeksy pomocnicze
+ładowanych tabel usuwane przed ładowaniem i budowane ponownie po nim.
+Terminy rozkładane są bez kolizji: każdy rocznik ma co najwyżej jeden egzamin
+dziennie, a sala - jeden termin w danej godzinie.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.intervals import DEFAULT_DURATION, to_minutes
+from app.sessions import SessionCalendar
+
+BATCH_SIZE = 10_000
+HOURS = ["08:00", "10:00", "12:00", "14:00", "16:00", "18:00"]
+STUDY_TYPES = list(models.TypStudiow)
+ROOM_TYPES = [
+    (30, "sala wykładowa"), (50, "sala wykładowa"), (100, "aula"), (25, "sala ćwiczeniowa"),
+    (20, "laboratorium"), (40, "sala wykładowa"), (15, "sala seminaryjna"),
+    (60, "sala wykładowa"), (150, "aula"), (35, "sala ćwiczeniowa"),
+]
+KIERUNKI = [
+    "Informatyka", "Zarządzanie", "Automatyka", "Elektronika", "Matematyka",
+    "Fizyka", "Ekonomia", "Mechanika", "Budownictwo", "Chemia",
+]
+PRZEDMIOTY = [
+    "Bazy Danych", "Algorytmy i Struktury Danych", "Programowanie Obiektowe",
+    "Podstawy Marketingu", "Analiza Matematyczna", "Algebra", "Fizyka",
+    "Statystyka", "Sieci Komputerowe", "Systemy Operacyjne",
+]
+
+# Kolejność ładowania (klucze obce) - terminy na końcu
+TABLES = [models.DemoUser, models.Room, models.Subject, models.Exam, models.ExamTerm]
+
+
+def faculty_prefix(faculty: int) -> str:
+    return f"G{faculty}"
+
+
+def _days(start: str, end: str) -> List[str]:
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [str(first + timedelta(days=i)) for i in range((last - first).days + 1)]
+
+
+def session_days(db: Session) -> List[str]:
+    """Dni bieżącej sesji zasadniczej i poprawkowej z tabeli session_periods"""
+    calendar = SessionCalendar()
+    calendar.load(db)
+    current = calendar.current()
+    return sorted({
+        day
+        for period in (current["zasadnicza"], current["poprawkowa"]) if period is not None
+        for day in _days(period.data_start, period.data_end)
+    })
+
+
+def _kierunek(k: int, prefix: str) -> str:
+    base = KIERUNKI[k % len(KIERUNKI)]
+    if k >= len(KIERUNKI):
+        base += f" {k // len(KIERUNKI) + 1}"
+    return f"{base} {prefix}"
+
+
+def _przedmiot(e: int) -> str:
+    name = PRZEDMIOTY[e % len(PRZEDMIOTY)]
+    return name if e < len(PRZEDMIOTY) else f"{name} {e // len(PRZEDMIOTY) + 1}"
+
+
+class _Ids:
+    """Kolejne identyfikatory nadawane po stronie klienta"""
+
+    def __init__(self, conn: Connection):
+        self._next = {
+            model: (conn.scalar(select(func.max(model.id))) or 0) + 1 for model in TABLES
+        }
+
+    def take(self, model) -> int:
+        value = self._next[model]
+        self._next[model] = value + 1
+        return value
+
+
+def faculty_rows(
+    faculty: int,
+    ids: _Ids,
+    days: List[str],
+    seed: int,
+    kierunki: int,
+    years: int,
+    study_types: int,
+    exams_per_cohort: int,
+    rooms: int,
+    density: float,
+    now: datetime,
+    version: int,
+) -> Iterator[tuple]:
+    """Wiersze jednego wydziału jako pary (model, wiersz) w kolejności kluczy obcych"""
+    rng = random.Random(f"{seed}:{faculty}")
+    prefix = faculty_prefix(faculty)
+
+    yield models.DemoUser, {
+        "id": ids.take(models.DemoUser), "name": f"Administrator {prefix}", "role": models.UserRole.ADMIN,
+        "kierunek": None, "typ_studiow": None, "rok": None, "przedmiot": None,
+    }
+    room_names = []
+    for r in range(rooms):
+        pojemnosc, typ = ROOM_TYPES[rng.randrange(len(ROOM_TYPES))]
+        room_names.append(f"{prefix}-{r:03d}")
+        yield models.Room, {
+            "id": ids.take(models.Room), "nazwa": room_names[-1], "budynek": prefix,
+            "pojemnosc": pojemnosc, "typ": typ,
+        }
+
+    cohorts = [
+        (_kierunek(k, prefix), typ, rok)
+        for k in range(kierunki) for typ in STUDY_TYPES[:study_types] for rok in range(1, years + 1)
+    ]
+    lecturers = [
+        f"Dr Prowadzący {prefix}-{n}" for n in range(max(1, len(cohorts) * exams_per_cohort // 4))
+    ]
+    for name in lecturers:
+        yield models.DemoUser, {
+            "id": ids.take(models.DemoUser), "name": name, "role": models.UserRole.PROWADZACY,
+            "kierunek": None, "typ_studiow": None, "rok": None, "przedmiot": None,
+        }
+
+    taken_slots = set()  # (data, godzina, sala) zajęte w wydziale
+    for kierunek, typ, rok in cohorts:
+        starosta = f"Starosta {kierunek} ({typ.value}, rok {rok})"
+        for role, name in ((models.UserRole.STAROSTA, starosta),
+                           (models.UserRole.STUDENT, f"Student {kierunek} ({typ.value}, rok {rok})")):
+            yield models.DemoUser, {
+                "id": ids.take(models.DemoUser), "name": name, "role": role,
+                "kierunek": kierunek, "typ_studiow": typ, "rok": rok, "przedmiot": None,
+            }
+
+        free_days = rng.sample(days, len(days))  # jeden egzamin rocznika dziennie
+        for e in range(exams_per_cohort):
+            subject_id, exam_id = ids.take(models.Subject), ids.take(models.Exam)
+            yield models.Subject, {
+                "id": subject_id, "nazwa": _przedmiot(e), "kierunek": kierunek,
+                "typ_studiow": typ, "rok": rok,
+            }
+            yield models.Exam, {
+                "id": exam_id, "subject_id": subject_id, "prowadzacy_name": rng.choice(lecturers),
+            }
+            if not free_days or rng.random() >= density:
+                continue
+            data = free_days.pop()
+            for _ in range(10):
+                slot = (data, rng.choice(HOURS), rng.choice(room_names))
+                if slot not in taken_slots:
+                    break
+            else:
+                continue
+            taken_slots.add(slot)
+            godzina, sala = slot[1], slot[2]
+            approved = rng.random() < 0.5
+            yield models.ExamTerm, {
+                "id": ids.take(models.ExamTerm), "exam_id": exam_id, "data": data, "godzina": godzina,
+                "czas_trwania": DEFAULT_DURATION, "start_min": to_minutes(godzina),
+                "end_min": to_minutes(godzina) + DEFAULT_DURATION, "sala": sala,
+                "proposed_by_role": models.UserRole.STAROSTA, "proposed_by_name": starosta,
+                "approved_by_role": models.UserRole.ADMIN if approved else None,
+                "approved_by_name": f"Administrator {prefix}" if approved else None,
+                "status": models.TermStatus.APPROVED if approved else models.TermStatus.PROPOSED,
+                "created_at": now, "updated_at": now, "row_version": version,
+            }
+
+
+def _existing_faculties(conn: Connection) -> set:
+    return set(conn.scalars(
+        select(models.Room.budynek).where(models.Room.budynek.like("G%")).distinct()
+    ))
+
+
+def _drop_indexes(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for model in TABLES:
+            for index in model.__table__.indexes:
+                index.drop(bind=conn, checkfirst=True)
+
+
+def _create_indexes(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for model in TABLES:
+            for index in model.__table__.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def _reset_sequences(conn: Connection) -> None:
+    """PostgreSQL: sekwencje id za jawnie nadanymi identyfikatorami"""
+    if conn.dialect.name != "postgresql":
+        return
+    for model in TABLES:
+        table = model.__tablename__
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def _load(conn: Connection, rows: Iterable[tuple], batch_size: int) -> Dict[str, int]:
+    """Wstawia wiersze partiami; bufory opróżniane razem w kolejności TABLES (klucze obce)"""
+    buffers = {model: [] for model in TABLES}
+    counts = {model.__tablename__: 0 for model in TABLES}
+    pending = 0
+
+    def flush():
+        for model in TABLES:
+            if buffers[model]:
+                conn.execute(model.__table__.insert(), buffers[model])
+                counts[model.__tablename__] += len(buffers[model])
+                buffers[model] = []
+
+    for model, row in rows:
+        buffers[model].append(row)
+        pending += 1
+        if pending >= batch_size:
+            flush()
+            pending = 0
+    flush()
+    return counts
+
+
+def generate(
+    engine: Engine,
+    faculties: int,
+    kierunki: int = 3,
+    years: int = 3,
+    study_types: int = 2,
+    exams_per_cohort: int = 6,
+    rooms: int = 20,
+    density: float = 0.5,
+    seed: int = 1,
+    batch_size: int = BATCH_SIZE,
+    keep_indexes: bool = False,
+) -> dict:
+    """
+    Generuje wydziały 0..faculties-1, których jeszcze nie ma w bazie.
+    Zwraca liczbę wstawionych wierszy każdej tabeli, pominięte wydziały i czasy etapów.
+    """
+    if rooms < 1:
+        raise ValueError("Wydział musi mieć co najmniej jedną salę")
+    if not 1 <= study_types <= len(STUDY_TYPES):
+        raise ValueError(f"Liczba typów studiów musi być z zakresu 1-{len(STUDY_TYPES)}")
+
+    with engine.connect() as conn:
+        existing = _existing_faculties(conn)
+        with Session(bind=conn) as db:
+            days = session_days(db)
+    todo = [f for f in range(faculties) if faculty_prefix(f) not in existing]
+    result = {"faculties": len(todo), "skipped_faculties": faculties - len(todo), "rows": {}}
+    if not todo:
+        return result
+    if not days:
+        raise ValueError("Brak okresów sesji w tabeli session_periods")
+
+    start = time.perf_counter()
+    if not keep_indexes:
+        _drop_indexes(engine)
+    try:
+        with engine.begin() as conn:
+            with Session(bind=conn) as db:
+                version = crud.next_term_version(db)
+            ids = _Ids(conn)
+            now = datetime.utcnow()
+            rows = (
+                row
+                for f in todo
+                for row in faculty_rows(
+                    f, ids, days, seed, kierunki, years, study_types,
+                    exams_per_cohort, rooms, density, now, version
+                )
+            )
+            result["rows"] = _load(conn, rows, batch_size)
+            _reset_sequences(conn)
+        result["load_seconds"] = round(time.perf_counter() - start, 2)
+    finally:
+        if not keep_indexes:
+            index_start = time.perf_counter()
+            _create_indexes(engine)
+            result["index_seconds"] = round(time.perf_counter() - index_start, 2)
+    return result
@@ -0,0 +1,78 @@
+"""
+Przedziały czasu terminów egzaminów.
+
+Termin zajmuje salę w przedziale [start_min, end_min) - minuty od północy
+dnia `data`, gdzie start_min wynika z `godzina` (HH:MM), a end_min
+= start_min + czas_trwania. Dwa terminy kolidują, gdy ich przedziały
+nachodzą na siebie (10:00-11:30 i 11:00-12:30), a nie tylko przy tej samej
+godzinie rozpoczęcia.
+
+IntervalIndex trzyma przedziały każdego klucza (np. (data, sala))
+posortowane po początku. Zapytanie o kolizję to wyszukiwanie binarne okna
+[start - najdłuższy przedział, end) i sprawdzenie końców tylko w tym oknie.
+"""
+import bisect
+from collections import defaultdict
+from typing import Dict, Hashable, List, Tuple
+
+# Domyślny czas trwania egzaminu (minuty)
+DEFAULT_DURATION = 90
+
+Interval = Tuple[int, int, int]  # (start_min, end_min, id)
+
+
+def to_minutes(godzina: str) -> int:
+    """'HH:MM' -> minuty od północy"""
+    hours, _, minutes = godzina.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def format_minutes(minutes: int) -> str:
+    """Minuty od północy -> 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def overlaps(start: int, end: int, other_start: int, other_end: int) -> bool:
+    return start < other_end and other_start < end
+
+
+class IntervalIndex:
+    def __init__(self):
+        self._intervals: Dict[Hashable, List[Interval]] = defaultdict(list)
+        self._max_length = 0
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._intervals.values())
+
+    def add(self, key: Hashable, start: int, end: int, item_id: int) -> None:
+        bisect.insort(self._intervals[key], (start, end, item_id))
+        self._max_length = max(self._max_length, end - start)
+
+    def remove(self, key: Hashable, start: int, end: int, item_id: int) -> None:
+        items = self._intervals.get(key)
+        if not items:
+            return
+        i = bisect.bisect_left(items, (start, end, item_id))
+        if i < len(items) and items[i] == (start, end, item_id):
+            del items[i]
+        if not items:
+            del self._intervals[key]
+
+    def overlapping(self, key: Hashable, start: int, end: int) -> List[int]:
+        """Id przedziałów klucza nachodzących na [start, end)"""
+        items = self._intervals.get(key)
+        if not items:
+            return []
+        lo = bisect.bisect_left(items, (start - self._max_length,))
+        hi = bisect.bisect_left(items, (end,))
+        return [item_id for s, e, item_id in items[lo:hi] if e > start]
+
+    def items(self):
+        """Pary (klucz, przedział) wszystkich przedziałów"""
+        for key, items in self._intervals.items():
+            for interval in items:
+                yield key, interval
+
+    def clear(self) -> None:
+        self._intervals.clear()
+        self._max_length = 0
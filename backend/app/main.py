@@ -1,20 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import exams, terms, other, rooms
-from app.database import engine
+from fastapi.responses import PlainTextResponse
+from app.routers import exams, terms, other, rooms, bulk
+from app.database import engine, read_engine, async_engine, SessionLocal
 from app.models import Base
+from app.migrations import run_migrations
+from app.pagination import NEXT_CURSOR_HEADER
+from app.crud import ROW_VERSION_HEADER
+from app.occupancy import occupancy
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, metrics
+from app.compression import CompressionMiddleware
 import os
 
 # Tworzymy katalog na bazę danych jeśli nie istnieje
 os.makedirs("data", exist_ok=True)
 
-# Tworzymy tabele
+# Liczymy zapytania SQL wszystkich silników (metryki per żądanie)
+for _engine in {engine, read_engine, async_engine.sync_engine}:
+    instrument_engine(_engine)
+
+# Tworzymy tabele i aktualizujemy schemat istniejącej bazy
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Budujemy indeks zajętości sal/roczników używany przez walidacje
+    with SessionLocal() as db:
+        occupancy.load(db)
+    yield
+
 
 app = FastAPI(
     title="System Organizacji Egzaminów",
     description="API do zarządzania egzaminami i terminami",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS - zezwalamy na requesty z frontendu
@@ -24,13 +47,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ROW_VERSION_HEADER],
 )
 
+# Kompresja gzip/brotli (negocjowana przez Accept-Encoding, od COMPRESSION_MIN_SIZE bajtów)
+app.add_middleware(CompressionMiddleware)
+
+# Metryki (dodane jako ostatnie = zewnętrzne, mierzą też CORS)
+app.add_middleware(MetricsMiddleware)
+
 # Rejestrujemy routery
 app.include_router(exams.router)
 app.include_router(terms.router)
 app.include_router(other.router)
 app.include_router(rooms.router)
+app.include_router(bulk.router)
 
 
 @app.get("/")
@@ -45,3 +76,9 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Metryki w formacie tekstowym Prometheusa"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
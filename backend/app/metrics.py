@@ -0,0 +1,267 @@
+"""
+Metryki wydajności żądań w formacie tekstowym Prometheusa (GET /metrics).
+
+MetricsMiddleware (czyste ASGI, działa też ze StreamingResponse) mierzy dla
+każdego żądania czas obsługi, rozmiar odpowiedzi i liczbę żądań w toku,
+z etykietą szablonu ścieżki (np. /api/exam-terms/{term_id}), a nie pełnego
+URL. Zdarzenia silników SQLAlchemy liczą zapytania SQL i ich czas
+i przypisują je do bieżącego żądania przez ContextVar - kontekst przechodzi
+do wątków puli (endpointy sync) i do greenletów silnika async.
+
+Log wolnych żądań jest opcjonalny: SLOW_REQUEST_MS > 0 włącza zbieranie
+treści zapytań SQL i zapisuje je (logger "app.metrics") dla żądań dłuższych
+niż próg - widać wtedy wzorce N+1 i wolne walidacje.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger("app.metrics")
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+MAX_LOGGED_STATEMENTS = 50
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels: Labels = (), value: float = 1) -> None:
+        self.inc(labels, -value)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> (liczniki per kubełek bez kumulacji, suma, liczba)
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts, totals = self._series.setdefault(
+            labels, ([0] * (len(self.buckets) + 1), [0.0, 0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labels, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labels, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            suffix = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class RequestTrace:
+    """SQL wykonany w ramach jednego żądania"""
+
+    def __init__(self, collect_statements: bool):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.collected: Optional[List[Tuple[float, str]]] = [] if collect_statements else None
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "http_requests_total", "Liczba obsłużonych żądań", ("method", "route", "status")
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Czas obsługi żądania",
+            LATENCY_BUCKETS, ("method", "route")
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Rozmiar ciała odpowiedzi",
+            SIZE_BUCKETS, ("method", "route")
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "Żądania w trakcie obsługi")
+        self.sql_statements = Histogram(
+            "db_statements_per_request", "Liczba zapytań SQL na żądanie",
+            STATEMENT_BUCKETS, ("method", "route")
+        )
+        self.sql_time = Histogram(
+            "db_time_per_request_seconds", "Łączny czas zapytań SQL na żądanie",
+            LATENCY_BUCKETS, ("method", "route")
+        )
+        self.sql_outside = Counter(
+            "db_statements_outside_request_total", "Zapytania SQL poza żądaniami HTTP (start, migracje)"
+        )
+        self.slow_requests = Counter(
+            "http_slow_requests_total", "Żądania dłuższe niż SLOW_REQUEST_MS", ("method", "route")
+        )
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight.inc()
+
+    def request_finished(
+        self, method: str, route: str, status: int, seconds: float, size: int, trace: RequestTrace
+    ) -> None:
+        labels = (method, route)
+        with self._lock:
+            self.in_flight.dec()
+            self.requests.inc((method, route, str(status)))
+            self.latency.observe(labels, seconds)
+            self.response_size.observe(labels, size)
+            self.sql_statements.observe(labels, trace.statements)
+            self.sql_time.observe(labels, trace.sql_seconds)
+
+    def statement_outside_request(self) -> None:
+        with self._lock:
+            self.sql_outside.inc()
+
+    def slow_request(self, method: str, route: str) -> None:
+        with self._lock:
+            self.slow_requests.inc((method, route))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (
+                self.requests, self.latency, self.response_size, self.in_flight,
+                self.sql_statements, self.sql_time, self.sql_outside, self.slow_requests,
+            ):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# Zapytania SQL
+def instrument_engine(engine) -> None:
+    """
+    Rejestruje liczenie zapytań SQL silnika (dla async: engine.sync_engine).
+    Czas startu jest w kontekście wykonania zapytania, więc zapytanie zakończone
+    błędem (bez after_cursor_execute) nie zostawia nic w połączeniu.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = context.query_start
+        trace = _current_trace.get()
+        if trace is None:
+            metrics.statement_outside_request()
+            return
+        elapsed = time.perf_counter() - started
+        trace.statements += 1
+        trace.sql_seconds += elapsed
+        if trace.collected is not None and len(trace.collected) < MAX_LOGGED_STATEMENTS:
+            trace.collected.append((elapsed, " ".join(statement.split())))
+
+
+# Middleware
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _log_slow_request(method: str, path: str, seconds: float, trace: RequestTrace) -> None:
+    lines = [
+        f"Wolne żądanie {method} {path}: {seconds * 1000:.1f} ms, "
+        f"SQL: {trace.statements} zapytań, {trace.sql_seconds * 1000:.1f} ms"
+    ]
+    for elapsed, statement in trace.collected or []:
+        lines.append(f"  {elapsed * 1000:8.2f} ms  {statement}")
+    if trace.statements > len(trace.collected or []):
+        lines.append(f"  ... (+{trace.statements - len(trace.collected)} zapytań)")
+    logger.warning("\n".join(lines))
+
+
+class MetricsMiddleware:
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(collect_statements=self.slow_request_ms > 0)
+        token = _current_trace.set(trace)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            _current_trace.reset(token)
+            method, route = scope["method"], _route_name(scope)
+            metrics.request_finished(method, route, status, seconds, size, trace)
+            if self.slow_request_ms > 0 and seconds * 1000 >= self.slow_request_ms:
+                metrics.slow_request(method, route)
+                _log_slow_request(method, scope["path"], seconds, trace)
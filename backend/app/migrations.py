@@ -0,0 +1,275 @@
+"""
+Wersjonowane migracje schematu bazy danych.
+
+`Base.metadata.create_all` tworzy tylko brakujące tabele i nigdy nie zmienia
+istniejących, więc zmiany schematu dla istniejących plików bazy
+(np. data/exam_system.db) opisujemy tutaj jako kolejne, numerowane kroki.
+Zastosowane wersje zapisujemy w tabeli `schema_migrations`.
+"""
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, bindparam, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+# Migracje są zamrożone: piszemy je literalnym SQL na kolumnach i tabelach
+# istniejących w danej wersji schematu, bez modeli i kodu aplikacji (crud,
+# cache), które zmieniają się razem z bieżącym schematem. Nazwy indeksów
+# i definicje tabel są takie same jak w app/models.py w chwili powstania migracji.
+
+# Nazwa licznika wersji terminów (models.TERM_VERSION_COUNTER)
+TERM_VERSION_COUNTER = "exam_terms"
+# Domyślny czas trwania terminu w minutach w chwili migracji 5
+M005_DEFAULT_DURATION = 90
+
+
+def _create_indexes(conn: Connection, *indexes: str, unique: bool = False) -> None:
+    """indexes: "nazwa ON tabela (kolumny) [WHERE warunek]" """
+    for index in indexes:
+        conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index}"))
+
+
+def _datetime_type(conn: Connection) -> str:
+    return "DATETIME" if conn.dialect.name == "sqlite" else "TIMESTAMP WITHOUT TIME ZONE"
+
+
+def _minutes(godzina: str) -> int:
+    """'HH:MM' -> minuty od północy"""
+    hours, _, minutes = godzina.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _bump_term_version(conn: Connection) -> int:
+    conn.execute(
+        text("UPDATE change_counters SET value = value + 1 WHERE name = :name"),
+        {"name": TERM_VERSION_COUNTER}
+    )
+    return conn.execute(
+        text("SELECT value FROM change_counters WHERE name = :name"), {"name": TERM_VERSION_COUNTER}
+    ).scalar_one()
+
+
+# Migracje
+def _m001_conflict_check_indexes(conn: Connection) -> None:
+    """Indeksy złożone dla check_room_availability i check_student_availability"""
+    _create_indexes(
+        conn,
+        "ix_exam_terms_slot ON exam_terms (data, godzina, sala, status)",
+        "ix_exam_terms_data_exam ON exam_terms (data, exam_id, status)",
+        "ix_exams_subject_id ON exams (subject_id)",
+        "ix_subjects_cohort ON subjects (kierunek, typ_studiow, rok, id)",
+    )
+
+
+# Klucze naturalne z etapu migracji 2
+# (tabela, klucz, warunek, (tabela wskazująca, kolumna) przepinana na zachowany wiersz)
+_M002_NATURAL_KEYS = [
+    ("subjects", ("nazwa", "kierunek", "typ_studiow", "rok"), None, ("exams", "subject_id")),
+    ("exams", ("subject_id", "prowadzacy_name"), None, ("exam_terms", "exam_id")),
+    # Terminy odrzucone nie są duplikatami - ten sam slot można zaproponować ponownie
+    ("exam_terms", ("exam_id", "data", "godzina", "sala"), "status != 'REJECTED'", None),
+    ("demo_users", ("name", "role"), None, None),
+]
+
+
+def _m002_natural_key_uniqueness(conn: Connection) -> None:
+    """Usuwa istniejące duplikaty i zakłada unikalne indeksy na kluczach naturalnych"""
+    for table, key, condition, referencing in _M002_NATURAL_KEYS:
+        group = ", ".join(key)
+        keep = f"SELECT MIN(id) FROM {table} {'WHERE ' + condition if condition else ''} GROUP BY {group}"
+        duplicates = f"SELECT id FROM {table} WHERE id NOT IN ({keep}) {'AND ' + condition if condition else ''}"
+        if referencing:
+            child, column = referencing
+            same_key = " AND ".join(f"canonical.{c} = original.{c}" for c in key)
+            conn.execute(text(
+                f"UPDATE {child} SET {column} = ("
+                f"SELECT MIN(canonical.id) FROM {table} original "
+                f"JOIN {table} canonical ON {same_key} "
+                f"WHERE original.id = {child}.{column}) "
+                f"WHERE {column} IN ({duplicates})"
+            ))
+        conn.execute(text(f"DELETE FROM {table} WHERE id IN ({duplicates})"))
+    _create_indexes(
+        conn,
+        "uq_subjects_natural ON subjects (nazwa, kierunek, typ_studiow, rok)",
+        "uq_exams_subject_prowadzacy ON exams (subject_id, prowadzacy_name)",
+        "uq_exam_terms_exam_slot ON exam_terms (exam_id, data, godzina, sala) WHERE status != 'REJECTED'",
+        "uq_demo_users_name_role ON demo_users (name, role)",
+        unique=True,
+    )
+
+
+def _m003_session_periods_2025_2026(conn: Connection) -> None:
+    """Okresy sesji 2025/2026, które wcześniej były zaszyte w crud.get_current_sessions"""
+    periods = [
+        ("zimowy", "2025/2026", "2026-02-01", "2026-02-07"),
+        ("zimowy_poprawkowa", "2025/2026", "2026-02-13", "2026-02-27"),
+    ]
+    for semestr, rok_akademicki, data_start, data_end in periods:
+        params = {"semestr": semestr, "rok_akademicki": rok_akademicki}
+        exists = conn.execute(text(
+            "SELECT id FROM session_periods WHERE semestr = :semestr AND rok_akademicki = :rok_akademicki"
+        ), params).first()
+        if exists is None:
+            conn.execute(text(
+                "INSERT INTO session_periods (semestr, rok_akademicki, data_start, data_end) "
+                "VALUES (:semestr, :rok_akademicki, :data_start, :data_end)"
+            ), {**params, "data_start": data_start, "data_end": data_end})
+
+
+def _add_column(conn: Connection, table: str, name: str, ddl_type: str, default: Optional[str] = None) -> bool:
+    """ALTER TABLE ADD COLUMN, jeśli kolumny brakuje; zwraca czy dodano"""
+    if name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return False
+    ddl = f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"
+    if default is not None:
+        ddl += f" NOT NULL DEFAULT {default}"
+    conn.execute(text(ddl))
+    return True
+
+
+def _m004_exam_term_row_versions(conn: Connection) -> None:
+    """updated_at i row_version terminów, licznik zmian oraz tabela usuniętych terminów"""
+    serial = "INTEGER NOT NULL" if conn.dialect.name == "sqlite" else "SERIAL"
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS change_counters ("
+        "name VARCHAR NOT NULL PRIMARY KEY, value INTEGER NOT NULL)"
+    ))
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS exam_term_tombstones ("
+        f"id {serial} PRIMARY KEY, term_id INTEGER NOT NULL, "
+        f"row_version INTEGER NOT NULL, deleted_at {_datetime_type(conn)})"
+    ))
+    _create_indexes(conn, "ix_exam_term_tombstones_row_version ON exam_term_tombstones (row_version)")
+
+    if _add_column(conn, "exam_terms", "updated_at", _datetime_type(conn)):
+        conn.execute(text("UPDATE exam_terms SET updated_at = created_at"))
+    _add_column(conn, "exam_terms", "row_version", "INTEGER", default="0")
+    # Istniejące terminy to wersja 1 - klient z since=0 pobierze wszystkie
+    conn.execute(text("UPDATE exam_terms SET row_version = 1 WHERE row_version = 0"))
+    _create_indexes(conn, "ix_exam_terms_row_version ON exam_terms (row_version)")
+
+    exists = conn.execute(
+        text("SELECT name FROM change_counters WHERE name = :name"), {"name": TERM_VERSION_COUNTER}
+    ).first()
+    if exists is None:
+        conn.execute(
+            text("INSERT INTO change_counters (name, value) VALUES (:name, 1)"), {"name": TERM_VERSION_COUNTER}
+        )
+
+
+def _m005_exam_term_intervals(conn: Connection) -> None:
+    """Czas trwania terminów i przedział zajętości sali [start_min, end_min)"""
+    added = _add_column(conn, "exam_terms", "czas_trwania", "INTEGER", default=str(M005_DEFAULT_DURATION))
+    _add_column(conn, "exam_terms", "start_min", "INTEGER")
+    _add_column(conn, "exam_terms", "end_min", "INTEGER")
+
+    rows = conn.execute(
+        text("SELECT id, godzina, czas_trwania FROM exam_terms WHERE start_min IS NULL")
+    ).all()
+    if rows:
+        conn.execute(
+            text("UPDATE exam_terms SET start_min = :start_min, end_min = :end_min WHERE id = :term_id"),
+            [
+                {
+                    "term_id": row.id,
+                    "start_min": _minutes(row.godzina),
+                    "end_min": _minutes(row.godzina) + row.czas_trwania,
+                }
+                for row in rows
+            ]
+        )
+    _create_indexes(conn, "ix_exam_terms_room_interval ON exam_terms (data, sala, start_min, end_min)")
+
+    if added:
+        # Nowe pola we wszystkich terminach - klienci synchronizujący since= pobiorą je ponownie
+        version = _bump_term_version(conn)
+        conn.execute(text("UPDATE exam_terms SET row_version = :version"), {"version": version})
+
+
+def _m006_room_slot_uniqueness(conn: Connection) -> None:
+    """
+    Unikalny nieodrzucony termin na (data, godzina, sala). Istniejące podwójne
+    rezerwacje rozstrzygamy przed założeniem indeksu: zostaje termin zatwierdzony
+    (lub najstarszy), pozostałe są odrzucane z nową wersją wiersza.
+    """
+    rows = conn.execute(text(
+        "SELECT id, data, godzina, sala, status FROM exam_terms WHERE status != 'REJECTED' "
+        "ORDER BY data, godzina, sala, id"
+    )).all()
+    kept = {}
+    for row in rows:
+        slot = (row.data, row.godzina, row.sala)
+        if slot not in kept or (row.status == "APPROVED" and kept[slot].status != "APPROVED"):
+            kept[slot] = row
+    rejected = [row.id for row in rows if kept[(row.data, row.godzina, row.sala)].id != row.id]
+
+    if rejected:
+        version = _bump_term_version(conn)
+        conn.execute(
+            text(
+                "UPDATE exam_terms SET status = 'REJECTED', row_version = :version, updated_at = :now "
+                "WHERE id IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"version": version, "now": datetime.utcnow(), "ids": rejected}
+        )
+    _create_indexes(
+        conn,
+        "uq_exam_terms_room_slot ON exam_terms (data, godzina, sala) WHERE status != 'REJECTED'",
+        unique=True,
+    )
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Indeksy złożone dla walidacji konfliktów", _m001_conflict_check_indexes),
+    (2, "Unikalne klucze naturalne (przedmioty, egzaminy, terminy, użytkownicy)", _m002_natural_key_uniqueness),
+    (3, "Okresy sesji 2025/2026 w tabeli session_periods", _m003_session_periods_2025_2026),
+    (4, "Wersje wierszy terminów (updated_at, row_version, tombstones)", _m004_exam_term_row_versions),
+    (5, "Czas trwania i przedziały czasu terminów", _m005_exam_term_intervals),
+    (6, "Unikalny nieodrzucony termin sali w danym dniu i godzinie", _m006_room_slot_uniqueness),
+]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Zwraca numer ostatniej zastosowanej migracji (0 dla nowej bazy)"""
+    versions = conn.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Stosuje brakujące migracje, każdą w osobnej transakcji.
+    Zwraca listę zastosowanych wersji.
+    """
+    metadata.create_all(bind=engine)
+    applied = []
+
+    with engine.connect() as conn:
+        current = get_schema_version(conn)
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.utcnow()
+                )
+            )
+        applied.append(version)
+
+    return applied
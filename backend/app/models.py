@@ -1,11 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
 
+from app.intervals import DEFAULT_DURATION, to_minutes
+
 Base = declarative_base()
 
+# Warunek indeksów częściowych obejmujących tylko terminy, które nie zostały odrzucone
+ACTIVE_TERM = text("status != 'REJECTED'")
+
 
 class UserRole(str, enum.Enum):
     STUDENT = "student"
@@ -39,6 +44,10 @@ class DemoUser(Base):
     rok = Column(Integer, nullable=True)
     przedmiot = Column(String, nullable=True)  # dla prowadzących
 
+    __table_args__ = (
+        Index("uq_demo_users_name_role", "name", "role", unique=True),
+    )
+
 
 class Subject(Base):
     """Przedmioty z planu studiów"""
@@ -52,6 +61,12 @@ class Subject(Base):
     
     exams = relationship("Exam", back_populates="subject")
 
+    __table_args__ = (
+        # check_student_availability: filtr po roczniku (kierunek, typ, rok)
+        Index("ix_subjects_cohort", "kierunek", "typ_studiow", "rok", "id"),
+        Index("uq_subjects_natural", "nazwa", "kierunek", "typ_studiow", "rok", unique=True),
+    )
+
 
 class Exam(Base):
     """Egzaminy"""
@@ -64,6 +79,20 @@ class Exam(Base):
     subject = relationship("Subject", back_populates="exams")
     terms = relationship("ExamTerm", back_populates="exam")
 
+    __table_args__ = (
+        Index("ix_exams_subject_id", "subject_id"),
+        Index("uq_exams_subject_prowadzacy", "subject_id", "prowadzacy_name", unique=True),
+    )
+
+
+def _start_min(context) -> int:
+    return to_minutes(context.get_current_parameters()["godzina"])
+
+
+def _end_min(context) -> int:
+    params = context.get_current_parameters()
+    return to_minutes(params["godzina"]) + (params.get("czas_trwania") or DEFAULT_DURATION)
+
 
 class ExamTerm(Base):
     """Terminy egzaminów (propozycje i zatwierdzone)"""
@@ -73,6 +102,10 @@ class ExamTerm(Base):
     exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
     data = Column(String, nullable=False)  # format: YYYY-MM-DD
     godzina = Column(String, nullable=False)  # format: HH:MM
+    czas_trwania = Column(Integer, nullable=False, default=DEFAULT_DURATION)  # minuty
+    # Przedział zajętości sali [start_min, end_min) w minutach od północy
+    start_min = Column(Integer, default=_start_min)
+    end_min = Column(Integer, default=_end_min)
     sala = Column(String, nullable=False)
     proposed_by_role = Column(SQLEnum(UserRole), nullable=False)
     proposed_by_name = Column(String, nullable=False)
@@ -80,9 +113,56 @@ class ExamTerm(Base):
     approved_by_name = Column(String, nullable=True)
     status = Column(SQLEnum(TermStatus), default=TermStatus.PROPOSED)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Numer zmiany z licznika change_counters - rośnie przy każdym zapisie terminu
+    row_version = Column(Integer, nullable=False, default=0)
     
     exam = relationship("Exam", back_populates="terms")
 
+    __table_args__ = (
+        # Duplikaty i unikalność slotu: (data, godzina, sala) z filtrem po statusie
+        Index("ix_exam_terms_slot", "data", "godzina", "sala", "status"),
+        # Kolizje sal: przedziały terminów danej sali w danym dniu
+        Index("ix_exam_terms_room_interval", "data", "sala", "start_min", "end_min"),
+        # check_student_availability: terminy danego dnia -> JOIN do exams
+        Index("ix_exam_terms_data_exam", "data", "exam_id", "status"),
+        # Ten sam egzamin w tym samym slocie może istnieć tylko raz (odrzucone nie blokują ponownej propozycji)
+        Index(
+            "uq_exam_terms_exam_slot", "exam_id", "data", "godzina", "sala",
+            unique=True, sqlite_where=ACTIVE_TERM, postgresql_where=ACTIVE_TERM
+        ),
+        # Sala w danym dniu i godzinie rozpoczęcia ma co najwyżej jeden nieodrzucony termin
+        # (ostatnia linia obrony przed równoległymi zapisami; nachodzące przedziały sprawdza crud)
+        Index(
+            "uq_exam_terms_room_slot", "data", "godzina", "sala",
+            unique=True, sqlite_where=ACTIVE_TERM, postgresql_where=ACTIVE_TERM
+        ),
+        # Synchronizacja przyrostowa: GET /api/exam-terms/?since=<wersja>
+        Index("ix_exam_terms_row_version", "row_version"),
+    )
+
+
+class ExamTermTombstone(Base):
+    """Usunięte terminy - klienci synchronizujący się przyrostowo usuwają je u siebie"""
+    __tablename__ = "exam_term_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    term_id = Column(Integer, nullable=False)
+    row_version = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Nazwa licznika wersji wierszy exam_terms w change_counters
+TERM_VERSION_COUNTER = "exam_terms"
+
+
+class ChangeCounter(Base):
+    """Globalne liczniki zmian (np. wersje wierszy exam_terms)"""
+    __tablename__ = "change_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
 
 class SessionPeriod(Base):
     """Okresy sesji egzaminacyjnych"""
@@ -0,0 +1,255 @@
+"""
+Indeks zajętości sal i roczników trzymany w pamięci procesu.
+
+Odpowiada na pytania walidacji (czy sala jest wolna, czy rocznik ma już
+egzamin danego dnia) bez zapytania do bazy:
+- (data, sala) -> przedziały [start_min, end_min) terminów (app.intervals)
+- (data, kierunek, typ_studiow, rok) -> id terminów
+
+Sala jest zajęta, gdy przedział nowego terminu nachodzi na przedział
+istniejącego; rocznik - gdy ma tego dnia jakikolwiek egzamin.
+
+Indeks budowany jest przy starcie aplikacji (lub leniwie przy pierwszym
+użyciu) i aktualizowany przez funkcje zapisu w `crud` po udanym commicie.
+Terminy odrzucone (REJECTED) nie zajmują ani sali, ani rocznika.
+
+Zapisy innych instancji backendu na wspólnej bazie indeks nanosi sam: przed
+użyciem porównuje swoją wersję z licznikiem wersji terminów (change_counters)
+i doczytuje terminy o wyższym row_version oraz usunięte (exam_term_tombstones).
+OCCUPANCY_MAX_AGE (sekundy) dodatkowo wymusza okresową przebudowę od zera.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.intervals import DEFAULT_DURATION, IntervalIndex, to_minutes
+
+RoomSlot = Tuple[str, str, int, int]  # (data, sala, start_min, end_min)
+CohortKey = Tuple[str, str, str, int]
+
+
+def _typ_value(typ_studiow) -> str:
+    return typ_studiow.value if isinstance(typ_studiow, models.TypStudiow) else typ_studiow
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rooms = IntervalIndex()
+        self._cohorts: Dict[CohortKey, Set[int]] = defaultdict(set)
+        self._terms: Dict[int, Tuple[RoomSlot, CohortKey]] = {}
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.max_age = float(os.getenv("OCCUPANCY_MAX_AGE", "0"))
+        # Zwiększany przy każdej zmianie - pozwala cache'ować struktury pochodne
+        self.version = 0
+        # Wersja terminów w bazie (change_counters), którą indeks już uwzględnia
+        self.term_version = 0
+
+    @staticmethod
+    def _read_terms(
+        db: Session, term_ids: Optional[List[int]] = None
+    ) -> Dict[int, Tuple[RoomSlot, CohortKey]]:
+        query = (
+            db.query(
+                models.ExamTerm.id,
+                models.ExamTerm.data,
+                models.ExamTerm.sala,
+                models.ExamTerm.start_min,
+                models.ExamTerm.end_min,
+                models.Subject.kierunek,
+                models.Subject.typ_studiow,
+                models.Subject.rok,
+            )
+            .join(models.Exam, models.ExamTerm.exam_id == models.Exam.id)
+            .join(models.Subject, models.Exam.subject_id == models.Subject.id)
+            .filter(models.ExamTerm.status != models.TermStatus.REJECTED)
+        )
+        if term_ids is not None:
+            query = query.filter(models.ExamTerm.id.in_(term_ids))
+        rows = query.all()
+        return {
+            row.id: (
+                (row.data, row.sala, row.start_min, row.end_min),
+                (row.data, row.kierunek, _typ_value(row.typ_studiow), row.rok),
+            )
+            for row in rows
+        }
+
+    @staticmethod
+    def _read_term_version(db: Session) -> int:
+        counter = models.ChangeCounter
+        return db.scalar(
+            select(counter.value).where(counter.name == models.TERM_VERSION_COUNTER)
+        ) or 0
+
+    def load(self, db: Session) -> None:
+        """Buduje indeks od zera na podstawie bazy"""
+        # Licznik przed wierszami - zmiany zapisane w międzyczasie doczyta refresh
+        term_version = self._read_term_version(db)
+        terms = self._read_terms(db)
+        with self._lock:
+            self._rooms.clear()
+            self._cohorts.clear()
+            self._terms.clear()
+            for term_id, (slot, cohort_key) in terms.items():
+                self._add(term_id, slot, cohort_key)
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+            self.term_version = term_version
+            self.version += 1
+
+    def _stale(self) -> bool:
+        return not self.loaded or (
+            self.max_age > 0 and time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self.load(db)
+                    return
+        self.refresh(db)
+
+    def refresh(self, db: Session) -> None:
+        """Nanosi terminy zmienione w bazie po wersji indeksu (także przez inne instancje)"""
+        term_version = self._read_term_version(db)
+        if term_version <= self.term_version:
+            return
+        term, tombstone = models.ExamTerm, models.ExamTermTombstone
+        with self._lock:
+            since = self.term_version
+            if not self.loaded or term_version <= since:
+                return
+            term_ids = [
+                *db.scalars(select(term.id).where(term.row_version > since)),
+                *db.scalars(select(tombstone.term_id).where(tombstone.row_version > since)),
+            ]
+            if term_ids:
+                self._replace(term_ids, self._read_terms(db, term_ids))
+            self.term_version = term_version
+
+    def _add(self, term_id: int, slot: RoomSlot, cohort_key: CohortKey) -> None:
+        data, sala, start, end = slot
+        self._terms[term_id] = (slot, cohort_key)
+        self._rooms.add((data, sala), start, end, term_id)
+        self._cohorts[cohort_key].add(term_id)
+
+    def _remove(self, term_id: int) -> None:
+        keys = self._terms.pop(term_id, None)
+        if keys is None:
+            return
+        (data, sala, start, end), cohort_key = keys
+        self._rooms.remove((data, sala), start, end, term_id)
+        self._cohorts[cohort_key].discard(term_id)
+        if not self._cohorts[cohort_key]:
+            del self._cohorts[cohort_key]
+
+    def apply(self, term: models.ExamTerm) -> None:
+        """Uwzględnia nowy lub zmieniony termin (wywoływane po commicie)"""
+        if not self.loaded:
+            return
+        subject = term.exam.subject
+        with self._lock:
+            self._remove(term.id)
+            if term.status != models.TermStatus.REJECTED:
+                self._add(
+                    term.id,
+                    (term.data, term.sala, term.start_min, term.end_min),
+                    (term.data, subject.kierunek, _typ_value(subject.typ_studiow), subject.rok),
+                )
+            self.version += 1
+
+    def apply_many(self, db: Session, term_ids: List[int]) -> None:
+        """Uwzględnia wiele nowych/zmienionych terminów jednym zapytaniem"""
+        if not self.loaded or not term_ids:
+            return
+        self._replace(term_ids, self._read_terms(db, term_ids))
+
+    def _replace(self, term_ids: List[int], terms: Dict[int, Tuple[RoomSlot, CohortKey]]) -> None:
+        """Zastępuje wpisy terminów term_ids odczytanymi z bazy (brak wpisu - termin zwolniony)"""
+        with self._lock:
+            for term_id in term_ids:
+                self._remove(term_id)
+                if term_id in terms:
+                    self._add(term_id, *terms[term_id])
+            self.version += 1
+
+    def invalidate(self) -> None:
+        """Wymusza przebudowę przy następnym użyciu (np. po masowym usuwaniu)"""
+        with self._lock:
+            self.loaded = False
+            self.version += 1
+
+    @staticmethod
+    def _is_free(term_ids: Optional[Set[int]], exclude_term_id: Optional[int]) -> bool:
+        if not term_ids:
+            return True
+        return term_ids == {exclude_term_id}
+
+    def is_room_free(
+        self,
+        data: str,
+        godzina: str,
+        sala: str,
+        exclude_term_id: Optional[int] = None,
+        czas_trwania: int = DEFAULT_DURATION
+    ) -> bool:
+        """Czy przedział [godzina, godzina + czas_trwania) nie nachodzi na inny termin w sali"""
+        start = to_minutes(godzina)
+        with self._lock:
+            overlapping = self._rooms.overlapping((data, sala), start, start + czas_trwania)
+        return self._is_free(set(overlapping), exclude_term_id)
+
+    def is_cohort_free(
+        self,
+        data: str,
+        kierunek: str,
+        typ_studiow,
+        rok: int,
+        exclude_term_id: Optional[int] = None
+    ) -> bool:
+        key = (data, kierunek, _typ_value(typ_studiow), rok)
+        with self._lock:
+            return self._is_free(self._cohorts.get(key), exclude_term_id)
+
+    def occupied_rooms(self) -> List[RoomSlot]:
+        """Wszystkie zajęte przedziały (data, sala, start_min, end_min)"""
+        with self._lock:
+            return [(data, sala, start, end) for (data, sala), (start, end, _) in self._rooms.items()]
+
+    def cohort_dates(self, kierunek: str, typ_studiow, rok: int) -> Set[str]:
+        """Dni, w których rocznik ma już egzamin"""
+        cohort = (kierunek, _typ_value(typ_studiow), rok)
+        with self._lock:
+            return {key[0] for key in self._cohorts if key[1:] == cohort}
+
+    def check_consistency(self, db: Session) -> dict:
+        """Porównuje indeks z bazą; zwraca terminy brakujące, nadmiarowe i rozbieżne"""
+        expected = self._read_terms(db)
+        with self._lock:
+            actual = dict(self._terms)
+        missing = sorted(set(expected) - set(actual))
+        extra = sorted(set(actual) - set(expected))
+        mismatched = sorted(
+            term_id for term_id in set(expected) & set(actual)
+            if expected[term_id] != actual[term_id]
+        )
+        return {
+            "consistent": self.loaded and not (missing or extra or mismatched),
+            "loaded": self.loaded,
+            "indexed_terms": len(actual),
+            "missing": missing,
+            "extra": extra,
+            "mismatched": mismatched,
+        }
+
+
+occupancy = OccupancyIndex()
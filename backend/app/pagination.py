@@ -0,0 +1,86 @@
+"""
+Paginacja kursorowa (keyset) i projekcja pól dla endpointów listujących.
+
+Kursor to zakodowane base64 wartości klucza sortowania ostatniego wiersza
+strony - kolejna strona zaczyna się od wierszy "większych" od tego klucza,
+więc koszt pobrania strony nie zależy od jej numeru.
+"""
+import base64
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_LIMIT = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """Dekoduje kursor z query stringa; zwraca None gdy kursora brak"""
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Nieprawidłowy kursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Nieprawidłowy kursor")
+    return values
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Parsuje parametr fields=a,b,c i sprawdza czy pola są dozwolone"""
+    if not fields:
+        return None
+    allowed = list(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Nieznane pola: {', '.join(unknown)}. Dozwolone: {', '.join(allowed)}"
+        )
+    return requested
+
+
+def page_headers(
+    rows: list,
+    limit: Optional[int],
+    key: Callable[[Any], Sequence[Any]]
+) -> Dict[str, str]:
+    """Nagłówek z kursorem następnej strony (jeśli strona jest pełna)"""
+    headers = {}
+    if limit and len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(jsonable_encoder(key(rows[-1])))
+    return headers
+
+
+def page_response(
+    response: Response,
+    rows: list,
+    limit: Optional[int],
+    key: Callable[[Any], Sequence[Any]],
+    fields: Optional[List[str]] = None
+):
+    """
+    Ustawia nagłówek z kursorem następnej strony (jeśli strona jest pełna).
+    Dla projekcji zwraca od razu JSONResponse z płaskimi wierszami,
+    w przeciwnym razie wiersze przechodzą przez response_model endpointu.
+    """
+    headers = page_headers(rows, limit, key)
+
+    if fields is None:
+        response.headers.update(headers)
+        return rows
+
+    content = [{f: getattr(row, f) for f in fields} for row in rows]
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
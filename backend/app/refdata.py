@@ -0,0 +1,134 @@
+"""
+Cache danych referencyjnych (sale, przedmioty, użytkownicy demo) w pamięci procesu.
+
+Te listy prawie się nie zmieniają, a frontend pobiera je przy każdym
+zamontowaniu formularzy. Cache trzyma wiersze (odłączone od sesji) razem
+z gotowym ciałem odpowiedzi JSON i jego ETagiem; unieważniają go funkcje
+zapisu w `crud` i import masowy, a przy kilku instancjach backendu (PostgreSQL)
+także upływ REFDATA_MAX_AGE sekund (domyślnie 30). Klient z aktualnym ETagiem
+dostaje 304.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import cache_max_age
+
+# Klient może trzymać odpowiedź, ale przed użyciem musi ją zweryfikować (ETag)
+CACHE_CONTROL = "no-cache"
+SHARED_MAX_AGE = 30
+
+DATASETS = {
+    "rooms": (models.Room, models.Room.nazwa, schemas.RoomResponse),
+    "subjects": (models.Subject, models.Subject.id, schemas.SubjectResponse),
+    "demo_users": (models.DemoUser, models.DemoUser.id, schemas.DemoUserResponse),
+}
+
+
+def _body(rows: list, schema) -> bytes:
+    content = jsonable_encoder([schema.model_validate(row) for row in rows])
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class CachedDataset:
+    def __init__(self, name: str, rows: list):
+        model, key, schema = DATASETS[name]
+        self.name = name
+        self.rows = rows
+        self.by_key = {getattr(row, key.key): row for row in rows}
+        self.body = _body(rows, schema)
+        self.etag = make_etag(self.body)
+        self.loaded_at = time.monotonic()
+
+    def response(self, request: Request, predicate: Optional[Callable] = None) -> Response:
+        """Odpowiedź z całą listą (lub jej przefiltrowaną częścią) albo 304"""
+        body, etag = self.body, self.etag
+        if predicate is not None:
+            _, _, schema = DATASETS[self.name]
+            body = _body([row for row in self.rows if predicate(row)], schema)
+            etag = make_etag(body)
+        return conditional_response(request, body, etag)
+
+
+def conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[str, CachedDataset] = {}
+        # Numer generacji per zbiór - ładowanie, w trakcie którego cache
+        # unieważniono, nie zapisuje nieaktualnych danych
+        self._generation: Dict[str, int] = {name: 0 for name in DATASETS}
+        # Zapisy innych instancji backendu widać po REFDATA_MAX_AGE
+        self.max_age = cache_max_age("REFDATA_MAX_AGE", SHARED_MAX_AGE)
+
+    @staticmethod
+    def _query(name: str):
+        model, key, _ = DATASETS[name]
+        return select(model).order_by(key)
+
+    def _fresh(self, name: str) -> Optional[CachedDataset]:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if self.max_age > 0 and time.monotonic() - entry.loaded_at > self.max_age:
+            return None
+        return entry
+
+    def _store(self, name: str, generation: int, rows: List) -> CachedDataset:
+        entry = CachedDataset(name, rows)
+        with self._lock:
+            if self._generation[name] == generation:
+                self._entries[name] = entry
+        return entry
+
+    def get(self, db: Session, name: str) -> CachedDataset:
+        with self._lock:
+            entry = self._fresh(name)
+            generation = self._generation[name]
+        if entry is not None:
+            return entry
+        rows = db.scalars(self._query(name)).all()
+        for row in rows:
+            db.expunge(row)
+        return self._store(name, generation, rows)
+
+    async def get_async(self, db: AsyncSession, name: str) -> CachedDataset:
+        with self._lock:
+            entry = self._fresh(name)
+            generation = self._generation[name]
+        if entry is not None:
+            return entry
+        rows = (await db.execute(self._query(name))).scalars().all()
+        for row in rows:
+            db.expunge(row)
+        return self._store(name, generation, rows)
+
+    def invalidate(self, *names: str) -> None:
+        """Unieważnia wskazane zbiory (bez argumentów - wszystkie)"""
+        with self._lock:
+            for name in names or DATASETS:
+                self._entries.pop(name, None)
+                self._generation[name] += 1
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app import bulk
+from app.database import get_db, ReadSessionLocal
+
+router = APIRouter(prefix="/api", tags=["bulk"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _validate(entity: str, fmt: str) -> None:
+    if entity not in bulk.ENTITIES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Nieznany typ danych '{entity}'. Dozwolone: {', '.join(bulk.ENTITIES)}"
+        )
+    if fmt not in bulk.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Nieznany format '{fmt}'. Dozwolone: {', '.join(bulk.FORMATS)}"
+        )
+
+
+@router.post("/import/{entity}")
+def import_data(
+    entity: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Masowy import przedmiotów, egzaminów, sal lub terminów z pliku CSV/JSONL (admin)
+
+    Wiersze zapisywane są partiami; błędne wiersze są pomijane i raportowane.
+    """
+    fmt = bulk.detect_format(file.filename, format)
+    _validate(entity, fmt)
+    return bulk.import_rows(db, entity, file.file, fmt)
+
+
+@router.get("/export/{entity}")
+def export_data(entity: str, format: str = Query("csv")):
+    """Strumieniowy eksport przedmiotów, egzaminów, sal lub terminów do CSV/JSONL"""
+    _validate(entity, format)
+
+    def stream():
+        with ReadSessionLocal() as db:
+            yield from bulk.export_rows(db, entity, format)
+
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'}
+    )
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app import schemas, crud, models
-from app.database import get_db
+from app import schemas, crud, models, pagination, crud_async, serialization
+from app.database import AsyncSessionLocal, get_db, get_async_db
 
 router = APIRouter(prefix="/api/exams", tags=["exams"])
 
@@ -10,25 +12,59 @@ router = APIRouter(prefix="/api/exams", tags=["exams"])
 @router.post("/", response_model=schemas.ExamResponse)
 def create_exam(exam: schemas.ExamCreate, db: Session = Depends(get_db)):
     """Tworzy nowy egzamin (admin)"""
-    return crud.create_exam(db, exam)
+    try:
+        return crud.create_exam(db, exam)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Egzamin przedmiotu {exam.subject_id} prowadzony przez {exam.prowadzacy_name} już istnieje"
+        )
 
 
 @router.get("/", response_model=List[schemas.ExamResponse])
-def list_exams(
+async def list_exams(
+    response: Response,
     kierunek: Optional[str] = Query(None),
     typ_studiow: Optional[models.TypStudiow] = Query(None),
     rok: Optional[int] = Query(None),
     prowadzacy_name: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista egzaminów z filtrowaniem"""
-    return crud.get_exams(db, kierunek, typ_studiow, rok, prowadzacy_name)
+    """Lista egzaminów z filtrowaniem (paginacja kursorowa po id, projekcja fields=)"""
+    after = pagination.decode_cursor(cursor, len(crud.EXAM_KEYS))
+    projection = pagination.parse_fields(fields, crud.model_fields(models.Exam))
+    if projection is None and limit is None:
+        # Cała lista: wiersze strumieniowane z kursora bazy, bez buforowania wyniku
+        query = crud.exam_rows_query(kierunek, typ_studiow, rok, prowadzacy_name, after=after)
+        return serialization.cursor_json_array_response(
+            AsyncSessionLocal, query, serialization.exam_dicts, headers={}
+        )
+    if projection is None:
+        # Strona: krotki kolumn kodowane wprost do JSON (app.serialization),
+        # pobrane w całości, bo kursor następnej strony idzie w nagłówku
+        rows = await crud_async.get_exam_rows(
+            db, kierunek, typ_studiow, rok, prowadzacy_name, after=after, limit=limit
+        )
+        headers = pagination.page_headers(rows, limit, key=lambda r: (r.id,))
+        return serialization.json_array_response(serialization.exam_dicts(rows), headers)
+
+    exams = await crud_async.get_exams(
+        db, kierunek, typ_studiow, rok, prowadzacy_name,
+        after=after, limit=limit, fields=projection
+    )
+    return pagination.page_response(
+        response, exams, limit, key=lambda e: (e.id,), fields=projection
+    )
 
 
 @router.get("/{exam_id}", response_model=schemas.ExamResponse)
-def get_exam(exam_id: int, db: Session = Depends(get_db)):
+async def get_exam(exam_id: int, db: AsyncSession = Depends(get_async_db)):
     """Szczegóły egzaminu"""
-    exam = crud.get_exam(db, exam_id)
+    exam = await crud_async.get_exam(db, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Egzamin nie znaleziony")
     return exam
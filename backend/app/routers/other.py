@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app import schemas, crud, models
-from app.database import get_db
+from app import schemas, crud, models, pagination, crud_async
+from app.database import get_db, get_read_db, get_async_db
+from app.occupancy import occupancy
+from app.refdata import reference_cache
 
 router = APIRouter(prefix="/api", tags=["other"])
 
@@ -15,13 +19,13 @@ def create_session_period(period: schemas.SessionPeriodCreate, db: Session = Dep
 
 
 @router.get("/session-periods", response_model=List[schemas.SessionPeriodResponse])
-def list_session_periods(db: Session = Depends(get_db)):
+async def list_session_periods(db: AsyncSession = Depends(get_async_db)):
     """Lista okresów sesji"""
-    return crud.get_session_periods(db)
+    return await crud_async.get_session_periods(db)
 
 
 @router.get("/session-periods/current", response_model=schemas.CurrentSessionResponse)
-def get_current_sessions(db: Session = Depends(get_db)):
+def get_current_sessions(db: Session = Depends(get_read_db)):
     """Pobiera aktualne/nadchodzące terminy sesji (zasadniczą i poprawkową)"""
     return crud.get_current_sessions(db)
 
@@ -30,25 +34,70 @@ def get_current_sessions(db: Session = Depends(get_db)):
 @router.post("/subjects", response_model=schemas.SubjectResponse)
 def create_subject(subject: schemas.SubjectCreate, db: Session = Depends(get_db)):
     """Dodaje przedmiot (admin)"""
-    return crud.create_subject(db, subject)
+    try:
+        return crud.create_subject(db, subject)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Przedmiot '{subject.nazwa}' ({subject.kierunek}, {subject.typ_studiow.value}, rok {subject.rok}) już istnieje"
+        )
 
 
 @router.get("/subjects", response_model=List[schemas.SubjectResponse])
-def list_subjects(
+async def list_subjects(
+    request: Request,
+    response: Response,
     kierunek: Optional[str] = Query(None),
     typ_studiow: Optional[models.TypStudiow] = Query(None),
     rok: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista przedmiotów z filtrowaniem"""
-    return crud.get_subjects(db, kierunek, typ_studiow, rok)
+    """Lista przedmiotów z filtrowaniem (paginacja kursorowa po id, projekcja fields=)"""
+    if cursor is None and limit is None and fields is None:
+        subjects = await reference_cache.get_async(db, "subjects")
+        if not (kierunek or typ_studiow or rok):
+            return subjects.response(request)
+        return subjects.response(request, lambda s: (
+            (not kierunek or s.kierunek == kierunek)
+            and (not typ_studiow or s.typ_studiow == typ_studiow)
+            and (not rok or s.rok == rok)
+        ))
+
+    after = pagination.decode_cursor(cursor, len(crud.SUBJECT_KEYS))
+    projection = pagination.parse_fields(fields, crud.model_fields(models.Subject))
+    subjects = await crud_async.get_subjects(
+        db, kierunek, typ_studiow, rok,
+        after=after, limit=limit, fields=projection
+    )
+    return pagination.page_response(
+        response, subjects, limit, key=lambda s: (s.id,), fields=projection
+    )
 
 
 # Demo Users
 @router.get("/demo-users", response_model=List[schemas.DemoUserResponse])
-def list_demo_users(db: Session = Depends(get_db)):
-    """Lista przykładowych użytkowników do dropdowna"""
-    return crud.get_demo_users(db)
+async def list_demo_users(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Lista przykładowych użytkowników do dropdowna (paginacja kursorowa po id)"""
+    if cursor is None and limit is None and fields is None:
+        return (await reference_cache.get_async(db, "demo_users")).response(request)
+
+    after = pagination.decode_cursor(cursor, len(crud.DEMO_USER_KEYS))
+    projection = pagination.parse_fields(fields, crud.model_fields(models.DemoUser))
+    users = await crud_async.get_demo_users(db, after=after, limit=limit, fields=projection)
+    return pagination.page_response(
+        response, users, limit, key=lambda u: (u.id,), fields=projection
+    )
 
 
 # Admin - usuwanie duplikatów
@@ -61,3 +110,14 @@ def remove_duplicates(db: Session = Depends(get_db)):
         "message": f"Usunięto {total} duplikatów",
         "details": result
     }
+
+
+@router.get("/admin/occupancy-check")
+def check_occupancy_index(
+    rebuild: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Porównuje indeks zajętości w pamięci z bazą (opcjonalnie go przebudowuje)"""
+    if rebuild:
+        occupancy.load(db)
+    return occupancy.check_consistency(db)
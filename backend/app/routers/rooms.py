@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app import schemas, crud, models
-from app.database import get_db
+from app import schemas, crud, models, pagination, crud_async
+from app.database import get_db, get_read_db, get_async_db
+from app.refdata import reference_cache
 
 router = APIRouter(prefix="/api", tags=["rooms"])
 
@@ -15,19 +18,38 @@ def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail=f"Sala '{room.nazwa}' już istnieje")
 
-    return crud.create_room(db, room)
+    try:
+        return crud.create_room(db, room)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Sala '{room.nazwa}' już istnieje")
 
 
 @router.get("/rooms", response_model=List[schemas.RoomResponse])
-def list_rooms(db: Session = Depends(get_db)):
-    """Pobiera listę wszystkich sal"""
-    return crud.get_rooms(db)
+async def list_rooms(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Pobiera listę sal (paginacja kursorowa po nazwie, projekcja fields=)"""
+    if cursor is None and limit is None and fields is None:
+        return (await reference_cache.get_async(db, "rooms")).response(request)
+
+    after = pagination.decode_cursor(cursor, len(crud.ROOM_KEYS))
+    projection = pagination.parse_fields(fields, crud.model_fields(models.Room))
+    rooms = await crud_async.get_rooms(db, after=after, limit=limit, fields=projection)
+    return pagination.page_response(
+        response, rooms, limit, key=lambda r: (r.nazwa,), fields=projection
+    )
 
 
 @router.get("/rooms/{nazwa}", response_model=schemas.RoomResponse)
-def get_room(nazwa: str, db: Session = Depends(get_db)):
+async def get_room(nazwa: str, db: AsyncSession = Depends(get_async_db)):
     """Pobiera szczegóły sali po nazwie"""
-    room = crud.get_room_by_name(db, nazwa)
+    room = await crud_async.get_room_by_name(db, nazwa)
     if not room:
         raise HTTPException(status_code=404, detail=f"Sala '{nazwa}' nie została znaleziona")
     return room
@@ -36,7 +58,7 @@ def get_room(nazwa: str, db: Session = Depends(get_db)):
 @router.post("/rooms/check-availability", response_model=schemas.RoomAvailabilityResponse)
 def check_room_availability(
     request: schemas.RoomAvailabilityRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Sprawdza dostępność sali dla określonej liczby osób w danym terminie
@@ -51,7 +73,8 @@ def check_room_availability(
         sala=request.sala,
         data=request.data,
         godzina=request.godzina,
-        liczba_osob=request.liczba_osob
+        liczba_osob=request.liczba_osob,
+        czas_trwania=request.czas_trwania
     )
 
     return schemas.RoomAvailabilityResponse(
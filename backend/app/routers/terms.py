@@ -1,11 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import re
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app import schemas, crud, models
-from app.database import get_db
+from app import schemas, crud, models, pagination, scheduling, crud_async, timetable, serialization
+from app.database import AsyncSessionLocal, get_db, get_read_db, get_async_db
+from app.changefeed import change_feed
+from app.intervals import DEFAULT_DURATION
+from app.refdata import conditional_response
 
 router = APIRouter(prefix="/api/exam-terms", tags=["exam-terms"])
 
+NO_SESSION_MESSAGE = "Brak zdefiniowanych okresów sesji - nie można zaplanować egzaminu"
+
+
+def _session_periods(sessions: dict) -> list:
+    """Istniejące okresy bieżącej sesji jako pary (nazwa, okres)"""
+    return [
+        (name, sessions[name]) for name in ("zasadnicza", "poprawkowa")
+        if sessions[name] is not None
+    ]
+
 
 @router.post("/", response_model=schemas.ExamTermResponse)
 def create_exam_term(term: schemas.ExamTermCreate, db: Session = Depends(get_db)):
@@ -19,16 +38,18 @@ def create_exam_term(term: schemas.ExamTermCreate, db: Session = Depends(get_db)
     # Walidacja: czy data mieści się w terminie sesji (admin może obejść)
     if term.proposed_by_role != models.UserRole.ADMIN:
         if not crud.is_date_in_session(db, term.data):
-            sessions = crud.get_current_sessions(db)
+            periods = _session_periods(crud.get_current_sessions(db))
             raise HTTPException(
                 status_code=400,
-                detail=f"Termin egzaminu musi być w okresie sesji. "
-                       f"Sesja zasadnicza: {sessions['zasadnicza'].data_start} - {sessions['zasadnicza'].data_end}, "
-                       f"Sesja poprawkowa: {sessions['poprawkowa'].data_start} - {sessions['poprawkowa'].data_end}"
+                detail="Termin egzaminu musi być w okresie sesji. " + ", ".join(
+                    f"Sesja {name}: {period.data_start} - {period.data_end}" for name, period in periods
+                ) if periods else NO_SESSION_MESSAGE
             )
 
     # Walidacja: czy sala jest wolna
-    if not crud.check_room_availability(db, term.data, term.godzina, term.sala):
+    if not crud.check_room_availability(
+        db, term.data, term.godzina, term.sala, czas_trwania=term.czas_trwania
+    ):
         raise HTTPException(
             status_code=400,
             detail=f"Sala {term.sala} jest już zajęta w dniu {term.data} o godzinie {term.godzina}"
@@ -47,25 +68,261 @@ def create_exam_term(term: schemas.ExamTermCreate, db: Session = Depends(get_db)
             detail=f"Studenci {exam.subject.kierunek} ({exam.subject.typ_studiow}, rok {exam.subject.rok}) mają już egzamin w dniu {term.data}"
         )
 
-    return crud.create_exam_term(db, term)
+    try:
+        return crud.create_exam_term(db, term)
+    except crud.TermConflict as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError as e:
+        db.rollback()
+        if crud.room_slot_violation(e):
+            detail = f"Sala {term.sala} jest już zajęta w dniu {term.data} o godzinie {term.godzina}"
+        else:
+            detail = f"Ten egzamin ma już termin w dniu {term.data} o godzinie {term.godzina} w sali {term.sala}"
+        raise HTTPException(status_code=400, detail=detail)
 
 
 @router.get("/", response_model=List[schemas.ExamTermResponse])
-def list_exam_terms(
+async def list_exam_terms(
+    response: Response,
     kierunek: Optional[str] = Query(None),
     typ_studiow: Optional[models.TypStudiow] = Query(None),
     rok: Optional[int] = Query(None),
     status: Optional[models.TermStatus] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    fields: Optional[str] = Query(None),
+    since: Optional[int] = Query(None, ge=0, description="Wersja z poprzedniej synchronizacji"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista terminów egzaminów z filtrowaniem"""
-    return crud.get_exam_terms(db, kierunek, typ_studiow, rok, status)
+    """
+    Lista terminów egzaminów z filtrowaniem
+
+    Paginacja kursorowa po (data, godzina, id): kursor następnej strony
+    zwracany jest w nagłówku X-Next-Cursor. Parametr fields=id,data,...
+    zwraca płaskie wiersze bez zagnieżdżonego exam.subject.
+
+    Synchronizacja przyrostowa: since=<wersja> zwraca {version, changed, deleted}
+    - terminy zmienione po tej wersji (strony po (row_version, id)) i id
+    usuniętych. Bieżąca wersja listy jest w nagłówku X-Row-Version.
+    """
+    if since is not None:
+        if fields:
+            raise HTTPException(status_code=400, detail="Parametr since nie obsługuje projekcji fields")
+        after = pagination.decode_cursor(cursor, len(crud.TERM_CHANGE_KEYS))
+        changes = await crud_async.get_exam_term_changes(
+            db, since, kierunek, typ_studiow, rok, status, after=after, limit=limit
+        )
+        headers = {crud.ROW_VERSION_HEADER: str(changes["version"])}
+        changed = changes["changed"]
+        if limit and len(changed) == limit:
+            headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(
+                [changed[-1].row_version, changed[-1].id]
+            )
+        content = schemas.ExamTermChangesResponse.model_validate(changes)
+        return JSONResponse(content=jsonable_encoder(content), headers=headers)
+
+    after = pagination.decode_cursor(cursor, len(crud.EXAM_TERM_KEYS))
+    projection = pagination.parse_fields(fields, crud.model_fields(models.ExamTerm))
+    # Wersja przed wierszami - klient może od niej zacząć synchronizację
+    version = str(await crud_async.get_term_version(db))
+    if projection is None and limit is None:
+        # Cała lista: wiersze strumieniowane z kursora bazy, bez buforowania wyniku
+        query = crud.exam_term_rows_query(kierunek, typ_studiow, rok, status, after=after)
+        return serialization.cursor_json_array_response(
+            AsyncSessionLocal, query, serialization.exam_term_dicts,
+            headers={crud.ROW_VERSION_HEADER: version}
+        )
+    if projection is None:
+        # Strona: krotki kolumn kodowane wprost do JSON (app.serialization),
+        # pobrane w całości, bo kursor następnej strony idzie w nagłówku
+        rows = await crud_async.get_exam_term_rows(
+            db, kierunek, typ_studiow, rok, status, after=after, limit=limit
+        )
+        headers = pagination.page_headers(rows, limit, key=lambda r: (r.data, r.godzina, r.id))
+        headers[crud.ROW_VERSION_HEADER] = version
+        return serialization.json_array_response(serialization.exam_term_dicts(rows), headers)
+
+    terms = await crud_async.get_exam_terms(
+        db, kierunek, typ_studiow, rok, status,
+        after=after, limit=limit, fields=projection
+    )
+    # Projekcja fields= zwraca własny JSONResponse
+    result = pagination.page_response(
+        response, terms, limit,
+        key=lambda t: (t.data, t.godzina, t.id),
+        fields=projection
+    )
+    result.headers[crud.ROW_VERSION_HEADER] = version
+    return result
+
+
+@router.post("/solve", response_model=schemas.SolveSessionResponse)
+def solve_session(request: schemas.SolveSessionRequest, db: Session = Depends(get_db)):
+    """
+    Automatycznie układa terminy wszystkich niezaplanowanych egzaminów w sesji
+
+    Respektuje daty sesji, jeden egzamin rocznika dziennie, zajętość i pojemność sal.
+    Domyślnie działa jako dry run; commit=true zapisuje przydział jako
+    propozycje (PROPOSED) w jednej transakcji.
+    """
+    if request.sesja not in scheduling.SESSION_CHOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Nieznana sesja '{request.sesja}'. Dozwolone: {', '.join(scheduling.SESSION_CHOICES)}"
+        )
+
+    result = scheduling.solve_session(
+        db,
+        sesja=request.sesja,
+        liczba_osob=request.liczba_osob,
+        liczba_osob_per_exam=request.liczba_osob_per_exam,
+        hours=request.godziny,
+        czas_trwania=request.czas_trwania,
+        spread=request.spread,
+        exam_ids=request.exam_ids
+    )
+
+    term_ids = []
+    if request.commit and result["assignments"]:
+        try:
+            term_ids = crud.create_exam_terms(db, [
+                schemas.ExamTermCreate(
+                    exam_id=a["exam_id"],
+                    data=a["data"],
+                    godzina=a["godzina"],
+                    sala=a["sala"],
+                    czas_trwania=request.czas_trwania,
+                    proposed_by_role=request.proposed_by_role,
+                    proposed_by_name=request.proposed_by_name
+                )
+                for a in result["assignments"]
+            ])
+        except (crud.TermConflict, IntegrityError):
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail="Przydział koliduje z terminem zapisanym w międzyczasie - uruchom układanie ponownie"
+            )
+
+    return schemas.SolveSessionResponse(
+        committed=request.commit,
+        assignments=result["assignments"],
+        unassigned=result["unassigned"],
+        term_ids=term_ids
+    )
+
+
+@router.get("/suggestions", response_model=schemas.SlotSuggestionsResponse)
+def suggest_free_slots(
+    exam_id: int = Query(...),
+    liczba_osob: int = Query(..., ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    godziny: Optional[str] = Query(None, description="Godziny rozdzielone przecinkami, np. 08:00,12:00"),
+    czas_trwania: int = Query(DEFAULT_DURATION, ge=1, le=24 * 60),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Proponuje najlepsze wolne terminy (data, godzina, sala) dla egzaminu
+
+    Przeszukuje wszystkie dni sesji zasadniczej i poprawkowej, skonfigurowane
+    godziny i sale o wystarczającej pojemności, z pominięciem kolizji sal i roczników.
+    """
+    exam = crud.get_exam(db, exam_id)
+    if not exam:
+        raise HTTPException(status_code=404, detail="Egzamin nie znaleziony")
+
+    hours = [h.strip() for h in godziny.split(",") if h.strip()] if godziny else None
+    invalid = [h for h in hours or [] if not re.match(schemas.HOUR_PATTERN, h)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Nieprawidłowe godziny: {', '.join(invalid)}")
+    return scheduling.find_free_slots(db, exam, liczba_osob, limit, hours, czas_trwania)
+
+
+@router.get("/timetable")
+async def get_timetable(
+    request: Request,
+    layout: str = Query("rooms", description="Wiersze siatki: rooms lub cohorts"),
+    kierunek: Optional[str] = Query(None),
+    typ_studiow: Optional[models.TypStudiow] = Query(None),
+    rok: Optional[int] = Query(None),
+    status: Optional[models.TermStatus] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Harmonogram terminów jako siatka: daty x godziny x sale (layout=rooms)
+    lub daty x roczniki (layout=cohorts)
+
+    Komórki to listy indeksów do osi i słowników (kolejność w cell_fields).
+    Odpowiedź ma ETag - przy niezmienionych terminach zwracane jest 304.
+    """
+    if layout not in timetable.LAYOUTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Nieznany układ '{layout}'. Dozwolone: {', '.join(timetable.LAYOUTS)}"
+        )
+    entry = await crud_async.get_timetable(db, layout, kierunek, typ_studiow, rok, status)
+    return conditional_response(request, entry.body, entry.etag)
+
+
+async def _term_events(since: int, limit: int) -> dict:
+    # Strumień trwa długo - każdy odczyt na osobnej, krótkiej sesji
+    async with AsyncSessionLocal() as db:
+        return await crud_async.get_term_events(db, since, limit)
+
+
+async def _term_version() -> int:
+    async with AsyncSessionLocal() as db:
+        return await crud_async.get_term_version(db)
+
+
+@router.get("/changes")
+async def stream_changes(
+    since: Optional[str] = Query(None, description="Identyfikator (wersja) ostatniego znanego zdarzenia"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Strumień zmian terminów (Server-Sent Events): created / approved / rejected / updated / deleted
+
+    Zdarzenia czytane są z bazy (row_version i exam_term_tombstones), a ich
+    identyfikator to wersja terminów. Po ponownym połączeniu (Last-Event-ID
+    lub since=) strumień wznawia się od brakujących zmian na dowolnej instancji
+    backendu; zdarzenie "reset" oznacza, że listę trzeba pobrać od nowa.
+    """
+    return StreamingResponse(
+        change_feed.stream(last_event_id or since, _term_events, _term_version),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.put("/bulk", response_model=schemas.ExamTermBulkApproveResponse)
+def bulk_approve_exam_terms(request: schemas.ExamTermBulkApprove, db: Session = Depends(get_db)):
+    """
+    Zatwierdza lub odrzuca wiele terminów w jednej transakcji
+
+    Przyjmuje listę decyzji (term_id, status) albo filtr z jednym statusem dla
+    wszystkich pasujących terminów. Zatwierdzane terminy walidowane są razem
+    (kolizje sal i roczników); wynik zwracany jest osobno dla każdego terminu.
+    """
+    if (request.filter is None) == (not request.decisions):
+        raise HTTPException(status_code=400, detail="Podaj listę decyzji albo filtr terminów")
+    if request.filter is not None and request.status is None:
+        raise HTTPException(status_code=400, detail="Filtr wymaga statusu (approved lub rejected)")
+    try:
+        return crud.bulk_update_exam_terms(db, request)
+    except IntegrityError as e:
+        db.rollback()
+        if crud.room_slot_violation(e):
+            detail = "Sala jest już zajęta przez inny termin w tym samym dniu i godzinie"
+        else:
+            detail = "Ten egzamin ma już aktywny termin w tym samym dniu, godzinie i sali"
+        raise HTTPException(status_code=400, detail=detail)
 
 
 @router.get("/{term_id}", response_model=schemas.ExamTermResponse)
-def get_exam_term(term_id: int, db: Session = Depends(get_db)):
+async def get_exam_term(term_id: int, db: AsyncSession = Depends(get_async_db)):
     """Szczegóły terminu egzaminu"""
-    term = crud.get_exam_term(db, term_id)
+    term = await crud_async.get_exam_term(db, term_id)
     if not term:
         raise HTTPException(status_code=404, detail="Termin nie znaleziony")
     return term
@@ -78,7 +335,18 @@ def approve_exam_term(
     db: Session = Depends(get_db)
 ):
     """Zatwierdza lub odrzuca propozycję terminu"""
-    term = crud.update_exam_term(db, term_id, approval)
+    try:
+        term = crud.update_exam_term(db, term_id, approval)
+    except crud.TermConflict as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError as e:
+        db.rollback()
+        if crud.room_slot_violation(e):
+            term = crud.get_exam_term(db, term_id)
+            detail = f"Sala {term.sala} jest już zajęta w dniu {term.data} o godzinie {term.godzina}"
+        else:
+            detail = "Ten egzamin ma już aktywny termin w tym samym dniu, godzinie i sali"
+        raise HTTPException(status_code=400, detail=detail)
     if not term:
         raise HTTPException(status_code=404, detail="Termin nie znaleziony")
     return term
@@ -87,13 +355,16 @@ def approve_exam_term(
 @router.get("/validation/check-room", response_model=schemas.ValidationResponse)
 def validate_room(
     data: str = Query(...),
-    godzina: str = Query(...),
+    godzina: str = Query(..., pattern=schemas.HOUR_PATTERN),
     sala: str = Query(...),
+    czas_trwania: int = Query(DEFAULT_DURATION, ge=1, le=24 * 60),
     exclude_term_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Sprawdza dostępność sali"""
-    is_available = crud.check_room_availability(db, data, godzina, sala, exclude_term_id)
+    """Sprawdza dostępność sali (kolizja przedziału z innymi terminami w sali)"""
+    is_available = crud.check_room_availability(
+        db, data, godzina, sala, exclude_term_id, czas_trwania
+    )
     return schemas.ValidationResponse(
         valid=is_available,
         message=None if is_available else f"Sala {sala} jest już zajęta"
@@ -107,7 +378,7 @@ def validate_students(
     typ_studiow: models.TypStudiow = Query(...),
     rok: int = Query(...),
     exclude_term_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Sprawdza czy studenci nie mają kolizji egzaminów"""
     is_available = crud.check_student_availability(
@@ -119,20 +390,42 @@ def validate_students(
     )
 
 
+@router.post("/validation/check-slots", response_model=schemas.SlotValidationResponse)
+def validate_slots(request: schemas.SlotValidationRequest, db: Session = Depends(get_read_db)):
+    """
+    Waliduje wiele kandydatów (data, godzina, sala) dla egzaminu w jednym zapytaniu
+
+    Dla każdego kandydata zwraca: istnienie i pojemność sali, zajętość sali,
+    kolizje studentów oraz zgodność z okresem sesji (admin może obejść).
+    """
+    exam = crud.get_exam(db, request.exam_id)
+    if not exam:
+        raise HTTPException(status_code=404, detail="Egzamin nie znaleziony")
+
+    results = crud.check_slots(
+        db,
+        exam,
+        request.slots,
+        request.liczba_osob,
+        skip_session_check=request.proposed_by_role == models.UserRole.ADMIN
+    )
+    return schemas.SlotValidationResponse(exam_id=exam.id, results=results)
+
+
 @router.get("/validation/check-session-date", response_model=schemas.ValidationResponse)
 def validate_session_date(
     data: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Sprawdza czy data mieści się w terminie sesji"""
     is_valid = crud.is_date_in_session(db, data)
     if is_valid:
         return schemas.ValidationResponse(valid=True, message=None)
 
-    sessions = crud.get_current_sessions(db)
+    periods = _session_periods(crud.get_current_sessions(db))
     return schemas.ValidationResponse(
         valid=False,
-        message=f"Data musi być w terminie sesji: "
-                f"{sessions['zasadnicza'].data_start} - {sessions['zasadnicza'].data_end} (zasadnicza) lub "
-                f"{sessions['poprawkowa'].data_start} - {sessions['poprawkowa'].data_end} (poprawkowa)"
+        message="Data musi być w terminie sesji: " + " lub ".join(
+            f"{period.data_start} - {period.data_end} ({name})" for name, period in periods
+        ) if periods else NO_SESSION_MESSAGE
     )
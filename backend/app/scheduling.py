@@ -0,0 +1,298 @@
+"""
+Wyszukiwanie wolnych terminów egzaminów.
+
+Zajętość sal trzymana jest jako mapy bitowe: dla każdej sali jedna liczba,
+w której bit (indeks_dnia * liczba_godzin + indeks_godziny) oznacza zajęty
+slot. Slot to przedział [godzina, godzina + czas_trwania) - jest zajęty, gdy
+nachodzi na przedział dowolnego terminu w sali. Mapy budowane są z indeksu
+zajętości w pamięci i cache'owane do następnej zmiany indeksu, więc
+wyszukiwanie nie odpytuje bazy per kandydat.
+"""
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.intervals import DEFAULT_DURATION, overlaps, to_minutes
+from app.occupancy import occupancy
+
+# Godziny rozpoczęcia egzaminów rozważane przy wyszukiwaniu
+DEFAULT_HOURS: Tuple[str, ...] = ("08:00", "10:00", "12:00", "14:00", "16:00", "18:00")
+
+# Odstęp (w dniach) od innych egzaminów rocznika, powyżej którego nie ma różnicy
+MAX_SPREAD_DAYS = 7
+
+
+def session_days(sessions: dict) -> List[Tuple[str, str]]:
+    """Lista (data, nazwa_sesji) dla wszystkich dni sesji zasadniczej i poprawkowej"""
+    days = []
+    for nazwa in ("zasadnicza", "poprawkowa"):
+        period = sessions.get(nazwa)
+        if period is None:
+            continue
+        day = date.fromisoformat(period.data_start)
+        end = date.fromisoformat(period.data_end)
+        while day <= end:
+            days.append((day.isoformat(), nazwa))
+            day += timedelta(days=1)
+    return days
+
+
+class SlotGrid:
+    """Siatka slotów (dni x godziny) z mapami bitowymi zajętości sal"""
+
+    def __init__(
+        self, days: Sequence[str], hours: Sequence[str], czas_trwania: int = DEFAULT_DURATION
+    ):
+        self.days = list(days)
+        self.hours = list(hours)
+        self.day_index = {d: i for i, d in enumerate(self.days)}
+        self.spans = [(to_minutes(h), to_minutes(h) + czas_trwania) for h in self.hours]
+        self.room_busy: Dict[str, int] = {}
+
+    def bit(self, day_idx: int, hour_idx: int) -> int:
+        return 1 << (day_idx * len(self.hours) + hour_idx)
+
+    def mark(self, data: str, start: int, end: int, sala: str) -> None:
+        """Zaznacza jako zajęte sloty sali nachodzące na przedział [start, end)"""
+        day_idx = self.day_index.get(data)
+        if day_idx is None:
+            return
+        busy = self.room_busy.get(sala, 0)
+        for hour_idx, (slot_start, slot_end) in enumerate(self.spans):
+            if overlaps(start, end, slot_start, slot_end):
+                busy |= self.bit(day_idx, hour_idx)
+        self.room_busy[sala] = busy
+
+    def is_free(self, sala: str, day_idx: int, hour_idx: int) -> bool:
+        return not self.room_busy.get(sala, 0) & self.bit(day_idx, hour_idx)
+
+
+_grid_cache: Dict[tuple, Tuple[int, SlotGrid]] = {}
+_grid_lock = threading.Lock()
+
+
+def get_slot_grid(
+    db: Session, days: Sequence[str], hours: Sequence[str], czas_trwania: int = DEFAULT_DURATION
+) -> SlotGrid:
+    """Siatka zajętości zbudowana z indeksu zajętości (cache do jego następnej zmiany)"""
+    occupancy.ensure_loaded(db)
+    key = (tuple(days), tuple(hours), czas_trwania)
+    with _grid_lock:
+        cached = _grid_cache.get(key)
+        if cached and cached[0] == occupancy.version:
+            return cached[1]
+
+    version = occupancy.version
+    grid = SlotGrid(days, hours, czas_trwania)
+    for data, sala, start, end in occupancy.occupied_rooms():
+        grid.mark(data, start, end, sala)
+
+    with _grid_lock:
+        _grid_cache.clear()
+        _grid_cache[key] = (version, grid)
+    return grid
+
+
+def _spread(day_ordinal: int, busy_ordinals: List[int]) -> int:
+    if not busy_ordinals:
+        return MAX_SPREAD_DAYS
+    return min(MAX_SPREAD_DAYS, min(abs(day_ordinal - o) for o in busy_ordinals))
+
+
+def find_free_slots(
+    db: Session,
+    exam: models.Exam,
+    liczba_osob: int,
+    limit: int = 10,
+    hours: Optional[Sequence[str]] = None,
+    czas_trwania: int = DEFAULT_DURATION
+) -> dict:
+    """
+    Zwraca najlepsze wolne (data, godzina, sala) dla egzaminu.
+
+    Pomijane są dni, w których rocznik ma już egzamin, oraz sale zajęte lub
+    za małe. Ranking: sesja zasadnicza przed poprawkową, największy odstęp od
+    innych egzaminów rocznika, najmniejsza wystarczająca sala, wcześniejszy
+    termin. Dla każdego (data, godzina) proponowana jest jedna sala, a kolejne
+    godziny tego samego dnia trafiają za pierwszymi propozycjami innych dni.
+    """
+    hours = list(hours or DEFAULT_HOURS)
+    days = session_days(crud.get_current_sessions(db))
+    grid = get_slot_grid(db, [d for d, _ in days], hours, czas_trwania)
+
+    rooms = (
+        db.query(models.Room)
+        .filter(models.Room.pojemnosc >= liczba_osob)
+        .order_by(models.Room.pojemnosc, models.Room.nazwa)
+        .all()
+    )
+
+    subject = exam.subject
+    busy_days = occupancy.cohort_dates(subject.kierunek, subject.typ_studiow, subject.rok)
+    busy_ordinals = [date.fromisoformat(d).toordinal() for d in busy_days]
+
+    candidates = []
+    searched = 0
+    for day_idx, (data, sesja) in enumerate(days):
+        if data in busy_days:
+            continue
+        spread = _spread(date.fromisoformat(data).toordinal(), busy_ordinals)
+        session_rank = 0 if sesja == "zasadnicza" else 1
+        found_in_day = 0
+        for hour_idx, godzina in enumerate(hours):
+            searched += 1
+            room = next((r for r in rooms if grid.is_free(r.nazwa, day_idx, hour_idx)), None)
+            if room is None:
+                continue
+            candidates.append((
+                (session_rank, found_in_day, -spread, room.pojemnosc, data, godzina),
+                {
+                    "data": data,
+                    "godzina": godzina,
+                    "sala": room.nazwa,
+                    "pojemnosc": room.pojemnosc,
+                    "sesja": sesja,
+                    "spread_days": spread,
+                },
+            ))
+            found_in_day += 1
+
+    candidates.sort(key=lambda c: c[0])
+    return {
+        "exam_id": exam.id,
+        "liczba_osob": liczba_osob,
+        "searched_slots": searched,
+        "suggestions": [c[1] for c in candidates[:limit]],
+    }
+
+
+SESSION_CHOICES = ("zasadnicza", "poprawkowa", "obie")
+
+
+def _cohort_key(subject: models.Subject) -> tuple:
+    return (subject.kierunek, subject.typ_studiow, subject.rok)
+
+
+def solve_session(
+    db: Session,
+    sesja: str = "zasadnicza",
+    liczba_osob: int = 30,
+    liczba_osob_per_exam: Optional[Dict[int, int]] = None,
+    hours: Optional[Sequence[str]] = None,
+    czas_trwania: int = DEFAULT_DURATION,
+    spread: bool = True,
+    exam_ids: Optional[List[int]] = None
+) -> dict:
+    """
+    Układa terminy (data, godzina, sala) dla wszystkich niezaplanowanych egzaminów.
+
+    Zachłanny przydział w kolejności "najbardziej ograniczone najpierw":
+    roczniki z największą liczbą egzaminów i egzaminy z największą liczbą
+    osób idą pierwsze. Dla każdego egzaminu wybierany jest dzień bez innego
+    egzaminu rocznika - przy spread=True najdalszy od jego pozostałych
+    egzaminów, potem najmniej obciążony - oraz najmniejsza wolna sala, która
+    pomieści studentów. Istniejące (nieodrzucone) terminy są respektowane.
+    """
+    hours = list(hours or DEFAULT_HOURS)
+    sizes = liczba_osob_per_exam or {}
+    days = [
+        d for d, nazwa in session_days(crud.get_current_sessions(db))
+        if sesja == "obie" or nazwa == sesja
+    ]
+    day_ordinals = [date.fromisoformat(d).toordinal() for d in days]
+
+    base_grid = get_slot_grid(db, days, hours, czas_trwania)
+    grid = SlotGrid(days, hours, czas_trwania)
+    grid.room_busy = dict(base_grid.room_busy)
+
+    rooms = db.query(models.Room).order_by(models.Room.pojemnosc, models.Room.nazwa).all()
+    exams = crud.get_unscheduled_exams(db, exam_ids)
+
+    cohort_exam_count: Dict[tuple, int] = {}
+    for exam in exams:
+        key = _cohort_key(exam.subject)
+        cohort_exam_count[key] = cohort_exam_count.get(key, 0) + 1
+
+    cohort_days: Dict[tuple, set] = {}
+    for key in cohort_exam_count:
+        busy = occupancy.cohort_dates(*key)
+        cohort_days[key] = {date.fromisoformat(d).toordinal() for d in busy}
+
+    day_load = [0] * len(days)
+    order = sorted(
+        exams,
+        key=lambda e: (
+            -cohort_exam_count[_cohort_key(e.subject)],
+            -sizes.get(e.id, liczba_osob),
+            e.id
+        )
+    )
+
+    assignments = []
+    unassigned = []
+    for exam in order:
+        size = sizes.get(exam.id, liczba_osob)
+        key = _cohort_key(exam.subject)
+        busy = cohort_days[key]
+
+        fitting = [r for r in rooms if r.pojemnosc >= size]
+        if not fitting:
+            unassigned.append({
+                "exam_id": exam.id,
+                "reason": f"Brak sali o pojemności co najmniej {size} miejsc"
+            })
+            continue
+
+        free_days = [i for i in range(len(days)) if day_ordinals[i] not in busy]
+        if not free_days:
+            unassigned.append({
+                "exam_id": exam.id,
+                "reason": "Rocznik ma już egzamin w każdym dniu sesji"
+            })
+            continue
+
+        if spread:
+            busy_ordinals = list(busy)
+            free_days.sort(key=lambda i: (
+                -_spread(day_ordinals[i], busy_ordinals),
+                day_load[i],
+                i
+            ))
+
+        placed = None
+        for day_idx in free_days:
+            for hour_idx, godzina in enumerate(hours):
+                room = next(
+                    (r for r in fitting if grid.is_free(r.nazwa, day_idx, hour_idx)), None
+                )
+                if room is not None:
+                    placed = (day_idx, hour_idx, godzina, room)
+                    break
+            if placed:
+                break
+
+        if placed is None:
+            unassigned.append({
+                "exam_id": exam.id,
+                "reason": "Brak wolnej sali w dniach dostępnych dla rocznika"
+            })
+            continue
+
+        day_idx, hour_idx, godzina, room = placed
+        start = to_minutes(godzina)
+        grid.mark(days[day_idx], start, start + czas_trwania, room.nazwa)
+        busy.add(day_ordinals[day_idx])
+        day_load[day_idx] += 1
+        assignments.append({
+            "exam_id": exam.id,
+            "data": days[day_idx],
+            "godzina": godzina,
+            "sala": room.nazwa,
+            "liczba_osob": size,
+        })
+
+    assignments.sort(key=lambda a: (a["data"], a["godzina"], a["sala"]))
+    return {"assignments": assignments, "unassigned": unassigned}
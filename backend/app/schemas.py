@@ -1,7 +1,12 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, Optional, List
 from datetime import datetime
 from app.models import UserRole, TypStudiow, TermStatus
+from app.intervals import DEFAULT_DURATION
+
+# HH:MM, 00:00-23:59
+HOUR_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+Hour = Annotated[str, Field(pattern=HOUR_PATTERN)]
 
 
 # Demo Users
@@ -57,7 +62,8 @@ class ExamResponse(BaseModel):
 class ExamTermCreate(BaseModel):
     exam_id: int
     data: str  # YYYY-MM-DD
-    godzina: str  # HH:MM
+    godzina: str = Field(..., pattern=HOUR_PATTERN)  # HH:MM
+    czas_trwania: int = Field(DEFAULT_DURATION, ge=1, le=24 * 60)  # minuty
     sala: str
     proposed_by_role: UserRole
     proposed_by_name: str
@@ -69,11 +75,50 @@ class ExamTermApprove(BaseModel):
     status: TermStatus  # APPROVED lub REJECTED
 
 
+class TermDecision(BaseModel):
+    term_id: int
+    status: TermStatus  # APPROVED lub REJECTED
+
+
+class ExamTermFilter(BaseModel):
+    kierunek: Optional[str] = None
+    typ_studiow: Optional[TypStudiow] = None
+    rok: Optional[int] = None
+    status: TermStatus = TermStatus.PROPOSED  # obecny status terminów
+
+
+class ExamTermBulkApprove(BaseModel):
+    approved_by_role: UserRole
+    approved_by_name: str
+    # Albo lista decyzji dla konkretnych terminów...
+    decisions: List[TermDecision] = Field([], max_length=5000)
+    # ...albo jeden status dla wszystkich terminów pasujących do filtra
+    filter: Optional[ExamTermFilter] = None
+    status: Optional[TermStatus] = None
+
+
+class TermDecisionResult(BaseModel):
+    term_id: int
+    status: TermStatus
+    ok: bool
+    message: Optional[str] = None
+
+
+class ExamTermBulkApproveResponse(BaseModel):
+    approved: int
+    rejected: int
+    failed: int
+    results: List[TermDecisionResult]
+
+
 class ExamTermResponse(BaseModel):
     id: int
     exam_id: int
     data: str
     godzina: str
+    czas_trwania: int = DEFAULT_DURATION
+    start_min: Optional[int] = None
+    end_min: Optional[int] = None
     sala: str
     proposed_by_role: UserRole
     proposed_by_name: str
@@ -81,12 +126,20 @@ class ExamTermResponse(BaseModel):
     approved_by_name: Optional[str]
     status: TermStatus
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    row_version: int = 0
     exam: ExamResponse
     
     class Config:
         from_attributes = True
 
 
+class ExamTermChangesResponse(BaseModel):
+    version: int
+    changed: List[ExamTermResponse]
+    deleted: List[int]
+
+
 # Session Periods
 class SessionPeriodCreate(BaseModel):
     semestr: str
@@ -112,6 +165,90 @@ class ValidationResponse(BaseModel):
     message: Optional[str] = None
 
 
+# Batch validation
+class SlotCandidate(BaseModel):
+    data: str  # YYYY-MM-DD
+    godzina: str = Field(..., pattern=HOUR_PATTERN)  # HH:MM
+    czas_trwania: int = Field(DEFAULT_DURATION, ge=1, le=24 * 60)
+    sala: str
+
+
+class SlotValidationRequest(BaseModel):
+    exam_id: int
+    liczba_osob: int
+    proposed_by_role: Optional[UserRole] = None
+    slots: List[SlotCandidate] = Field(..., max_length=500)
+
+
+class SlotValidationResult(BaseModel):
+    data: str
+    godzina: str
+    sala: str
+    valid: bool
+    room_exists: bool
+    capacity_ok: bool
+    room_free: bool
+    students_free: bool
+    in_session: bool
+    messages: List[str]
+
+
+class SlotValidationResponse(BaseModel):
+    exam_id: int
+    results: List[SlotValidationResult]
+
+
+# Free slot search
+class SlotSuggestion(BaseModel):
+    data: str
+    godzina: str
+    sala: str
+    pojemnosc: int
+    sesja: str  # "zasadnicza" lub "poprawkowa"
+    spread_days: int  # odstęp od najbliższego innego egzaminu rocznika
+
+
+class SlotSuggestionsResponse(BaseModel):
+    exam_id: int
+    liczba_osob: int
+    searched_slots: int
+    suggestions: List[SlotSuggestion]
+
+
+# Session solver
+class SolveSessionRequest(BaseModel):
+    sesja: str = "zasadnicza"  # zasadnicza, poprawkowa lub obie
+    liczba_osob: int = 30  # domyślna liczba osób na egzamin
+    liczba_osob_per_exam: Dict[int, int] = {}
+    godziny: Optional[List[Hour]] = None
+    czas_trwania: int = Field(DEFAULT_DURATION, ge=1, le=24 * 60)  # minuty, dla każdego egzaminu
+    spread: bool = True  # rozkładaj egzaminy rocznika równomiernie w sesji
+    exam_ids: Optional[List[int]] = None  # domyślnie wszystkie niezaplanowane
+    commit: bool = False  # False = dry run
+    proposed_by_role: UserRole = UserRole.ADMIN
+    proposed_by_name: str = "Automatyczny planista"
+
+
+class SolverAssignment(BaseModel):
+    exam_id: int
+    data: str
+    godzina: str
+    sala: str
+    liczba_osob: int
+
+
+class SolverUnassigned(BaseModel):
+    exam_id: int
+    reason: str
+
+
+class SolveSessionResponse(BaseModel):
+    committed: bool
+    assignments: List[SolverAssignment]
+    unassigned: List[SolverUnassigned]
+    term_ids: List[int] = []
+
+
 # Rooms
 class RoomCreate(BaseModel):
     nazwa: str
@@ -134,7 +271,8 @@ class RoomResponse(BaseModel):
 class RoomAvailabilityRequest(BaseModel):
     sala: str
     data: str  # YYYY-MM-DD
-    godzina: str  # HH:MM
+    godzina: str = Field(..., pattern=HOUR_PATTERN)  # HH:MM
+    czas_trwania: int = Field(DEFAULT_DURATION, ge=1, le=24 * 60)
     liczba_osob: int
 
 
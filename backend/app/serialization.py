@@ -0,0 +1,146 @@
+"""
+Szybka serializacja list terminów i egzaminów (bez walidacji Pydantic per wiersz).
+
+Przez response_model FastAPI dla każdego obiektu ORM buduje i waliduje
+zagnieżdżone ExamTermResponse -> ExamResponse -> SubjectResponse, a potem
+przepuszcza wynik przez jsonable_encoder - na dużych listach to większość
+czasu CPU żądania. Tutaj zapytanie zwraca płaskie krotki kolumn
+(termin, egzamin, przedmiot), z których od razu składane są słowniki
+w kształcie schematu i kodowane do bajtów JSON partiami - orjson, jeśli jest
+zainstalowany, w przeciwnym razie json z biblioteki standardowej. Pełne listy
+(bez limit) strumieniowane są prosto z kursora bazy, więc czas do pierwszego
+bajtu i zużycie pamięci nie rosną z rozmiarem wyniku.
+
+Pola i ich kolejność pochodzą ze schematów (schemas.*Response.model_fields),
+więc wynik jest tym samym JSON-em co odpowiedź przez response_model
+(sprawdza to benchmarks/serialization.py).
+"""
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from app import models, schemas
+
+try:
+    import orjson
+except ImportError:  # opcjonalna zależność - wolniejszy json ze stdlib
+    orjson = None
+
+CHUNK_ROWS = 500
+
+SUBJECT_FIELDS = list(schemas.SubjectResponse.model_fields)
+EXAM_FIELDS = [f for f in schemas.ExamResponse.model_fields if f != "subject"]
+TERM_FIELDS = [f for f in schemas.ExamTermResponse.model_fields if f != "exam"]
+
+
+def _columns(model, fields: List[str], prefix: str = "") -> list:
+    return [
+        getattr(model, f).label(prefix + f) if prefix else getattr(model, f)
+        for f in fields
+    ]
+
+
+# Kolumny zapytań *_rows_query w kolejności pól schematu
+EXAM_COLUMNS = (
+    _columns(models.Exam, EXAM_FIELDS)
+    + _columns(models.Subject, SUBJECT_FIELDS, "subject__")
+)
+EXAM_TERM_COLUMNS = (
+    _columns(models.ExamTerm, TERM_FIELDS)
+    + _columns(models.Exam, EXAM_FIELDS, "exam__")
+    + _columns(models.Subject, SUBJECT_FIELDS, "subject__")
+)
+
+
+def exam_dicts(rows: Iterable[tuple]) -> Iterator[Dict]:
+    """Wiersze EXAM_COLUMNS jako słowniki ExamResponse"""
+    n_exam = len(EXAM_FIELDS)
+    for row in rows:
+        exam = dict(zip(EXAM_FIELDS, row[:n_exam]))
+        exam["subject"] = dict(zip(SUBJECT_FIELDS, row[n_exam:]))
+        yield exam
+
+
+def exam_term_dicts(rows: Iterable[tuple]) -> Iterator[Dict]:
+    """Wiersze EXAM_TERM_COLUMNS jako słowniki ExamTermResponse"""
+    n_term = len(TERM_FIELDS)
+    n_exam = n_term + len(EXAM_FIELDS)
+    for row in rows:
+        term = dict(zip(TERM_FIELDS, row[:n_term]))
+        exam = dict(zip(EXAM_FIELDS, row[n_term:n_exam]))
+        exam["subject"] = dict(zip(SUBJECT_FIELDS, row[n_exam:]))
+        term["exam"] = exam
+        yield term
+
+
+# Kodowanie
+def _default(value):
+    # Enumy modeli dziedziczą po str, więc json koduje je jako wartość
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Typ {type(value).__name__} nie jest obsługiwany w JSON")
+
+
+def dumps(content) -> bytes:
+    """JSON w postaci bajtów - te same bajty co JSONResponse (UTF-8, bez spacji)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def json_array_chunks(items: Iterable[Dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Tablica JSON kodowana partiami po chunk_rows elementów"""
+    yield b"["
+    batch, first = [], True
+    for item in items:
+        batch.append(item)
+        if len(batch) >= chunk_rows:
+            yield (b"" if first else b",") + dumps(batch)[1:-1]
+            batch, first = [], False
+    if batch:
+        yield (b"" if first else b",") + dumps(batch)[1:-1]
+    yield b"]"
+
+
+def json_array_response(items: Iterable[Dict], headers: Dict[str, str]) -> StreamingResponse:
+    return StreamingResponse(json_array_chunks(items), media_type="application/json", headers=headers)
+
+
+async def cursor_json_array_chunks(
+    session_factory: Callable[[], AsyncSession],
+    query: Select,
+    to_dicts: Callable[[Iterable[tuple]], Iterator[Dict]],
+    chunk_rows: int = CHUNK_ROWS
+) -> AsyncIterator[bytes]:
+    """
+    Tablica JSON kodowana partiami w miarę odczytu wierszy z kursora bazy.
+
+    Sesja jest własna generatora: zależność get_async_db zamyka się przed
+    wysłaniem ciała odpowiedzi. W pamięci jest naraz tylko jedna partia.
+    """
+    yield b"["
+    first = True
+    async with session_factory() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions(chunk_rows):
+            yield (b"" if first else b",") + dumps(list(to_dicts(rows)))[1:-1]
+            first = False
+    yield b"]"
+
+
+def cursor_json_array_response(
+    session_factory: Callable[[], AsyncSession],
+    query: Select,
+    to_dicts: Callable[[Iterable[tuple]], Iterator[Dict]],
+    headers: Dict[str, str]
+) -> StreamingResponse:
+    return StreamingResponse(
+        cursor_json_array_chunks(session_factory, query, to_dicts),
+        media_type="application/json", headers=headers
+    )
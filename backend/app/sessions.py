@@ -0,0 +1,133 @@
+"""
+Kalendarz okresów sesji trzymany w pamięci procesu.
+
+Okresy wczytywane są z tabeli `session_periods` przy pierwszym użyciu
+i trzymane do jawnego unieważnienia (create_session_period) albo przez
+SESSIONS_MAX_AGE sekund (domyślnie 60 na PostgreSQL, gdzie okresy mogą dodawać
+inne instancje backendu; 0 na SQLite). Sprawdzenie,
+czy data mieści się w sesji, to wyszukiwanie binarne w posortowanych,
+scalonych przedziałach wszystkich okresów - bez zapytania do bazy.
+
+Sesja poprawkowa to okres, którego `semestr` kończy się na "_poprawkowa"
+(np. "zimowy_poprawkowa"); pozostałe okresy to sesje zasadnicze.
+"""
+import bisect
+import threading
+import time
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import cache_max_age
+
+RESIT_SUFFIX = "_poprawkowa"
+SEMESTER_NAMES = {"zimowy": "zimowa", "letni": "letnia"}
+SHARED_MAX_AGE = 60
+
+
+def is_resit(period: models.SessionPeriod) -> bool:
+    return period.semestr.endswith(RESIT_SUFFIX)
+
+
+def _pick(periods: List[models.SessionPeriod], today: str) -> Optional[models.SessionPeriod]:
+    """Trwający okres, inaczej najbliższy nadchodzący, inaczej ostatni zakończony"""
+    for period in periods:
+        if period.data_start <= today <= period.data_end:
+            return period
+    upcoming = [p for p in periods if p.data_start > today]
+    if upcoming:
+        return min(upcoming, key=lambda p: p.data_start)
+    return max(periods, key=lambda p: p.data_end, default=None)
+
+
+class SessionCalendar:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._periods: List[models.SessionPeriod] = []
+        # Scalone, rozłączne przedziały [start, end] posortowane po starcie
+        self._starts: List[str] = []
+        self._ends: List[str] = []
+        self._current: Optional[Tuple[str, dict]] = None
+        self.loaded = False
+        self.loaded_at = 0.0
+        # Okresy dodane przez inne instancje backendu widać po SESSIONS_MAX_AGE
+        self.max_age = cache_max_age("SESSIONS_MAX_AGE", SHARED_MAX_AGE)
+
+    def load(self, db: Session) -> None:
+        """Wczytuje wszystkie okresy sesji i buduje indeks przedziałów"""
+        periods = db.scalars(
+            select(models.SessionPeriod).order_by(models.SessionPeriod.data_start)
+        ).all()
+        for period in periods:
+            db.expunge(period)
+
+        starts, ends = [], []
+        for period in periods:
+            if starts and period.data_start <= ends[-1]:
+                ends[-1] = max(ends[-1], period.data_end)
+            else:
+                starts.append(period.data_start)
+                ends.append(period.data_end)
+
+        with self._lock:
+            self._periods = list(periods)
+            self._starts = starts
+            self._ends = ends
+            self._current = None
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        return not self.loaded or (
+            self.max_age > 0 and time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self.load(db)
+
+    def invalidate(self) -> None:
+        """Wymusza ponowne wczytanie przy następnym użyciu (np. po dodaniu okresu)"""
+        with self._lock:
+            self.loaded = False
+
+    def contains(self, data: str) -> bool:
+        """Czy data (YYYY-MM-DD) mieści się w którymkolwiek okresie sesji"""
+        with self._lock:
+            i = bisect.bisect_right(self._starts, data) - 1
+            return i >= 0 and data <= self._ends[i]
+
+    def current(self) -> dict:
+        """Aktualne/nadchodzące sesje: zasadnicza i następująca po niej poprawkowa"""
+        today = date.today().isoformat()
+        with self._lock:
+            if self._current and self._current[0] == today:
+                return self._current[1]
+
+            main = [p for p in self._periods if not is_resit(p)]
+            resits = [p for p in self._periods if is_resit(p)]
+            zasadnicza = _pick(main, today)
+            following = [p for p in resits if zasadnicza and p.data_start >= zasadnicza.data_start]
+            poprawkowa = _pick(following or resits, today)
+
+            active = [p for p in (zasadnicza, poprawkowa) if p is not None]
+            current = {
+                "zasadnicza": zasadnicza,
+                "poprawkowa": poprawkowa,
+                "is_session_active": any(p.data_start <= today <= p.data_end for p in active),
+                "message": (
+                    f"Sesja {SEMESTER_NAMES.get(zasadnicza.semestr, zasadnicza.semestr)} "
+                    f"{zasadnicza.rok_akademicki}"
+                    if zasadnicza else "Brak zdefiniowanych okresów sesji"
+                ),
+            }
+            self._current = (today, current)
+            return current
+
+
+session_calendar = SessionCalendar()
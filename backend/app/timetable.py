@@ -0,0 +1,123 @@
+"""
+Harmonogram terminów przeliczony do siatki (wykres Gantta).
+
+Zamiast pełnej listy terminów z zagnieżdżonymi egzaminami backend zwraca osie
+(daty, godziny, wiersze: sale lub roczniki), słowniki egzaminów, sal i osób oraz
+komórki jako krótkie listy indeksów:
+
+    [data, godzina, wiersz, egzamin, sala, id terminu, status, proponujący]
+
+Gotowe odpowiedzi (JSON + ETag) trzymane są w pamięci per zestaw filtrów
+razem z wersją terminów (row_version z licznika change_counters), przy której
+je zbudowano. Każdy zapis terminu podbija licznik, więc wpis z inną wersją
+jest przebudowywany przy następnym zapytaniu - bez jawnego unieważniania.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.refdata import make_etag
+
+LAYOUTS = ("rooms", "cohorts")
+CELL_FIELDS = ["date", "hour", "row", "exam", "room", "term", "status", "proposed_by"]
+MAX_ENTRIES = 256
+
+TimetableKey = Tuple
+
+
+def _index(values) -> Dict:
+    return {value: i for i, value in enumerate(values)}
+
+
+def build(rows: list, layout: str, version: int) -> dict:
+    """Siatka harmonogramu z wierszy crud.timetable_query"""
+    dates = sorted({row.data for row in rows})
+    hours = sorted({row.godzina for row in rows})
+    rooms = sorted({row.sala for row in rows})
+    people = sorted({row.proposed_by_name for row in rows})
+    date_i, hour_i, room_i, person_i = _index(dates), _index(hours), _index(rooms), _index(people)
+
+    exams: List[dict] = []
+    exam_i: Dict[int, int] = {}
+    for row in rows:
+        if row.exam_id not in exam_i:
+            exam_i[row.exam_id] = len(exams)
+            exams.append({
+                "id": row.exam_id,
+                "nazwa": row.nazwa,
+                "prowadzacy_name": row.prowadzacy_name,
+                "kierunek": row.kierunek,
+                "typ_studiow": row.typ_studiow,
+                "rok": row.rok,
+            })
+
+    if layout == "rooms":
+        axis = rooms
+        row_i = room_i
+        row_key = lambda row: row.sala
+    else:
+        cohorts = sorted({(row.kierunek, row.typ_studiow.value, row.rok) for row in rows})
+        axis = [{"kierunek": k, "typ_studiow": t, "rok": r} for k, t, r in cohorts]
+        row_i = _index(cohorts)
+        row_key = lambda row: (row.kierunek, row.typ_studiow.value, row.rok)
+
+    cells = [
+        [
+            date_i[row.data], hour_i[row.godzina], row_i[row_key(row)],
+            exam_i[row.exam_id], room_i[row.sala], row.id, row.status,
+            person_i[row.proposed_by_name]
+        ]
+        for row in rows
+    ]
+    return {
+        "version": version,
+        "layout": layout,
+        "dates": dates,
+        "hours": hours,
+        "rows": axis,
+        "rooms": rooms,
+        "exams": exams,
+        "people": people,
+        "cell_fields": CELL_FIELDS,
+        "cells": cells,
+    }
+
+
+class TimetableEntry:
+    def __init__(self, version: int, content: dict):
+        self.version = version
+        self.body = json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+        self.etag = make_etag(self.body)
+
+
+class TimetableCache:
+    def __init__(self, size: int = MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[TimetableKey, TimetableEntry]" = OrderedDict()
+        self.size = size
+
+    def get(self, key: TimetableKey, version: int) -> Optional[TimetableEntry]:
+        """Wpis zbudowany przy tej samej wersji terminów; None gdy brak lub nieaktualny"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: TimetableKey, version: int, content: dict) -> TimetableEntry:
+        entry = TimetableEntry(version, content)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+timetable_cache = TimetableCache()
@@ -0,0 +1,96 @@
+"""
+Porównanie endpointów odczytu: synchronicznych (pula wątków Starlette)
+i asynchronicznych (AsyncSession) przy równoległych żądaniach.
+
+Uruchom (z katalogu backend, na zainicjalizowanej bazie):
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 200
+
+Wymaga pakietu httpx. Wynik (JSON) zawiera p50/p95/p99, liczbę żądań na sekundę
+i liczbę błędów dla obu wariantów tego samego zapytania listy terminów.
+Przy współbieżności większej niż pula połączeń silnika synchronicznego wątki
+czekające na połączenie blokują pulę wątków - wariant sync zgłasza wtedy timeouty.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import crud, crud_async, schemas
+from app.database import get_async_db, get_db
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/exam-terms", response_model=List[schemas.ExamTermResponse])
+def sync_exam_terms(db: Session = Depends(get_db)):
+    return crud.get_exam_terms(db)
+
+
+@bench_app.get("/async/exam-terms", response_model=List[schemas.ExamTermResponse])
+async def async_exam_terms(db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.get_exam_terms(db)
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def run(path: str, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=bench_app)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # rozgrzewka
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                except Exception as e:
+                    errors.append(type(e).__name__)
+                    return
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {
+        "sync": asyncio.run(run("/sync/exam-terms", args.requests, args.concurrency)),
+        "async": asyncio.run(run("/async/exam-terms", args.requests, args.concurrency)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
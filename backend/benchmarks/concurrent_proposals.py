@@ -0,0 +1,210 @@
+"""
+Test obciążeniowy równoległych propozycji terminów (POST /api/exam-terms/).
+
+Uruchom (z katalogu backend, na zainicjalizowanej bazie):
+    python -m benchmarks.concurrent_proposals --proposals 500 --threads 64
+
+Baza kopiowana jest do katalogu tymczasowego (DATABASE_URL wskazuje na kopię),
+a w niej zakładane są egzaminy z osobnych roczników. Wątki wysyłają propozycje
+do prawdziwej aplikacji (TestClient) w kilka sal, kilka godzin i dni sesji
+z różnym czasem trwania, więc większość propozycji walczy o te same sale.
+Z --reopens przed startem zakładana jest pula odrzuconych terminów w tych samych
+salach, a między propozycjami wysyłane są partie PUT /api/exam-terms/bulk, które
+je przywracają (zatwierdzają) - przywrócenie też nie może zająć zajętej sali.
+Wynik (JSON) zawiera liczbę utworzonych i odrzuconych propozycji, przepustowość
+oraz liczbę podwójnych rezerwacji sal i roczników w bazie - musi być zero
+(w przeciwnym razie kod wyjścia 1). To samo sprawdza
+tests/test_concurrent_proposals.py.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+ROOMS = ["A1", "A2", "B1"]
+HOURS = ["08:00", "09:00", "10:00", "11:30", "13:00"]
+DURATIONS = [60, 90, 120]
+REOPEN_BATCH = 5
+DECIDED_BY = {"approved_by_role": "admin", "approved_by_name": "Test obciążeniowy"}
+
+DOUBLE_BOOKED_ROOMS = """
+    SELECT COUNT(*) FROM exam_terms a JOIN exam_terms b
+      ON a.id < b.id AND a.data = b.data AND a.sala = b.sala
+     AND a.start_min < b.end_min AND b.start_min < a.end_min
+    WHERE a.status != 'REJECTED' AND b.status != 'REJECTED'
+"""
+
+DOUBLE_BOOKED_COHORTS = """
+    SELECT COUNT(*) FROM exam_terms a
+      JOIN exams ea ON ea.id = a.exam_id JOIN subjects sa ON sa.id = ea.subject_id
+      JOIN exam_terms b ON a.id < b.id AND a.data = b.data
+      JOIN exams eb ON eb.id = b.exam_id JOIN subjects sb ON sb.id = eb.subject_id
+    WHERE a.status != 'REJECTED' AND b.status != 'REJECTED'
+      AND sa.kierunek = sb.kierunek AND sa.typ_studiow = sb.typ_studiow AND sa.rok = sb.rok
+"""
+
+
+def _copy_database(source: str) -> str:
+    workdir = tempfile.mkdtemp(prefix="proposals-")
+    os.makedirs(os.path.join(workdir, "data"))
+    shutil.copy(source, os.path.join(workdir, "data", "exam_system.db"))
+    return workdir
+
+
+def _seed_exams(count: int, seed: int) -> tuple:
+    """Egzaminy z osobnych roczników - kolidować mogą tylko sale"""
+    from app import crud, models, schemas
+    from app.database import SessionLocal
+
+    exam_ids = []
+    with SessionLocal() as db:
+        for i in range(count):
+            subject = crud.create_subject(db, schemas.SubjectCreate(
+                nazwa=f"Przedmiot obciążeniowy {seed}-{i}",
+                kierunek=f"Kierunek obciążeniowy {seed}-{i}",
+                typ_studiow=models.TypStudiow.STACJONARNE_I,
+                rok=1
+            ))
+            exam = crud.create_exam(db, schemas.ExamCreate(
+                subject_id=subject.id, prowadzacy_name="dr Test"
+            ))
+            exam_ids.append(exam.id)
+        dates = sorted({
+            day for period in crud.get_session_periods(db)
+            for day in _days(period.data_start, period.data_end)
+        })
+    return exam_ids, dates
+
+
+def _days(start: str, end: str) -> list:
+    from datetime import date, timedelta
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [str(first + timedelta(days=i)) for i in range((last - first).days + 1)]
+
+
+def _seed_rejected(client, payloads: list) -> list:
+    """Odrzucone terminy - każdy zakładany i odrzucany od razu, więc mogą na siebie nachodzić"""
+    term_ids = []
+    for payload in payloads:
+        response = client.post("/api/exam-terms/", json=payload)
+        if response.status_code != 200:
+            continue
+        term_id = response.json()["id"]
+        client.put(f"/api/exam-terms/{term_id}", json={**DECIDED_BY, "status": "rejected"})
+        term_ids.append(term_id)
+    return term_ids
+
+
+def run(
+    proposals: int, threads: int, exams: int, days: int, seed: int,
+    reopens: int = 0, rooms: List[str] = ROOMS
+) -> dict:
+    from fastapi.testclient import TestClient
+    from app.database import engine
+    from app.main import app
+
+    rng = random.Random(seed)
+    exam_ids, dates = _seed_exams(exams, seed)
+    dates = dates[:days]
+
+    def payload():
+        return {
+            "exam_id": rng.choice(exam_ids),
+            "data": rng.choice(dates),
+            "godzina": rng.choice(HOURS),
+            "czas_trwania": rng.choice(DURATIONS),
+            "sala": rng.choice(rooms),
+            "proposed_by_role": "admin",
+            "proposed_by_name": "Test obciążeniowy",
+        }
+
+    statuses = {}
+    reopened = {"reopened": 0, "reopen_failed": 0}
+    lock = threading.Lock()
+    with TestClient(app) as client:
+        rejected = _seed_rejected(client, [payload() for _ in range(reopens)])
+        rng.shuffle(rejected)
+        tasks = [("propose", payload()) for _ in range(proposals)] + [
+            ("reopen", rejected[i:i + REOPEN_BATCH]) for i in range(0, len(rejected), REOPEN_BATCH)
+        ]
+        rng.shuffle(tasks)
+        start_barrier = threading.Barrier(threads)
+
+        def worker(chunk):
+            start_barrier.wait()
+            for kind, task in chunk:
+                if kind == "propose":
+                    code = client.post("/api/exam-terms/", json=task).status_code
+                    with lock:
+                        statuses[code] = statuses.get(code, 0) + 1
+                    continue
+                response = client.put("/api/exam-terms/bulk", json={
+                    **DECIDED_BY,
+                    "decisions": [{"term_id": term_id, "status": "approved"} for term_id in task],
+                })
+                with lock:
+                    if response.status_code != 200:
+                        statuses[f"bulk_{response.status_code}"] = statuses.get(f"bulk_{response.status_code}", 0) + 1
+                        continue
+                    reopened["reopened"] += response.json()["approved"]
+                    reopened["reopen_failed"] += response.json()["failed"]
+
+        chunks = [tasks[i::threads] for i in range(threads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, chunks))
+        elapsed = time.perf_counter() - start
+
+        consistency = client.get("/api/admin/occupancy-check").json()
+
+    with engine.connect() as conn:
+        double_rooms = conn.exec_driver_sql(DOUBLE_BOOKED_ROOMS).scalar()
+        double_cohorts = conn.exec_driver_sql(DOUBLE_BOOKED_COHORTS).scalar()
+
+    return {
+        "proposals": proposals,
+        "threads": threads,
+        "created": statuses.get(200, 0),
+        "conflicts_400": statuses.get(400, 0),
+        "other_statuses": {str(k): v for k, v in statuses.items() if k not in (200, 400)},
+        **reopened,
+        "seconds": round(elapsed, 3),
+        "proposals_per_s": round(proposals / elapsed, 1),
+        "double_booked_rooms": double_rooms,
+        "double_booked_cohorts": double_cohorts,
+        "occupancy_consistent": consistency["consistent"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--proposals", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--exams", type=int, default=200, help="liczba egzaminów (roczników)")
+    parser.add_argument("--days", type=int, default=3, help="liczba dni sesji, o które walczą propozycje")
+    parser.add_argument("--reopens", type=int, default=0, help="odrzucone terminy przywracane partiami w trakcie testu")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database", default="data/exam_system.db")
+    args = parser.parse_args()
+
+    workdir = _copy_database(args.database)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'data', 'exam_system.db')}"
+    os.chdir(workdir)
+    try:
+        result = run(args.proposals, args.threads, args.exams, args.days, args.seed, args.reopens)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(result, indent=2))
+    if result["double_booked_rooms"] or result["double_booked_cohorts"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
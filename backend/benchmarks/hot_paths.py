@@ -0,0 +1,351 @@
+"""
+Benchmark najczęściej obciążonych ścieżek API na syntetycznych danych.
+
+Uruchom (z katalogu backend):
+    python -m benchmarks.hot_paths --scale 10 --scale 100 --scale 1000 --output wynik.json
+    python -m benchmarks.hot_paths --compare przed.json po.json
+
+Dla każdej skali (liczba wydziałów o wielkości danych z init_db.py, app.datagen) osobny proces
+tworzy świeżą bazę w katalogu tymczasowym i steruje prawdziwą aplikacją
+(app.main, httpx.ASGITransport) w scenariuszach:
+- validation: walidacje wywoływane przy wypełnianiu formularza (data sesji,
+  dostępność i pojemność sali, kolizje studentów, wiele kandydatów naraz),
+- gantt: odświeżanie wykresu Gantta (/timetable, część z If-None-Match),
+- proposal_storm: seria równoległych propozycji POST /api/exam-terms/,
+- bulk_approvals: zatwierdzanie/odrzucanie zaproponowanych terminów partiami.
+
+Wynik (JSON z posortowanymi kluczami, do porównywania między commitami) zawiera
+dla każdego scenariusza p50/p95/p99 (ms), liczbę żądań na sekundę, rozkład
+statusów i liczbę błędów (statusy spoza oczekiwanych). Wymaga pakietu httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.async_vs_sync import percentile
+
+SCENARIOS = ["validation", "gantt", "proposal_storm", "bulk_approvals"]
+DURATIONS = [60, 90, 120]
+BULK_BATCH = 20
+# Wydział wielkości danych z init_db.py: 10 sal, 4 przedmioty i egzaminy, 6 użytkowników
+FACULTY = {"kierunki": 2, "years": 1, "study_types": 1, "exams_per_cohort": 2, "rooms": 10}
+
+
+class Request:
+    def __init__(self, method: str, path: str, expected=(200,), **kwargs):
+        self.method, self.path, self.expected, self.kwargs = method, path, expected, kwargs
+
+
+def _summary(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+async def drive(client, requests: List[Request], concurrency: int,
+                on_response: Optional[Callable] = None) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+    errors = 0
+
+    async def one(request: Request):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.path, **request.kwargs)
+            except Exception as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+            code = str(response.status_code)
+            statuses[code] = statuses.get(code, 0) + 1
+            if response.status_code not in request.expected:
+                errors += 1
+            if on_response is not None:
+                on_response(request, response)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(r) for r in requests))
+    return _summary(latencies, statuses, errors, time.perf_counter() - start)
+
+
+# Scenariusze
+def validation_requests(rng: random.Random, ctx: dict, count: int) -> List[Request]:
+    requests = []
+    for _ in range(count):
+        exam = rng.choice(ctx["exams"])
+        room = rng.choice(ctx["rooms"])
+        data, godzina = rng.choice(ctx["days"]), rng.choice(ctx["hours"])
+        czas_trwania = rng.choice(DURATIONS)
+        kind = rng.randrange(5)
+        if kind == 0:
+            requests.append(Request(
+                "GET", "/api/exam-terms/validation/check-session-date", params={"data": data}
+            ))
+        elif kind == 1:
+            requests.append(Request("POST", "/api/rooms/check-availability", json={
+                "sala": room, "data": data, "godzina": godzina,
+                "czas_trwania": czas_trwania, "liczba_osob": rng.randint(10, 120),
+            }))
+        elif kind == 2:
+            requests.append(Request("GET", "/api/exam-terms/validation/check-room", params={
+                "data": data, "godzina": godzina, "sala": room, "czas_trwania": czas_trwania,
+            }))
+        elif kind == 3:
+            requests.append(Request("GET", "/api/exam-terms/validation/check-students", params={
+                "data": data, "kierunek": exam["kierunek"],
+                "typ_studiow": exam["typ_studiow"], "rok": exam["rok"],
+            }))
+        else:
+            requests.append(Request("POST", "/api/exam-terms/validation/check-slots", json={
+                "exam_id": exam["id"], "liczba_osob": 30, "slots": [
+                    {"data": rng.choice(ctx["days"]), "godzina": rng.choice(ctx["hours"]),
+                     "sala": rng.choice(ctx["rooms"]), "czas_trwania": czas_trwania}
+                    for _ in range(10)
+                ],
+            }))
+    return requests
+
+
+def gantt_requests(rng: random.Random, ctx: dict, count: int) -> List[Request]:
+    requests = []
+    for _ in range(count):
+        params = {"layout": rng.choice(["rooms", "cohorts"])}
+        if rng.random() < 0.5:
+            params["kierunek"] = rng.choice(ctx["exams"])["kierunek"]
+        requests.append(Request("GET", "/api/exam-terms/timetable", expected=(200, 304), params=params))
+    return requests
+
+
+def proposal_requests(rng: random.Random, ctx: dict, count: int) -> List[Request]:
+    return [
+        Request("POST", "/api/exam-terms/", expected=(200, 400), json={
+            "exam_id": exam["id"],
+            "data": rng.choice(ctx["days"]),
+            "godzina": rng.choice(ctx["hours"]),
+            "czas_trwania": rng.choice(DURATIONS),
+            # Sale wydziału egzaminu - propozycje walczą o te same sale
+            "sala": rng.choice(ctx["faculty_rooms"][exam["faculty"]]),
+            "proposed_by_role": "starosta",
+            "proposed_by_name": f"Starosta {exam['faculty']}",
+        })
+        for exam in (rng.choice(ctx["exams"]) for _ in range(count))
+    ]
+
+
+def bulk_requests(rng: random.Random, proposed: List[int], count: int) -> List[Request]:
+    rng.shuffle(proposed)
+    batches = [proposed[i:i + BULK_BATCH] for i in range(0, len(proposed), BULK_BATCH)][:count]
+    return [
+        Request("PUT", "/api/exam-terms/bulk", json={
+            "decisions": [
+                {"term_id": term_id, "status": rng.choice(["approved", "rejected"])}
+                for term_id in batch
+            ],
+            "approved_by_role": "admin",
+            "approved_by_name": "Administrator",
+        })
+        for batch in batches
+    ]
+
+
+def _context(db) -> dict:
+    from sqlalchemy import select
+    from app import models
+    from app.datagen import HOURS, session_days
+
+    rooms = db.execute(select(models.Room.nazwa, models.Room.budynek)).all()
+    faculty_rooms: Dict[str, List[str]] = {}
+    for nazwa, budynek in rooms:
+        faculty_rooms.setdefault(budynek, []).append(nazwa)
+    exams = [
+        {"id": row.id, "kierunek": row.kierunek, "typ_studiow": row.typ_studiow.value,
+         "rok": row.rok, "faculty": row.kierunek.rsplit(" ", 1)[-1]}
+        for row in db.execute(
+            select(models.Exam.id, models.Subject.kierunek, models.Subject.typ_studiow, models.Subject.rok)
+            .join(models.Subject, models.Exam.subject_id == models.Subject.id)
+        ).all()
+    ]
+    return {
+        "rooms": [nazwa for nazwa, _ in rooms],
+        "faculty_rooms": faculty_rooms,
+        "exams": exams,
+        "days": session_days(db),
+        "hours": HOURS,
+    }
+
+
+async def run_scenarios(app, ctx: dict, scenarios: List[str], requests: int,
+                        concurrency: int, rng: random.Random) -> dict:
+    import httpx
+    from sqlalchemy import select
+    from app import models
+    from app.database import SessionLocal
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.get("/api/exam-terms/timetable")  # rozgrzewka (indeks zajętości, cache)
+        for scenario in scenarios:
+            if scenario == "validation":
+                batch = validation_requests(rng, ctx, requests)
+            elif scenario == "gantt":
+                batch = gantt_requests(rng, ctx, requests)
+            elif scenario == "proposal_storm":
+                batch = proposal_requests(rng, ctx, requests)
+            else:
+                with SessionLocal() as db:
+                    proposed = db.scalars(
+                        select(models.ExamTerm.id).where(models.ExamTerm.status == models.TermStatus.PROPOSED)
+                    ).all()
+                batch = bulk_requests(rng, list(proposed), requests)
+
+            etags = {}
+
+            def remember_etag(request: Request, response) -> None:
+                if "etag" in response.headers:
+                    etags[tuple(sorted(request.kwargs["params"].items()))] = response.headers["etag"]
+
+            if scenario == "gantt":
+                # Połowa klientów odświeża z ETagiem z poprzedniego pobrania
+                first, rest = batch[:len(batch) // 2], batch[len(batch) // 2:]
+                await drive(client, first, concurrency, remember_etag)
+                for request in rest:
+                    etag = etags.get(tuple(sorted(request.kwargs["params"].items())))
+                    if etag and rng.random() < 0.5:
+                        request.kwargs["headers"] = {"If-None-Match": etag}
+                batch = first + rest
+            results[scenario] = await drive(client, batch, concurrency)
+    return results
+
+
+def run_scale(scale: int, scenarios: List[str], requests: int, concurrency: int,
+              density: float, rng_seed: int) -> dict:
+    """Jedna skala w bieżącym procesie (DATABASE_URL musi wskazywać pustą bazę)"""
+    from sqlalchemy import func, select
+    from app import models
+    from app.database import SessionLocal, engine
+    from app.datagen import generate
+    from app.main import app
+
+    start = time.perf_counter()
+    counts = generate(engine, scale, seed=rng_seed, density=density, **FACULTY)["rows"]
+    seed_seconds = time.perf_counter() - start
+
+    with SessionLocal() as db:
+        ctx = _context(db)
+    rng = random.Random(rng_seed)
+    results = asyncio.run(run_scenarios(app, ctx, scenarios, requests, concurrency, rng))
+    with SessionLocal() as db:
+        counts["exam_terms_after"] = db.scalar(select(func.count(models.ExamTerm.id)))
+    return {"scale": scale, "rows": counts, "seed_seconds": round(seed_seconds, 2), "scenarios": results}
+
+
+def _run_child(args, scale: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"hot-paths-{scale}-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    command = [
+        sys.executable, "-m", "benchmarks.hot_paths", "--child", "--scale", str(scale),
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--density", str(args.density), "--seed", str(args.seed),
+    ] + [f"--scenario={s}" for s in args.scenario or []]
+    try:
+        output = subprocess.run(command, env=env, cwd=workdir, check=True, stdout=subprocess.PIPE).stdout
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return json.loads(output)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str) -> dict:
+    """Zmiana p50/p95/p99 i rps (w %) dla wspólnych skal i scenariuszy"""
+    with open(before_path) as f:
+        before = {r["scale"]: r for r in json.load(f)["results"]}
+    with open(after_path) as f:
+        after = {r["scale"]: r for r in json.load(f)["results"]}
+    diff = {}
+    for scale in sorted(set(before) & set(after)):
+        for scenario, new in after[scale]["scenarios"].items():
+            old = before[scale]["scenarios"].get(scenario)
+            if old is None:
+                continue
+            diff[f"{scale}/{scenario}"] = {
+                key: (
+                    round((new[key] - old[key]) / old[key] * 100, 1)
+                    if old.get(key) and new.get(key) is not None else None
+                )
+                for key in ("p50_ms", "p95_ms", "p99_ms", "rps")
+            }
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, action="append", help="liczba wydziałów (domyślnie 10, 100, 1000)")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=500, help="żądań na scenariusz")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--density", type=float, default=0.5, help="udział egzaminów z terminem na starcie")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="plik wyniku JSON (domyślnie stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("PRZED", "PO"), help="porównaj dwa wyniki")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2, sort_keys=True))
+        return
+    if args.child:
+        result = run_scale(
+            args.scale[0], args.scenario or SCENARIOS, args.requests,
+            args.concurrency, args.density, args.seed
+        )
+        print(json.dumps(result))
+        return
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "requests": args.requests, "concurrency": args.concurrency,
+            "density": args.density, "seed": args.seed,
+        },
+        "results": [_run_child(args, scale) for scale in args.scale or [10, 100, 1000]],
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
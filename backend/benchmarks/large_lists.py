@@ -0,0 +1,125 @@
+"""
+Czas do pierwszego bajtu, pamięć i rozmiar dużych list (strumieniowanie i kompresja).
+
+Uruchom (z katalogu backend):
+    python -m benchmarks.large_lists --scale 50 --scale 200 --scale 800
+
+Na świeżej bazie w katalogu tymczasowym generator (app.datagen) dokłada
+kolejne wydziały do zadanej skali, a dla każdej skali pełne listy
+GET /api/exam-terms/ i /api/exams/ pobierane są bezpośrednio przez ASGI
+(bez serwera), bez kompresji i z gzip (oraz brotli, jeśli jest zainstalowane).
+Wynik (JSON) zawiera czas do pierwszej części ciała (ttfb_ms), czas całej
+odpowiedzi, szczyt pamięci alokowanej w trakcie żądania (tracemalloc) i liczbę
+bajtów na łączu. Przy strumieniowaniu z kursora ttfb_ms i peak_kb nie powinny
+rosnąć razem z liczbą wierszy.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+PATHS = ["/api/exam-terms/", "/api/exams/"]
+
+
+async def measure(app, path: str, accept_encoding: str) -> dict:
+    """Jedno żądanie GET wysłane wprost do aplikacji ASGI"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+        "headers": [(b"host", b"benchmark"), (b"accept-encoding", accept_encoding.encode())],
+    }
+    finished = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status, encoding, size, first_byte = None, None, 0, None
+
+    async def send(message):
+        nonlocal status, encoding, size, first_byte
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            encoding = dict(message["headers"]).get(b"content-encoding", b"identity").decode()
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(message["body"])
+
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    finished.set()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return {
+        "status": status,
+        "encoding": encoding,
+        "bytes": size,
+        "ttfb_ms": round((first_byte - start) * 1000, 1) if first_byte else None,
+        "total_ms": round(elapsed * 1000, 1),
+        "peak_kb": round(peak / 1024),
+    }
+
+
+async def run_scale(app, encodings: List[str]) -> dict:
+    results = {}
+    for path in PATHS:
+        await measure(app, path, "identity")  # rozgrzewka (pule połączeń, cache zapytań)
+        results[path] = {encoding: await measure(app, path, encoding) for encoding in encodings}
+    return results
+
+
+async def run(scales: List[int], seed: int) -> dict:
+    from sqlalchemy import func, select
+    from app import models
+    from app.compression import available_encodings
+    from app.database import SessionLocal, engine
+    from app.datagen import generate
+    from app.main import app
+
+    encodings = ["identity"] + available_encodings()
+    results = {}
+    for scale in sorted(scales):
+        generate(engine, scale, seed=seed)  # dokłada tylko brakujące wydziały
+        with SessionLocal() as db:
+            terms = db.scalar(select(func.count(models.ExamTerm.id)))
+            exams = db.scalar(select(func.count(models.Exam.id)))
+        tracemalloc.start()
+        requests = await run_scale(app, encodings)
+        tracemalloc.stop()
+        results[str(scale)] = {"exam_terms": terms, "exams": exams, "requests": requests}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, action="append", help="liczba wydziałów (można powtórzyć)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="large-lists-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(workdir)
+    try:
+        result = asyncio.run(run(args.scale or [50, 200, 800], args.seed))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
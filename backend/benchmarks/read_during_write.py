@@ -0,0 +1,173 @@
+"""
+Odczyty w trakcie zapisów dla profili SQLite (app.database.SQLITE_PROFILES).
+
+Uruchom (z katalogu backend, na zainicjalizowanej bazie):
+    python -m benchmarks.read_during_write --seconds 5 --readers 2
+
+Dla każdego profilu baza kopiowana jest do katalogu tymczasowego (i migrowana
+do bieżącego schematu). Jeden proces w pętli zapisuje duże partie wierszy (jak
+masowy import, każda partia we własnej transakcji), a wątki czytające pobierają
+listę terminów. Wynik (JSON) zawiera liczbę odczytów, ich opóźnienia
+(p50/p99/max) i liczbę błędów "database is locked" po obu stronach.
+
+Profil produkcyjny (WAL) nie może blokować odczytów: jeśli ma błędy odczytu
+albo p99 odczytu powyżej --max-read-p99-ms, kod wyjścia to 1
+(to samo sprawdza tests/test_read_during_write.py).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.database import POOL_OPTIONS, SQLITE_PROFILES, apply_sqlite_profile
+from app.migrations import run_migrations
+
+# Profil, który nie może blokować odczytów, i domyślny próg jego p99. Czekanie
+# na blokadę trwa do busy_timeout (5 s); próg zostawia zapas na szum planisty
+# (proces zapisujący zabiera czytelnikom CPU na słabej maszynie).
+CHECKED_PROFILE = "production"
+MAX_READ_P99_MS = 1000.0
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _writer(path: str, profile: str, batch: int, stop, results) -> None:
+    """Osobny proces zapisujący (bez współdzielenia GIL z wątkami czytającymi)"""
+    engine = create_engine(f"sqlite:///{path}")
+    apply_sqlite_profile(engine, profile)
+    rows = [{"p": "x" * 200}] * batch
+    stats = {"writes": 0, "write_errors": 0}
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO bench_writes VALUES (:p)"), rows)
+                conn.execute(text("DELETE FROM bench_writes"))
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+    engine.dispose()
+    results.put(stats)
+
+
+def run_profile(source: str, profile: str, seconds: float, readers: int, batch: int) -> dict:
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "exam_system.db")
+    shutil.copy(source, path)
+
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}, **POOL_OPTIONS
+    )
+    apply_sqlite_profile(engine, profile)
+    Session = sessionmaker(autoflush=False, bind=engine)
+    run_migrations(engine)
+    with Session() as db:
+        crud.get_exam_terms(db)  # bez zapisów błąd to usterka bazy, nie blokada
+
+    stop = multiprocessing.Event()
+    latencies: List[float] = []
+    stats = {"read_errors": 0}
+    lock = threading.Lock()
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE bench_writes (payload TEXT)"))
+
+    results = multiprocessing.Queue()
+    writer = multiprocessing.Process(
+        target=_writer, args=(path, profile, batch, stop, results)
+    )
+
+    def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    crud.get_exam_terms(db)
+            except OperationalError:
+                with lock:
+                    stats["read_errors"] += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer.start()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    stats.update(results.get())
+    writer.join()
+
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "profile": profile,
+        "reads": len(latencies),
+        **stats,
+        "read_p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "read_p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "read_max_ms": round(max(latencies), 2) if latencies else None,
+    }
+
+
+def regressions(results: List[dict], max_read_p99_ms: float) -> List[str]:
+    """Naruszenia progów dla CHECKED_PROFILE (pusta lista = brak regresji)"""
+    problems = []
+    for result in results:
+        if result["profile"] != CHECKED_PROFILE:
+            continue
+        if result["read_errors"]:
+            problems.append(f"{result['profile']}: {result['read_errors']} błędów odczytu w trakcie zapisu")
+        if not result["reads"]:
+            problems.append(f"{result['profile']}: brak udanych odczytów")
+        elif result["read_p99_ms"] > max_read_p99_ms:
+            problems.append(
+                f"{result['profile']}: p99 odczytu {result['read_p99_ms']} ms > {max_read_p99_ms} ms"
+            )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default="./data/exam_system.db")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=20000)
+    parser.add_argument("--profile", action="append", choices=sorted(SQLITE_PROFILES))
+    parser.add_argument(
+        "--max-read-p99-ms", type=float, default=MAX_READ_P99_MS,
+        help=f"próg p99 odczytu dla profilu {CHECKED_PROFILE}"
+    )
+    args = parser.parse_args()
+
+    results = [
+        run_profile(args.db, profile, args.seconds, args.readers, args.batch)
+        for profile in args.profile or sorted(SQLITE_PROFILES)
+    ]
+    print(json.dumps(results, indent=2))
+    problems = regressions(results, args.max_read_p99_ms)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Koszt CPU szybkiej serializacji list (app.serialization).
+
+Uruchom (z katalogu backend):
+    python -m benchmarks.serialization --faculties 200 --repeat 5
+
+Tworzy świeżą bazę w katalogu tymczasowym, wypełnia ją generatorem
+(app.datagen) i mierzy czas CPU (time.process_time) na 10k terminów: pobranie
+i serializację obiektów ORM przez Pydantic (ścieżka response_model) oraz
+krotek przez app.serialization. Zgodność bajtów obu ścieżek sprawdza
+tests/test_serialization.py.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, List
+
+PER_TERMS = 10_000
+
+
+def _reference(schema, objects) -> bytes:
+    """JSON ścieżki response_model: walidacja obiektów ORM i JSONResponse"""
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return JSONResponse(content=content).body
+
+
+def _fast(rows, to_dicts) -> bytes:
+    from app import serialization
+    return b"".join(serialization.json_array_chunks(to_dicts(rows)))
+
+
+def _cpu_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        samples.append(time.process_time() - start)
+    return statistics.median(samples) * 1000
+
+
+def cpu_per_10k(db, repeat: int) -> dict:
+    from app import crud, schemas, serialization
+
+    orm_query, rows_query = crud.exam_terms_query(), crud.exam_term_rows_query()
+    terms = db.scalars(orm_query).all()
+    rows = db.execute(rows_query).all()
+    scale = PER_TERMS / len(rows)
+
+    def orm_fetch():
+        db.expunge_all()
+        return db.scalars(orm_query).all()
+
+    timings = {
+        "pydantic_serialize_ms": _cpu_ms(lambda: _reference(schemas.ExamTermResponse, terms), repeat),
+        "fast_serialize_ms": _cpu_ms(lambda: _fast(rows, serialization.exam_term_dicts), repeat),
+        "orm_fetch_ms": _cpu_ms(orm_fetch, repeat),
+        "rows_fetch_ms": _cpu_ms(lambda: db.execute(rows_query).all(), repeat),
+    }
+    result = {name: round(value * scale, 1) for name, value in timings.items()}
+    result["pydantic_total_ms"] = round(result["orm_fetch_ms"] + result["pydantic_serialize_ms"], 1)
+    result["fast_total_ms"] = round(result["rows_fetch_ms"] + result["fast_serialize_ms"], 1)
+    result["speedup"] = round(result["pydantic_total_ms"] / result["fast_total_ms"], 2)
+    return result
+
+
+def run(faculties: int, repeat: int, seed: int) -> dict:
+    from app import models, serialization
+    from app.database import SessionLocal, engine
+    from app.datagen import generate
+    from app.migrations import run_migrations
+
+    models.Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    counts = generate(engine, faculties, seed=seed)["rows"]
+    with SessionLocal() as db:
+        cpu = cpu_per_10k(db, repeat)
+    return {
+        "terms": counts["exam_terms"],
+        "exams": counts["exams"],
+        "encoder": "orjson" if serialization.orjson is not None else "json",
+        "cpu_per_10k_terms": cpu,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--faculties", type=int, default=200, help="liczba wydziałów (ok. 50 terminów każdy)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="serialization-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(workdir)
+    try:
+        result = run(args.faculties, args.repeat, args.seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Generator syntetycznych danych w skali wydziałów (app/datagen.py)
+Uruchom:
+    python generate_data.py --faculties 100
+    python generate_data.py --faculties 2000 --kierunki 5 --exams-per-cohort 10 --density 0.7
+
+Ponowne uruchomienie pomija wydziały już obecne w bazie.
+"""
+import argparse
+import json
+import os
+
+from app import datagen
+from app.database import engine
+from app.migrations import run_migrations
+from app.models import Base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator syntetycznych danych systemu egzaminów")
+    parser.add_argument("--faculties", type=int, required=True, help="liczba wydziałów")
+    parser.add_argument("--kierunki", type=int, default=3, help="kierunków na wydział")
+    parser.add_argument("--years", type=int, default=3, help="lat studiów na kierunku")
+    parser.add_argument("--study-types", type=int, default=2,
+                        help=f"typów studiów na kierunku (1-{len(datagen.STUDY_TYPES)})")
+    parser.add_argument("--exams-per-cohort", type=int, default=6, help="egzaminów na rocznik")
+    parser.add_argument("--rooms", type=int, default=20, help="sal na wydział")
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="udział egzaminów z zaplanowanym terminem (0-1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=datagen.BATCH_SIZE)
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="nie usuwaj indeksów na czas ładowania (małe przyrosty do dużej bazy)")
+    args = parser.parse_args()
+
+    os.makedirs("data", exist_ok=True)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    try:
+        result = datagen.generate(
+            engine,
+            faculties=args.faculties,
+            kierunki=args.kierunki,
+            years=args.years,
+            study_types=args.study_types,
+            exams_per_cohort=args.exams_per_cohort,
+            rooms=args.rooms,
+            density=args.density,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            keep_indexes=args.keep_indexes,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Masowy import i eksport danych z/do plików CSV lub JSONL
+Uruchom:
+    python import_data.py import subjects przedmioty.csv
+    python import_data.py import terms terminy.jsonl
+    python import_data.py export rooms sale.csv
+"""
+import argparse
+import os
+import sys
+
+from app import bulk
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import Base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/eksport danych systemu egzaminów")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("entity", choices=list(bulk.ENTITIES))
+    parser.add_argument("path", help="Plik wejściowy/wyjściowy (- = stdin/stdout)")
+    parser.add_argument("--format", choices=bulk.FORMATS, default=None)
+    args = parser.parse_args()
+
+    os.makedirs("data", exist_ok=True)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    fmt = bulk.detect_format(args.path, args.format)
+    db = SessionLocal()
+    try:
+        if args.action == "import":
+            if args.path == "-":
+                report = bulk.import_rows(db, args.entity, sys.stdin.buffer, fmt)
+            else:
+                with open(args.path, "rb") as f:
+                    report = bulk.import_rows(db, args.entity, f, fmt)
+            print(f"Zaimportowano: {report['inserted']}, błędów: {report['failed']}")
+            for error in report["errors"]:
+                print(f"   wiersz {error['row']}: {error['error']}", file=sys.stderr)
+        else:
+            out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+            try:
+                for chunk in bulk.export_rows(db, args.entity, fmt):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
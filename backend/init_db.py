@@ -3,18 +3,25 @@ Skrypt do inicjalizacji bazy danych z przykładowymi danymi
 Uruchom: python init_db.py
 """
 from app.database import SessionLocal, engine
+from app.migrations import run_migrations
 from app.models import Base, DemoUser, Subject, Exam, SessionPeriod, Room, UserRole, TypStudiow
 import os
 
 # Tworzymy katalog na bazę
 os.makedirs("data", exist_ok=True)
 
-# Tworzymy tabele
+# Tworzymy tabele i aktualizujemy schemat
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 db = SessionLocal()
 
-# Czyścimy istniejące dane (opcjonalnie)
+# Dane demo dodajemy tylko do pustej bazy (unikalne klucze odrzuciłyby duplikaty)
+if db.query(DemoUser).first() is not None:
+    print("Baza danych zawiera już dane - pomijam inicjalizację")
+    db.close()
+    raise SystemExit(0)
+
 print("Inicjalizacja bazy danych...")
 
 # Demo Users
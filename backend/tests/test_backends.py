@@ -0,0 +1,115 @@
+"""
+Ta sama aplikacja na każdym backendzie bazy (SQLite, PostgreSQL - patrz conftest).
+
+Migracje, listy, tworzenie i zatwierdzanie terminów oraz kierowanie odczytów
+do repliki (DATABASE_REPLICA_URL) sprawdzane są na prawdziwej bazie danego
+backendu - różnice dialektów (RETURNING, indeksy częściowe, typy dat) wychodzą
+tu, a nie dopiero na produkcji.
+"""
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from tests.conftest import app_instance, create_database, init_database
+
+REPLICA_ROOM = "Sala tylko w replice"
+
+
+def test_migrations_are_applied_once(backend):
+    from app.database import engine
+    from app.migrations import MIGRATIONS, get_schema_version, run_migrations
+
+    assert run_migrations(engine) == []  # init_db.py zastosował już wszystkie
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+    indexes = {index["name"] for index in inspect(engine).get_indexes("exam_terms")}
+    assert {"uq_exam_terms_exam_slot", "uq_exam_terms_room_slot"} <= indexes
+
+
+def test_lists_include_new_term(client, factory):
+    term = factory.term()
+    for path in ["/api/exam-terms/", "/api/exam-terms/?limit=500", "/api/exam-terms/?status=proposed"]:
+        listed = {t["id"]: t for t in client.get(path).json()}
+        assert term["id"] in listed, path
+        assert listed[term["id"]]["exam"]["subject"]["id"] == term["exam"]["subject"]["id"]
+    exams = {e["id"] for e in client.get("/api/exams/").json()}
+    assert term["exam_id"] in exams
+
+
+def test_create_and_approve_term(client, factory):
+    term = factory.term()
+    assert term["status"] == "proposed"
+
+    response = client.put(f"/api/exam-terms/{term['id']}", json={
+        "approved_by_role": "admin", "approved_by_name": "Administrator testów", "status": "approved",
+    })
+    assert response.status_code == 200, response.text
+    approved = response.json()
+    assert approved["status"] == "approved"
+    assert approved["row_version"] > term["row_version"]
+    assert client.get(f"/api/exam-terms/{term['id']}").json()["status"] == "approved"
+
+
+def test_room_conflict_is_rejected(client, factory):
+    term = factory.term()
+    response = client.post("/api/exam-terms/", json={
+        "exam_id": factory.exam()["id"], "data": term["data"], "godzina": term["godzina"],
+        "sala": term["sala"], "proposed_by_role": "admin", "proposed_by_name": "Administrator testów",
+    })
+    assert response.status_code == 400
+    assert term["sala"] in response.json()["detail"]
+
+
+@pytest.fixture(scope="module")
+def replica(backend, backend_name, tmp_path_factory):
+    """
+    Aplikacja z osobną bazą główną i repliką; w replice jest sala, której
+    nie ma w bazie głównej (REPLICA_ROOM)
+    """
+    from fastapi.testclient import TestClient
+
+    workdir = tmp_path_factory.mktemp(f"{backend_name}-replica")
+    primary_url = create_database(backend_name, workdir, "primary")
+    replica_url = create_database(backend_name, workdir, "replica")
+    for url in (primary_url, replica_url):
+        init_database(url, workdir)
+    replica_engine = create_engine(replica_url)
+    with replica_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO rooms (nazwa, budynek, pojemnosc) VALUES (:nazwa, 'R', 10)"
+        ), {"nazwa": REPLICA_ROOM})
+
+    with app_instance(primary_url, workdir, replica_url) as main:
+        with TestClient(main.app) as replica_client:
+            yield replica_client, replica_engine
+    replica_engine.dispose()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica):
+    from app import database
+
+    client, replica_engine = replica
+    assert database.read_engine is not database.engine
+
+    assert client.get(f"/api/rooms/{REPLICA_ROOM}").status_code == 200
+
+    response = client.post("/api/rooms", json={"nazwa": "Sala tylko w bazie głównej", "budynek": "P", "pojemnosc": 10})
+    assert response.status_code == 200, response.text
+    with database.engine.connect() as conn:
+        assert conn.scalar(text("SELECT COUNT(*) FROM rooms WHERE nazwa = 'Sala tylko w bazie głównej'")) == 1
+    with replica_engine.connect() as conn:
+        assert conn.scalar(text("SELECT COUNT(*) FROM rooms WHERE nazwa = 'Sala tylko w bazie głównej'")) == 0
+    # Replika (bez replikacji w teście) nie widzi zapisu
+    assert client.get("/api/rooms/Sala tylko w bazie głównej").status_code == 404
+
+    primary_statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        primary_statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert client.get("/api/exam-terms/").status_code == 200
+        assert client.get("/api/exams/?limit=10").status_code == 200
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+    assert primary_statements == []
@@ -0,0 +1,97 @@
+"""
+Zatwierdzanie zbiorcze (/api/exam-terms/bulk): wynik osobno dla każdej decyzji,
+kolizje w obrębie partii i wybór terminów filtrem.
+"""
+from tests.conftest import TERM_DAY
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+
+
+def _bulk(client, **body) -> dict:
+    response = client.put("/api/exam-terms/bulk", json={**ADMIN, **body})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _status(client, term_id: int) -> str:
+    return client.get(f"/api/exam-terms/{term_id}").json()["status"]
+
+
+def test_bulk_reports_each_decision(client, factory):
+    approve, reject = factory.term(), factory.term()
+    # Odrzucony termin 10:00 (90 min) i nowy 10:30 w tej samej sali: zatwierdzić można jeden
+    first = factory.term(godzina="10:00", czas_trwania=90)
+    response = client.put(f"/api/exam-terms/{first['id']}", json={**ADMIN, "status": "rejected"})
+    assert response.status_code == 200, response.text
+    second = factory.term(godzina="10:30", sala=first["sala"])
+
+    missing = 10 ** 9
+    body = _bulk(client, decisions=[
+        {"term_id": approve["id"], "status": "approved"},
+        {"term_id": reject["id"], "status": "rejected"},
+        {"term_id": missing, "status": "approved"},
+        {"term_id": approve["id"], "status": "rejected"},
+        {"term_id": reject["id"], "status": "proposed"},
+        {"term_id": second["id"], "status": "approved"},
+        {"term_id": first["id"], "status": "approved"},
+    ])
+
+    assert (body["approved"], body["rejected"], body["failed"]) == (2, 1, 4)
+    outcomes = [(r["term_id"], r["status"], r["ok"], r["message"]) for r in body["results"]]
+    assert outcomes == [
+        (approve["id"], "approved", True, None),
+        (reject["id"], "rejected", True, None),
+        (missing, "approved", False, "Termin nie znaleziony"),
+        (approve["id"], "rejected", False, "Powtórzona decyzja dla terminu"),
+        (reject["id"], "proposed", False, "Dozwolone decyzje: approved, rejected"),
+        (second["id"], "approved", True, None),
+        (first["id"], "approved", False, f"Sala {first['sala']} jest już zajęta w dniu {TERM_DAY} o godzinie 10:00"),
+    ]
+    assert [_status(client, t["id"]) for t in (approve, reject, second, first)] == [
+        "approved", "rejected", "approved", "rejected",
+    ]
+
+
+def test_bulk_rejects_second_exam_of_cohort_on_one_day(client, factory):
+    exam = factory.exam()
+    first = factory.term(exam_id=exam["id"], godzina="08:00")
+    response = client.put(f"/api/exam-terms/{first['id']}", json={**ADMIN, "status": "rejected"})
+    assert response.status_code == 200, response.text
+    second = factory.term(exam_id=exam["id"], godzina="14:00")
+
+    body = _bulk(client, decisions=[
+        {"term_id": second["id"], "status": "approved"},
+        {"term_id": first["id"], "status": "approved"},
+    ])
+    assert (body["approved"], body["failed"]) == (1, 1)
+    subject = exam["subject"]
+    assert body["results"][1]["message"] == (
+        f"Studenci {subject['kierunek']} ({subject['typ_studiow']}, rok {subject['rok']}) "
+        f"mają już egzamin w dniu {TERM_DAY}"
+    )
+    assert [_status(client, t["id"]) for t in (second, first)] == ["approved", "rejected"]
+
+
+def test_bulk_by_filter(client, factory):
+    exam = factory.exam()
+    kierunek = exam["subject"]["kierunek"]
+    terms = [factory.term(exam_id=exam["id"], data=day) for day in (TERM_DAY, "2026-02-05")]
+    untouched = factory.term()
+
+    body = _bulk(client, filter={"kierunek": kierunek}, status="rejected")
+    assert (body["approved"], body["rejected"], body["failed"]) == (0, 2, 0)
+    assert [r["term_id"] for r in body["results"]] == [t["id"] for t in terms]
+    assert [_status(client, t["id"]) for t in terms] == ["rejected", "rejected"]
+    assert _status(client, untouched["id"]) == "proposed"
+
+    # Filtr obejmuje tylko terminy w podanym statusie (domyślnie proposed)
+    assert _bulk(client, filter={"kierunek": kierunek}, status="approved")["results"] == []
+
+
+def test_bulk_requires_decisions_or_filter_with_status(client, factory):
+    term = factory.term()
+    decisions = [{"term_id": term["id"], "status": "approved"}]
+    for body in ({}, {"decisions": decisions, "filter": {}}, {"filter": {}}):
+        response = client.put("/api/exam-terms/bulk", json={**ADMIN, **body})
+        assert response.status_code == 400, body
+    assert _status(client, term["id"]) == "proposed"
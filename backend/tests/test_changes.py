@@ -0,0 +1,168 @@
+"""
+Zapisy innych instancji backendu na wspólnej bazie: indeks zajętości i strumień
+zmian (SSE) czytają je z bazy (change_counters, row_version, exam_term_tombstones),
+a nie z pamięci procesu, który zapisywał. Strumień wznawia się od Last-Event-ID,
+a zmiany jednej transakcji dzielą jeden identyfikator.
+"""
+import asyncio
+import json
+from typing import List, Optional, Tuple
+
+from tests.conftest import delete_term_elsewhere
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+STREAM_TIMEOUT = 5
+
+Event = Tuple[Optional[str], str, dict]
+
+
+def _set_status_elsewhere(term_id: int, status: str) -> None:
+    """Zapis innej instancji: baza bez indeksu zajętości i powiadomień tego procesu"""
+    from app import crud, models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        term = db.get(models.ExamTerm, term_id)
+        term.status = models.TermStatus(status)
+        crud._stamp_terms(db, [term])
+        db.commit()
+
+
+def _parse(chunk: str) -> Optional[Event]:
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if ": " in line)
+    if "event" not in fields:
+        return None
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+def _read_events(client, last_event_id: Optional[str], count: int, during=None) -> Tuple[str, List[Event]]:
+    """Identyfikator z powitania strumienia (retry) i pierwsze count zdarzeń"""
+    from app.changefeed import change_feed
+    from app.routers.terms import _term_events, _term_version
+
+    async def read():
+        stream = change_feed.stream(last_event_id, _term_events, _term_version)
+        hello, events = None, []
+        try:
+            while hello is None or len(events) < count:
+                chunk = await asyncio.wait_for(stream.__anext__(), STREAM_TIMEOUT)
+                if chunk.startswith("retry:"):
+                    hello = chunk.split("id: ")[1].strip()
+                    if during is not None:
+                        asyncio.get_running_loop().create_task(during())
+                elif _parse(chunk) is not None:
+                    events.append(_parse(chunk))
+            return hello, events
+        finally:
+            await stream.aclose()
+
+    return client.portal.call(read)
+
+
+def _version(client) -> str:
+    return client.get("/api/exam-terms/", params={"since": 0}).headers["X-Row-Version"]
+
+
+def test_stream_resumes_from_last_event_id(client, factory):
+    start = _version(client)
+    first = factory.term()
+    response = client.put(f"/api/exam-terms/{first['id']}", json={**ADMIN, "status": "approved"})
+    assert response.status_code == 200, response.text
+    second = factory.term()
+    delete_term_elsewhere(second["id"])
+    third = factory.term()
+
+    hello, events = _read_events(client, start, 3)
+    assert hello == start
+    assert [(event, data["id"]) for _, event, data in events] == [
+        ("approved", first["id"]), ("deleted", second["id"]), ("created", third["id"]),
+    ]
+    assert events[-1][0] == _version(client)
+
+    # Wznowienie od identyfikatora drugiego zdarzenia daje tylko trzecie
+    _, resumed = _read_events(client, events[1][0], 1)
+    assert [(event, data["id"]) for _, event, data in resumed] == [("created", third["id"])]
+
+
+def test_bulk_changes_share_one_event_id(client, factory):
+    start = _version(client)
+    first, second = factory.term(), factory.term()
+    response = client.put("/api/exam-terms/bulk", json={**ADMIN, "decisions": [
+        {"term_id": first["id"], "status": "approved"},
+        {"term_id": second["id"], "status": "approved"},
+    ]})
+    assert response.status_code == 200, response.text
+
+    # Utworzenie i zatwierdzenie terminu daje jedno zdarzenie z jego bieżącym stanem
+    _, events = _read_events(client, start, 2)
+    assert [(event, data["id"]) for _, event, data in events] == [
+        ("approved", first["id"]), ("approved", second["id"]),
+    ]
+    # Jedna wersja dla całej transakcji: identyfikator tylko przy ostatnim zdarzeniu
+    assert [event_id for event_id, _, _ in events] == [None, _version(client)]
+
+
+def test_stream_wakes_on_local_write(client, factory, monkeypatch):
+    from app.changefeed import change_feed
+
+    # Bez odpytywania licznika: zapis w tym procesie budzi strumień sam
+    monkeypatch.setattr(change_feed, "poll_seconds", 100)
+    term = factory.term()
+
+    async def approve():
+        await asyncio.sleep(0.2)
+        response = await asyncio.to_thread(
+            client.put, f"/api/exam-terms/{term['id']}", json={**ADMIN, "status": "approved"}
+        )
+        assert response.status_code == 200, response.text
+
+    _, events = _read_events(client, None, 1, during=approve)
+    (event_id, event, data), = events
+    assert (event, data["id"]) == ("approved", term["id"])
+    assert event_id == _version(client)
+
+
+def test_stream_sees_writes_of_other_instances(client, factory, monkeypatch):
+    from app.changefeed import change_feed
+
+    monkeypatch.setattr(change_feed, "poll_seconds", 0.1)
+    term = factory.term()
+
+    async def reject_elsewhere():
+        await asyncio.sleep(0.3)
+        await asyncio.to_thread(_set_status_elsewhere, term["id"], "rejected")
+
+    hello, events = _read_events(client, None, 1, during=reject_elsewhere)
+    assert int(hello) < int(_version(client))
+    (event_id, event, data), = events
+    assert (event, data["id"], data["status"]) == ("rejected", term["id"], "rejected")
+    assert event_id == _version(client)
+
+
+def test_stream_resets_unknown_event_id(client):
+    hello, events = _read_events(client, "stara-epoka-7", 1)
+    assert events == [(hello, "reset", {})]
+
+
+def test_occupancy_follows_writes_of_other_instances(client, factory):
+    term = factory.term()
+    params = {"data": term["data"], "godzina": term["godzina"], "sala": term["sala"]}
+    assert client.get("/api/exam-terms/validation/check-room", params=params).json()["valid"] is False
+
+    _set_status_elsewhere(term["id"], "rejected")
+    assert client.get("/api/exam-terms/validation/check-room", params=params).json()["valid"] is True
+
+    _set_status_elsewhere(term["id"], "approved")
+    assert client.get("/api/exam-terms/validation/check-room", params=params).json()["valid"] is False
+    consistency = client.get("/api/admin/occupancy-check")
+    assert consistency.status_code == 200, consistency.text
+    assert consistency.json()["consistent"], consistency.json()
+
+
+def test_caches_expire_by_default_on_shared_database(backend, backend_name):
+    from app.refdata import reference_cache
+    from app.sessions import session_calendar
+
+    shared = backend_name == "postgresql"
+    assert (session_calendar.max_age > 0) == shared
+    assert (reference_cache.max_age > 0) == shared
@@ -0,0 +1,75 @@
+"""
+Walidacja wielu kandydatów (data, godzina, sala) jednym zapytaniem:
+/api/exam-terms/validation/check-slots ocenia każdego kandydata osobno.
+"""
+from tests.conftest import TERM_DAY
+
+ADMIN_ROLE = "admin"
+
+
+def _check(client, exam_id: int, slots: list, liczba_osob: int = 30, role: str = ADMIN_ROLE) -> list:
+    response = client.post("/api/exam-terms/validation/check-slots", json={
+        "exam_id": exam_id, "liczba_osob": liczba_osob, "proposed_by_role": role, "slots": slots,
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["exam_id"] == exam_id
+    return body["results"]
+
+
+def test_each_candidate_gets_its_own_verdict(client, factory):
+    room, small = factory.room(pojemnosc=40), factory.room(pojemnosc=10)
+    exam = factory.exam()
+    # Sala zajęta 10:00-11:30 drugiego dnia, rocznik egzaminu zajęty trzeciego dnia
+    factory.term(data="2026-02-04", godzina="10:00", czas_trwania=90, sala=room["nazwa"])
+    factory.term(exam_id=exam["id"], data="2026-02-05", godzina="08:00")
+
+    slots = [
+        {"data": TERM_DAY, "godzina": "08:00", "sala": room["nazwa"]},
+        {"data": TERM_DAY, "godzina": "08:00", "sala": "Sala-nieistniejaca"},
+        {"data": TERM_DAY, "godzina": "08:00", "sala": small["nazwa"]},
+        {"data": "2026-02-04", "godzina": "11:00", "sala": room["nazwa"]},
+        {"data": "2026-02-04", "godzina": "11:30", "sala": room["nazwa"]},
+        {"data": "2026-02-05", "godzina": "12:00", "sala": room["nazwa"]},
+    ]
+    results = _check(client, exam["id"], slots)
+
+    assert [(r["data"], r["godzina"], r["sala"]) for r in results] == [
+        (s["data"], s["godzina"], s["sala"]) for s in slots
+    ]
+    flags = [
+        (r["valid"], r["room_exists"], r["capacity_ok"], r["room_free"], r["students_free"])
+        for r in results
+    ]
+    assert flags == [
+        (True, True, True, True, True),
+        (False, False, False, True, True),
+        (False, True, False, True, True),
+        (False, True, True, False, True),
+        (True, True, True, True, True),
+        (False, True, True, True, False),
+    ]
+    assert "nie istnieje" in results[1]["messages"][0]
+    assert "pojemność 10" in results[2]["messages"][0]
+    assert "zajęta" in results[3]["messages"][0]
+    assert "egzamin w dniu 2026-02-05" in results[5]["messages"][0]
+
+
+def test_session_check_applies_to_non_admin(client, factory):
+    room = factory.room()
+    exam = factory.exam()
+    slot = {"data": "2099-01-01", "godzina": "08:00", "sala": room["nazwa"]}
+
+    admin, = _check(client, exam["id"], [slot])
+    assert admin["valid"] and not admin["in_session"]
+
+    teacher, = _check(client, exam["id"], [slot], role="prowadzacy")
+    assert not teacher["valid"] and not teacher["in_session"]
+    assert teacher["messages"] == ["Data 2099-01-01 jest poza okresem sesji"]
+
+
+def test_unknown_exam_is_404(client):
+    response = client.post("/api/exam-terms/validation/check-slots", json={
+        "exam_id": 10 ** 9, "liczba_osob": 1, "slots": [],
+    })
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+"""
+Negocjowana kompresja odpowiedzi (app.compression): wybór kodowania
+z Accept-Encoding, gzip dla dużych list (także strumieniowanych), brotli gdy
+zainstalowany jest pakiet brotli, małe odpowiedzi bez kompresji.
+"""
+import gzip
+
+import pytest
+
+from tests.conftest import TERM_DAY
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("identity", None),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("", None),
+])
+def test_choose_encoding_by_weight(accept, expected):
+    from app.compression import choose_encoding
+
+    assert choose_encoding(accept, ["br", "gzip"]) == expected
+
+
+def test_brotli_is_offered_only_when_installed():
+    from app.compression import brotli, choose_encoding
+
+    expected = "br" if brotli is not None else None
+    assert choose_encoding("br") == expected
+    assert choose_encoding("br, gzip") == (expected or "gzip")
+
+
+def _raw(client, path: str, accept: str, **params):
+    """Odpowiedź z ciałem w postaci przesłanej (bez dekodowania Content-Encoding)"""
+    with client.stream("GET", path, params=params, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.fixture
+def many_terms(factory):
+    return [factory.term(data=TERM_DAY, godzina=hour) for hour in ("08:00", "10:00", "12:00", "14:00")]
+
+
+@pytest.mark.parametrize("path", ["/api/exam-terms/", "/api/exam-terms/timetable"])
+def test_large_response_is_gzipped(client, many_terms, path):
+    plain, body = _raw(client, path, "identity")
+    assert "content-encoding" not in plain.headers
+    assert len(body) >= 1024
+
+    response, compressed = _raw(client, path, "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert gzip.decompress(compressed) == body
+    assert len(compressed) < len(body)
+    if "content-length" in response.headers:
+        assert int(response.headers["content-length"]) == len(compressed)
+
+
+def test_large_response_is_brotli_encoded(client, many_terms):
+    brotli = pytest.importorskip("brotli")
+
+    _, body = _raw(client, "/api/exam-terms/", "identity")
+    response, compressed = _raw(client, "/api/exam-terms/", "br, gzip")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(compressed) == body
+
+
+def test_small_response_is_not_compressed(client, factory):
+    term = factory.term()
+    response, body = _raw(client, f"/api/exam-terms/{term['id']}", "gzip")
+    assert len(body) < 1024
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,20 @@
+"""
+Równoległe propozycje terminów (benchmarks/concurrent_proposals.py) nie
+tworzą podwójnych rezerwacji sal ani roczników - także gdy między nimi
+partie zatwierdzania zbiorczego przywracają odrzucone terminy w tych samych salach.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("seed, reopens", [(11, 0), (12, 40)], ids=["proposals", "with-bulk-reopens"])
+def test_no_double_bookings(backend, seed, reopens):
+    from benchmarks.concurrent_proposals import run
+
+    # Osobne sale dla każdego przypadku - siatka poprzedniego jest już zapełniona
+    rooms = [f"P{seed}-{n}" for n in range(3)]
+    result = run(proposals=200, threads=16, exams=60, days=2, seed=seed, reopens=reopens, rooms=rooms)
+    assert result["created"] > 0, result
+    assert result["other_statuses"] == {}, result
+    assert result["double_booked_rooms"] == 0, result
+    assert result["double_booked_cohorts"] == 0, result
+    assert result["occupancy_consistent"], result
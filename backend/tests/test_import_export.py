@@ -0,0 +1,94 @@
+"""
+Masowy import CSV/JSONL: błędne wiersze są pomijane i raportowane z numerem
+wiersza pliku, poprawne zapisywane. Eksport zwraca zaimportowane dane.
+"""
+import json
+
+from tests.conftest import TERM_DAY
+
+
+def _import(client, entity: str, filename: str, content: str) -> dict:
+    response = client.post(f"/api/import/{entity}", files={"file": (filename, content.encode())})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _errors(report: dict) -> dict:
+    return {e["row"]: e["error"] for e in report["errors"]}
+
+
+def test_csv_import_reports_bad_rows(client, factory):
+    existing = factory.room()
+    content = "\n".join([
+        "nazwa,budynek,pojemnosc,typ",
+        "Import-CSV-1,B1,40,wykladowa",          # wiersz 2
+        "Import-CSV-2,B1,dużo,",                 # 3: pojemność nie jest liczbą
+        f"{existing['nazwa']},B1,40,",           # 4: sala już jest w bazie
+        "Import-CSV-1,B2,20,",                   # 5: powtórzona w pliku
+        "Import-CSV-3,B2,,",                     # 6: brak pojemności
+        "Import-CSV-4,B2,25,",                   # 7
+    ]) + "\n"
+    report = _import(client, "rooms", "sale.csv", content)
+
+    assert (report["entity"], report["inserted"], report["failed"]) == ("rooms", 2, 4)
+    errors = _errors(report)
+    assert sorted(errors) == [3, 4, 5, 6]
+    assert errors[3].startswith("pojemnosc:")
+    assert errors[4] == f"Sala '{existing['nazwa']}' już istnieje"
+    assert errors[5] == "Sala 'Import-CSV-1' już istnieje"
+    assert errors[6].startswith("pojemnosc:")
+
+    exported = client.get("/api/export/rooms", params={"format": "csv"})
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("text/csv")
+    lines = exported.text.splitlines()
+    assert lines[0].split(",")[:2] == ["id", "nazwa"]
+    assert sum(line.split(",")[1] in ("Import-CSV-1", "Import-CSV-4") for line in lines) == 2
+
+
+def test_jsonl_import_reports_bad_rows(client, factory):
+    exam, other = factory.exam(), factory.exam()
+    busy = factory.term(exam_id=other["id"], data=TERM_DAY, godzina="12:00")
+
+    def term(exam_id: int, **fields) -> str:
+        row = {
+            "exam_id": exam_id, "data": "2026-02-06", "godzina": "08:00", "sala": "Import-JSONL",
+            "proposed_by_role": "admin", "proposed_by_name": "Import", **fields,
+        }
+        return json.dumps(row)
+
+    lines = [
+        term(exam["id"]),                                   # 1
+        "{niepoprawny json",                                # 2
+        "[1, 2]",                                           # 3: nie jest obiektem
+        "",                                                 # pusta linia jest pomijana
+        term(10 ** 9),                                      # 5: brak egzaminu
+        term(other["id"], godzina="09:00"),                 # 6: sala zajęta przez wiersz 1
+        term(other["id"], godzina="08:00", sala=busy["sala"], data=TERM_DAY),  # 7: rocznik zajęty
+        term(exam["id"], godzina="9:99"),                   # 8: zła godzina
+        term(other["id"], godzina="09:30"),                 # 9: od 09:30 sala już wolna
+    ]
+    report = _import(client, "terms", "terminy.jsonl", "\n".join(lines) + "\n")
+
+    assert (report["inserted"], report["failed"]) == (2, 6)
+    errors = _errors(report)
+    assert sorted(errors) == [2, 3, 5, 6, 7, 8]
+    assert errors[2].startswith("Nieprawidłowy wiersz:")
+    assert errors[3] == "Nieprawidłowy wiersz: Wiersz musi być obiektem JSON"
+    assert errors[5] == f"Egzamin {10 ** 9} nie istnieje"
+    assert errors[6].startswith("Sala Import-JSONL jest już zajęta")
+    assert "mają już egzamin w dniu" in errors[7]
+    assert errors[8].startswith("godzina:")
+
+    exported = client.get("/api/export/terms", params={"format": "jsonl"})
+    assert exported.status_code == 200
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    imported = sorted(
+        (row["exam_id"], row["godzina"], row["status"]) for row in rows if row["sala"] == "Import-JSONL"
+    )
+    assert imported == sorted([(exam["id"], "08:00", "proposed"), (other["id"], "09:30", "proposed")])
+
+
+def test_unknown_entity_and_format(client):
+    assert client.post("/api/import/users", files={"file": ("a.csv", b"")}).status_code == 404
+    assert client.get("/api/export/rooms", params={"format": "xml"}).status_code == 400
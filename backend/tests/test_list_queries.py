@@ -0,0 +1,43 @@
+"""
+Liczba zapytań SQL endpointów listujących nie zależy od liczby wierszy.
+
+Graf Term -> Exam -> Subject ładowany jest jednym zapytaniem (bez N+1 przy
+serializacji), więc lista z kilkoma i z kilkunastoma terminami wykonuje tę
+samą, stałą liczbę zapytań.
+"""
+import pytest
+
+# (ścieżka, oczekiwana liczba zapytań SQL)
+LIST_ENDPOINTS = [
+    ("/api/exam-terms/", 2),                 # wersja listy + terminy z egzaminem i przedmiotem
+    ("/api/exam-terms/?limit=500", 2),
+    ("/api/exam-terms/?fields=id,data,sala", 2),
+    ("/api/exams/", 1),                      # egzaminy z przedmiotem
+    ("/api/exams/?limit=500", 1),
+]
+
+
+@pytest.mark.parametrize("path, expected", LIST_ENDPOINTS)
+def test_list_statement_count_is_constant(client, factory, sql_statements, path, expected):
+    for _ in range(3):
+        factory.term()
+    with sql_statements() as few:
+        first = client.get(path)
+    assert first.status_code == 200
+
+    for _ in range(10):
+        factory.term()
+    with sql_statements() as many:
+        second = client.get(path)
+    assert second.status_code == 200
+    assert len(second.json()) >= len(first.json()) + 10
+
+    assert few.count == expected, few.statements
+    assert many.count == expected, many.statements
+
+
+def test_exam_term_list_includes_nested_exam_and_subject(client, factory):
+    term = factory.term()
+    listed = {t["id"]: t for t in client.get("/api/exam-terms/").json()}[term["id"]]
+    assert listed["exam"]["id"] == term["exam_id"]
+    assert listed["exam"]["subject"]["id"] == term["exam"]["subject"]["id"]
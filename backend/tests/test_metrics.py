@@ -0,0 +1,28 @@
+"""
+Liczenie zapytań SQL (app.metrics.instrument_engine): zapytanie zakończone
+błędem nie psuje pomiaru kolejnych zapytań na tym samym połączeniu.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+
+def test_failed_statement_does_not_leak_start_time():
+    from app import metrics
+
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    trace = metrics.RequestTrace(collect_statements=True)
+    token = metrics._current_trace.set(trace)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM brak_tabeli"))
+            assert conn.execute(text("SELECT 1")).scalar_one() == 1
+            assert "query_start" not in conn.info
+    finally:
+        metrics._current_trace.reset(token)
+        engine.dispose()
+
+    assert trace.statements == 1
+    assert [statement for _, statement in trace.collected] == ["SELECT 1"]
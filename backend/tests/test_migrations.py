@@ -0,0 +1,106 @@
+"""
+Migracje od schematu w wersji 1 do bieżącej na bazie z duplikatami.
+
+Baza w wersji 1 powstaje z bieżących modeli bez kolumn, tabel i indeksów
+dodanych przez migracje 2-6, więc migracje muszą działać na kolumnach, które
+wtedy istniały (a nie na bieżących modelach). Po migracji schemat musi być
+taki sam jak świeżo utworzony z modeli.
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from tests.conftest import create_database
+
+# Indeksy i kolumny dodane po wersji 1 schematu
+LATER_INDEXES = [
+    "uq_subjects_natural", "uq_exams_subject_prowadzacy", "uq_exam_terms_exam_slot",
+    "uq_demo_users_name_role", "uq_exam_terms_room_slot",
+    "ix_exam_terms_row_version", "ix_exam_terms_room_interval",
+]
+LATER_TERM_COLUMNS = ["updated_at", "row_version", "czas_trwania", "start_min", "end_min"]
+
+
+def _schema_v1(engine) -> None:
+    from app import models
+    from app.migrations import metadata, schema_migrations
+
+    models.Base.metadata.create_all(bind=engine)
+    metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for index in LATER_INDEXES:
+            conn.execute(text(f"DROP INDEX {index}"))
+        for column in LATER_TERM_COLUMNS:
+            conn.execute(text(f"ALTER TABLE exam_terms DROP COLUMN {column}"))
+        for table in ("exam_term_tombstones", "change_counters"):
+            conn.execute(text(f"DROP TABLE {table}"))
+        conn.execute(schema_migrations.insert().values(version=1, description="Wersja 1"))
+
+
+def _insert(conn, table: str, **values) -> int:
+    columns = ", ".join(values)
+    params = ", ".join(f":{c}" for c in values)
+    return conn.execute(
+        text(f"INSERT INTO {table} ({columns}) VALUES ({params}) RETURNING id"), values
+    ).scalar_one()
+
+
+def test_migrations_from_v1_merge_duplicates(backend, backend_name, tmp_path):
+    from app.migrations import MIGRATIONS, get_schema_version, run_migrations
+
+    engine = create_engine(create_database(backend_name, tmp_path, "migrations"))
+    _schema_v1(engine)
+
+    subject = dict(nazwa="Analiza", kierunek="Informatyka", typ_studiow="STACJONARNE_I", rok=1)
+    term = dict(data="2026-02-02", godzina="10:00", sala="A1", proposed_by_role="ADMIN", proposed_by_name="Admin")
+    with engine.begin() as conn:
+        s1 = _insert(conn, "subjects", **subject)
+        s2 = _insert(conn, "subjects", **subject)
+        e1 = _insert(conn, "exams", subject_id=s1, prowadzacy_name="Dr A")
+        e2 = _insert(conn, "exams", subject_id=s2, prowadzacy_name="Dr A")
+        kept = _insert(conn, "exam_terms", exam_id=e1, status="APPROVED", **term)
+        duplicate = _insert(conn, "exam_terms", exam_id=e2, status="PROPOSED", **term)
+        rejected = _insert(conn, "exam_terms", exam_id=e1, status="REJECTED", **term)
+        moved = _insert(conn, "exam_terms", exam_id=e2, status="PROPOSED", **dict(term, sala="A2"))
+        for _ in range(2):
+            _insert(conn, "demo_users", name="Jan", role="ADMIN")
+
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS if version > 1]
+
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+        assert conn.execute(text("SELECT id FROM subjects")).scalars().all() == [s1]
+        assert conn.execute(text("SELECT id, subject_id FROM exams")).all() == [(e1, s1)]
+        terms = dict(conn.execute(text("SELECT id, exam_id FROM exam_terms")).all())
+        assert terms == {kept: e1, rejected: e1, moved: e1}
+        assert duplicate not in terms
+        assert conn.scalar(text("SELECT COUNT(*) FROM demo_users")) == 1
+        assert conn.scalar(text("SELECT COUNT(*) FROM exam_term_tombstones")) == 0
+    engine.dispose()
+
+
+def _schema(engine) -> dict:
+    """Kolumny i indeksy (nazwa, kolumny, unikalność) wszystkich tabel"""
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(c["name"] for c in inspector.get_columns(table)),
+            sorted((i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+    }
+
+
+def test_migrated_schema_matches_models(backend, backend_name, tmp_path):
+    from app import models
+    from app.migrations import run_migrations
+
+    migrated = create_engine(create_database(backend_name, tmp_path, "migrated"))
+    _schema_v1(migrated)
+    run_migrations(migrated)
+    fresh = create_engine(create_database(backend_name, tmp_path, "fresh"))
+    models.Base.metadata.create_all(bind=fresh)
+    run_migrations(fresh)
+    try:
+        assert _schema(migrated) == _schema(fresh)
+    finally:
+        migrated.dispose()
+        fresh.dispose()
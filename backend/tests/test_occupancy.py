@@ -0,0 +1,61 @@
+"""
+Indeks zajętości sal i roczników w pamięci (app.occupancy): odpowiedzi walidacji
+i sprawdzenie zgodności z bazą (/api/admin/occupancy-check).
+"""
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+
+
+def _room_free(client, term: dict, **params) -> bool:
+    query = {"data": term["data"], "godzina": term["godzina"], "sala": term["sala"], **params}
+    response = client.get("/api/exam-terms/validation/check-room", params=query)
+    assert response.status_code == 200, response.text
+    return response.json()["valid"]
+
+
+def _cohort_free(client, term: dict, **params) -> bool:
+    subject = term["exam"]["subject"]
+    query = {
+        "data": term["data"], "kierunek": subject["kierunek"],
+        "typ_studiow": subject["typ_studiow"], "rok": subject["rok"], **params,
+    }
+    response = client.get("/api/exam-terms/validation/check-students", params=query)
+    assert response.status_code == 200, response.text
+    return response.json()["valid"]
+
+
+def test_room_and_cohort_checks_follow_term_status(client, factory):
+    term = factory.term()
+    assert not _room_free(client, term)
+    assert not _cohort_free(client, term)
+    # Termin nie koliduje sam ze sobą (edycja)
+    assert _room_free(client, term, exclude_term_id=term["id"])
+    assert _cohort_free(client, term, exclude_term_id=term["id"])
+    assert _room_free(client, term, godzina="12:00")
+    assert _cohort_free(client, term, data="2026-02-04")
+
+    response = client.put(f"/api/exam-terms/{term['id']}", json={**ADMIN, "status": "rejected"})
+    assert response.status_code == 200, response.text
+    # Odrzucony termin zwalnia salę i rocznik
+    assert _room_free(client, term)
+    assert _cohort_free(client, term)
+
+
+def test_consistency_check_reports_and_rebuilds(client, factory):
+    from app.occupancy import occupancy
+
+    term = factory.term()
+    report = client.get("/api/admin/occupancy-check").json()
+    assert report["consistent"], report
+
+    # Indeks rozjechany z bazą: brakujący termin
+    with occupancy._lock:
+        occupancy._remove(term["id"])
+    report = client.get("/api/admin/occupancy-check").json()
+    assert not report["consistent"]
+    assert report["missing"] == [term["id"]]
+    assert report["extra"] == [] and report["mismatched"] == []
+
+    report = client.get("/api/admin/occupancy-check", params={"rebuild": True}).json()
+    assert report["consistent"], report
+    assert not _room_free(client, term)
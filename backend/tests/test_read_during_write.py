@@ -0,0 +1,19 @@
+"""
+Odczyty listy terminów w trakcie masowych zapisów (benchmarks/read_during_write.py).
+
+Profil produkcyjny SQLite (WAL) nie blokuje czytelników: przy procesie
+zapisującym duże partie odczyty nie mają błędów "database is locked",
+a p99 mieści się w progu benchmarku.
+"""
+import pytest
+
+
+def test_production_profile_reads_are_not_blocked_by_writer(backend, backend_name):
+    if backend_name != "sqlite":
+        pytest.skip("profile SQLITE_PROFILES dotyczą tylko SQLite")
+    from app.database import engine
+    from benchmarks.read_during_write import CHECKED_PROFILE, MAX_READ_P99_MS, regressions, run_profile
+
+    result = run_profile(engine.url.database, CHECKED_PROFILE, seconds=2, readers=2, batch=20000)
+    assert result["writes"] > 0, result
+    assert regressions([result], MAX_READ_P99_MS) == [], result
@@ -0,0 +1,63 @@
+"""
+Cache danych referencyjnych (app.refdata): ETag i 304 dla list sal, przedmiotów
+i użytkowników demo oraz unieważnianie po zapisie i imporcie.
+"""
+import pytest
+
+
+def _get(client, path: str, etag: str = None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(path, params=params, headers=headers)
+
+
+@pytest.mark.parametrize("path", ["/api/rooms", "/api/subjects", "/api/demo-users"])
+def test_lists_answer_304_for_current_etag(client, path):
+    response = _get(client, path)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    cached = _get(client, path, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert _get(client, path, f'"inny", {etag}').status_code == 304
+    assert _get(client, path, '"inny"').status_code == 200
+
+
+def test_room_write_and_import_invalidate_rooms(client, factory):
+    etag = _get(client, "/api/rooms").headers["ETag"]
+    subjects_etag = _get(client, "/api/subjects").headers["ETag"]
+
+    room = factory.room()
+    response = _get(client, "/api/rooms", etag)
+    assert response.status_code == 200
+    assert room["nazwa"] in [r["nazwa"] for r in response.json()]
+    etag = response.headers["ETag"]
+    # Zapis sali nie unieważnia innych zbiorów
+    assert _get(client, "/api/subjects", subjects_etag).status_code == 304
+
+    imported = client.post(
+        "/api/import/rooms", files={"file": ("sale.csv", b"nazwa,budynek,pojemnosc,typ\nRefdata-1,B1,40,\n")}
+    )
+    assert imported.status_code == 200, imported.text
+    response = _get(client, "/api/rooms", etag)
+    assert response.status_code == 200
+    assert "Refdata-1" in [r["nazwa"] for r in response.json()]
+
+
+def test_filtered_subjects_have_own_etag(client, factory):
+    exam = factory.exam()
+    kierunek = exam["subject"]["kierunek"]
+    everything = _get(client, "/api/subjects")
+    filtered = _get(client, "/api/subjects", kierunek=kierunek)
+    assert [s["kierunek"] for s in filtered.json()] == [kierunek]
+    etag = filtered.headers["ETag"]
+    assert etag != everything.headers["ETag"]
+    assert _get(client, "/api/subjects", etag, kierunek=kierunek).status_code == 304
+
+    response = client.post("/api/subjects", json={**exam["subject"], "nazwa": "Nowy przedmiot"})
+    assert response.status_code == 200, response.text
+    response = _get(client, "/api/subjects", etag, kierunek=kierunek)
+    assert response.status_code == 200
+    assert sorted(s["nazwa"] for s in response.json()) == sorted([exam["subject"]["nazwa"], "Nowy przedmiot"])
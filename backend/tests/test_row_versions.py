@@ -0,0 +1,77 @@
+"""
+Wersje wierszy terminów: znaczniki czasu zapisu i synchronizacja przyrostowa
+(since=) ze zmienionymi terminami, tombstone'ami usuniętych i stronami kursora.
+"""
+from tests.conftest import delete_term_elsewhere
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+
+
+def _changes(client, since, **params):
+    response = client.get("/api/exam-terms/", params={"since": since, **params})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_new_term_has_equal_created_and_updated_at(client, factory):
+    term = factory.term()
+    assert term["created_at"] == term["updated_at"]
+
+    response = client.put(f"/api/exam-terms/{term['id']}", json={
+        "approved_by_role": "admin", "approved_by_name": "Administrator testów", "status": "approved",
+    })
+    updated = response.json()
+    assert updated["created_at"] == term["created_at"]
+    assert updated["updated_at"] > updated["created_at"]
+
+
+def test_remove_duplicates_without_duplicates_keeps_version(client, factory):
+    factory.term()
+    client.delete("/api/admin/remove-duplicates")
+    version = client.get("/api/exam-terms/", params={"since": 0}).headers["X-Row-Version"]
+
+    response = client.delete("/api/admin/remove-duplicates")
+    assert response.status_code == 200, response.text
+    assert sum(response.json()["details"].values()) == 0
+    assert client.get("/api/exam-terms/", params={"since": 0}).headers["X-Row-Version"] == version
+
+
+def test_since_returns_changed_and_deleted_terms(client, factory):
+    start = int(_changes(client, 0).headers["X-Row-Version"])
+    first, second, third = factory.term(), factory.term(), factory.term()
+    response = client.put(f"/api/exam-terms/{first['id']}", json={**ADMIN, "status": "approved"})
+    assert response.status_code == 200, response.text
+    delete_term_elsewhere(second["id"])
+
+    response = _changes(client, start)
+    changes = response.json()
+    assert changes["version"] == int(response.headers["X-Row-Version"]) == start + 5
+    # Po (row_version, id): zatwierdzenie przesuwa pierwszy termin na koniec
+    assert [t["id"] for t in changes["changed"]] == [third["id"], first["id"]]
+    assert changes["changed"][1]["status"] == "approved"
+    assert changes["deleted"] == [second["id"]]
+
+    unchanged = _changes(client, changes["version"]).json()
+    assert unchanged == {"version": changes["version"], "changed": [], "deleted": []}
+
+
+def test_since_pages_by_cursor(client, factory):
+    start = int(_changes(client, 0).headers["X-Row-Version"])
+    terms = [factory.term() for _ in range(3)]
+    delete_term_elsewhere(terms[0]["id"])
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = _changes(client, start, **params)
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert [[t["id"] for t in page["changed"]] for page in pages] == [[t["id"]] for t in terms[1:]] + [[]]
+    # Usunięte terminy tylko na pierwszej stronie
+    assert [page["deleted"] for page in pages] == [[terms[0]["id"]], [], []]
+    assert len({page["version"] for page in pages}) == 1
+
+    response = client.get("/api/exam-terms/", params={"since": start, "fields": "id"})
+    assert response.status_code == 400
@@ -0,0 +1,148 @@
+"""
+Szybka serializacja list (app.serialization) daje te same bajty co ścieżka
+response_model: obiekty ORM -> walidacja List[schemas.*Response] -> JSONResponse.
+
+Porównywane są zapytania (cała lista, filtry, strona kursora) z orjson i ze
+stdlib json oraz odpowiedzi endpointów list terminów i egzaminów, także
+kolejne strony kursora. Rozjazd schematu i szybkiej ścieżki wychodzi tutaj.
+"""
+from typing import List
+
+import pytest
+
+from tests.conftest import TERM_DAY
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+QUERY_CASES = [
+    "terms_all", "terms_approved", "terms_cohort", "terms_page",
+    "exams_all", "exams_cohort", "exams_page",
+]
+
+
+def _reference(schema, objects) -> bytes:
+    """JSON ścieżki response_model: walidacja obiektów ORM i JSONResponse"""
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return JSONResponse(content=content).body
+
+
+def _fast(rows, to_dicts) -> bytes:
+    from app import serialization
+    return b"".join(serialization.json_array_chunks(to_dicts(rows), chunk_rows=2))
+
+
+@pytest.fixture
+def dataset(client, factory):
+    """Egzamin z trzema terminami (zatwierdzony, odrzucony, proponowany) w różnych dniach"""
+    exam = factory.exam()
+    terms = [
+        factory.term(exam_id=exam["id"], data=day, godzina=hour)
+        for day, hour in (("2026-02-04", "08:00"), (TERM_DAY, "12:30"), ("2026-02-05", "10:00"))
+    ]
+    for term, status in zip(terms, ("approved", "rejected")):
+        response = client.put(f"/api/exam-terms/{term['id']}", json={**ADMIN, "status": status})
+        assert response.status_code == 200, response.text
+    return exam, terms
+
+
+def _query_case(name: str, exam: dict, term: dict):
+    from app import crud, models, schemas, serialization
+
+    subject = exam["subject"]
+    cohort = {
+        "kierunek": subject["kierunek"],
+        "typ_studiow": models.TypStudiow(subject["typ_studiow"]),
+        "rok": subject["rok"],
+    }
+    kwargs = {
+        "terms_all": {},
+        "terms_approved": {"status": models.TermStatus.APPROVED},
+        "terms_cohort": cohort,
+        "terms_page": {"after": [term["data"], term["godzina"], term["id"]], "limit": 2},
+        "exams_all": {},
+        "exams_cohort": {"kierunek": subject["kierunek"], "rok": subject["rok"]},
+        "exams_page": {"after": [exam["id"] - 1], "limit": 2},
+    }[name]
+    if name.startswith("terms"):
+        return (
+            crud.exam_terms_query(**kwargs), crud.exam_term_rows_query(**kwargs),
+            schemas.ExamTermResponse, serialization.exam_term_dicts,
+        )
+    return (
+        crud.exams_query(**kwargs), crud.exam_rows_query(**kwargs),
+        schemas.ExamResponse, serialization.exam_dicts,
+    )
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+@pytest.mark.parametrize("name", QUERY_CASES)
+def test_fast_path_matches_response_model(backend, dataset, monkeypatch, name, encoder):
+    from app import serialization
+    from app.database import SessionLocal
+
+    if encoder == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson nie jest zainstalowany")
+    if encoder == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+
+    exam, terms = dataset
+    orm_query, rows_query, schema, to_dicts = _query_case(name, exam, terms[0])
+    with SessionLocal() as db:
+        expected = _reference(schema, db.scalars(orm_query).all())
+        rows = db.execute(rows_query).all()
+    assert rows
+    assert _fast(rows, to_dicts) == expected
+
+
+def _endpoint_pages(client, path: str, params: dict) -> List[tuple]:
+    """Kolejne strony endpointu: (parametry żądania, odpowiedź)"""
+    from app.pagination import NEXT_CURSOR_HEADER
+
+    pages = []
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        pages.append((dict(params), response))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if "limit" not in params or cursor is None or len(pages) == 3:
+            return pages
+        params = {**params, "cursor": cursor}
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/exam-terms/", {}),
+    ("/api/exam-terms/", {"status": "approved"}),
+    ("/api/exam-terms/", {"cohort": True}),
+    ("/api/exam-terms/", {"limit": 2}),
+    ("/api/exams/", {}),
+    ("/api/exams/", {"cohort": True}),
+    ("/api/exams/", {"limit": 2}),
+], ids=["terms", "terms-status", "terms-cohort", "terms-pages", "exams", "exams-cohort", "exams-pages"])
+def test_endpoints_match_response_model(client, dataset, path, params):
+    from app import crud, models, pagination, schemas
+    from app.database import SessionLocal
+
+    exam, _ = dataset
+    if params.pop("cohort", False):
+        subject = exam["subject"]
+        params = {"kierunek": subject["kierunek"], "typ_studiow": subject["typ_studiow"], "rok": subject["rok"]}
+    terms = path == "/api/exam-terms/"
+    query, schema, key_size = (
+        (crud.exam_terms_query, schemas.ExamTermResponse, len(crud.EXAM_TERM_KEYS)) if terms
+        else (crud.exams_query, schemas.ExamResponse, 1)
+    )
+
+    for request, response in _endpoint_pages(client, path, params):
+        kwargs = {k: v for k, v in request.items() if k not in ("cursor", "status", "typ_studiow")}
+        if "typ_studiow" in request:
+            kwargs["typ_studiow"] = models.TypStudiow(request["typ_studiow"])
+        if "status" in request:
+            kwargs["status"] = models.TermStatus(request["status"])
+        if "cursor" in request:
+            kwargs["after"] = pagination.decode_cursor(request["cursor"], key_size)
+        with SessionLocal() as db:
+            expected = _reference(schema, db.scalars(query(**kwargs)).all())
+        assert response.content == expected, request
@@ -0,0 +1,72 @@
+"""
+Okresy sesji z bazy (app.sessions): sprawdzanie daty w scalonych przedziałach,
+unieważnienie cache po dodaniu okresu, wybór bieżącej sesji i walidacja
+propozycji terminów spoza sesji.
+"""
+from tests.conftest import TERM_DAY
+
+
+def _in_session(client, data: str) -> dict:
+    response = client.get("/api/exam-terms/validation/check-session-date", params={"data": data})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _add_period(client, semestr: str, data_start: str, data_end: str) -> None:
+    response = client.post("/api/session-periods", json={
+        "semestr": semestr, "rok_akademicki": "2018/2019", "data_start": data_start, "data_end": data_end,
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_session_date_check(client):
+    assert _in_session(client, TERM_DAY) == {"valid": True, "message": None}
+    outside = _in_session(client, "2099-01-01")
+    assert not outside["valid"]
+    assert outside["message"].startswith("Data musi być w terminie sesji:")
+
+
+def test_new_periods_invalidate_calendar(client):
+    # Okresy dawno zakończone - nie zmieniają bieżącej sesji innych testów
+    assert not _in_session(client, "2019-06-15")["valid"]
+    _add_period(client, "letni", "2019-06-10", "2019-06-20")
+    assert _in_session(client, "2019-06-15")["valid"]
+
+    # Nachodzące okresy są scalane w jeden przedział
+    _add_period(client, "letni_poprawkowa", "2019-06-18", "2019-06-30")
+    for data, valid in [
+        ("2019-06-09", False), ("2019-06-10", True), ("2019-06-20", True),
+        ("2019-06-25", True), ("2019-06-30", True), ("2019-07-01", False),
+    ]:
+        assert _in_session(client, data)["valid"] is valid, data
+
+
+def test_pick_current_period():
+    from app import models
+    from app.sessions import _pick
+
+    def period(start: str, end: str) -> models.SessionPeriod:
+        return models.SessionPeriod(semestr="zimowy", rok_akademicki="2025/2026", data_start=start, data_end=end)
+
+    past, ongoing, upcoming, later = (
+        period("2025-01-20", "2025-02-15"), period("2026-01-20", "2026-02-15"),
+        period("2026-06-15", "2026-07-10"), period("2027-01-20", "2027-02-15"),
+    )
+    assert _pick([past, ongoing, upcoming], "2026-02-01") is ongoing
+    assert _pick([past, later, upcoming], "2026-03-01") is upcoming
+    assert _pick([past, ongoing], "2026-03-01") is ongoing
+    assert _pick([], "2026-03-01") is None
+
+
+def test_proposal_outside_session_is_rejected_for_non_admin(client, factory):
+    exam = factory.exam()
+    payload = {
+        "exam_id": exam["id"], "godzina": "08:00", "sala": "Sesja-1",
+        "proposed_by_role": "prowadzacy", "proposed_by_name": "Dr Sesja",
+    }
+    response = client.post("/api/exam-terms/", json={**payload, "data": "2099-01-01"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Termin egzaminu musi być w okresie sesji")
+
+    response = client.post("/api/exam-terms/", json={**payload, "data": TERM_DAY})
+    assert response.status_code == 200, response.text
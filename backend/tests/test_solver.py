@@ -0,0 +1,78 @@
+"""
+Automatyczne układanie sesji (/api/exam-terms/solve): dry run niczego nie
+zapisuje, commit=true zapisuje przydział jako propozycje w jednej transakcji.
+"""
+
+# Tylko sala utworzona w teście mieści tylu studentów
+LICZBA_OSOB = 6000
+
+
+def _cohort_exams(client, count: int) -> list:
+    """Egzaminy jednego rocznika (osobne przedmioty)"""
+    exams = []
+    for n in range(count):
+        subject = client.post("/api/subjects", json={
+            "nazwa": f"Przedmiot solvera {n}", "kierunek": "Kierunek solvera",
+            "typ_studiow": "niestacjonarne_I", "rok": 4,
+        })
+        assert subject.status_code == 200, subject.text
+        exam = client.post("/api/exams/", json={
+            "subject_id": subject.json()["id"], "prowadzacy_name": "Dr Solver",
+        })
+        assert exam.status_code == 200, exam.text
+        exams.append(exam.json())
+    return exams
+
+
+def _solve(client, **request) -> dict:
+    response = client.post("/api/exam-terms/solve", json={
+        "liczba_osob": LICZBA_OSOB, "godziny": ["08:00", "12:00"], **request,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_solver_dry_run_and_commit(client, factory):
+    room = factory.room(pojemnosc=LICZBA_OSOB + 10)
+    exams = _cohort_exams(client, 2)
+    too_big = factory.exam()
+    exam_ids = [e["id"] for e in exams] + [too_big["id"]]
+    request = {"exam_ids": exam_ids, "liczba_osob_per_exam": {str(too_big["id"]): 10 ** 6}}
+
+    dry = _solve(client, **request)
+    assert dry["committed"] is False and dry["term_ids"] == []
+    assignments = dry["assignments"]
+    assert sorted(a["exam_id"] for a in assignments) == sorted(e["id"] for e in exams)
+    assert {a["sala"] for a in assignments} == {room["nazwa"]}
+    # Jeden egzamin rocznika dziennie
+    assert len({a["data"] for a in assignments}) == len(assignments)
+    assert [u["exam_id"] for u in dry["unassigned"]] == [too_big["id"]]
+    assert "pojemności" in dry["unassigned"][0]["reason"]
+    # Dry run nie zapisał terminów
+    assert _solve(client, **request)["assignments"] == assignments
+
+    committed = _solve(client, **request, commit=True)
+    assert committed["committed"] is True
+    assert committed["assignments"] == assignments
+    assert len(committed["term_ids"]) == len(assignments)
+
+    terms = {
+        term["exam_id"]: term for term in (
+            client.get(f"/api/exam-terms/{term_id}").json() for term_id in committed["term_ids"]
+        )
+    }
+    for a in assignments:
+        term = terms[a["exam_id"]]
+        assert (term["data"], term["godzina"], term["sala"]) == (a["data"], a["godzina"], a["sala"])
+        assert term["status"] == "proposed"
+        assert term["proposed_by_name"] == "Automatyczny planista"
+
+    # Zaplanowane egzaminy nie są już układane ponownie
+    again = _solve(client, **request)
+    assert again["assignments"] == []
+    assert [u["exam_id"] for u in again["unassigned"]] == [too_big["id"]]
+
+
+def test_solver_rejects_unknown_session(client):
+    response = client.post("/api/exam-terms/solve", json={"sesja": "letnia"})
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+"""
+Wyszukiwanie wolnych terminów (/api/exam-terms/suggestions): pominięte dni
+zajęte przez rocznik, ranking po odstępie od innych egzaminów rocznika
+i najmniejszej wystarczającej sali, jedna propozycja na dzień w pierwszej kolejności.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+# Tylko sale utworzone w teście mieszczą tylu studentów
+LICZBA_OSOB = 5000
+
+
+def _session_days(client) -> list:
+    period = client.get("/api/session-periods/current").json()["zasadnicza"]
+    if period is None:
+        pytest.skip("Brak sesji zasadniczej")
+    start, end = date.fromisoformat(period["data_start"]), date.fromisoformat(period["data_end"])
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def test_suggestions_ranking(client, factory):
+    days = _session_days(client)[:7]
+    if len(days) < 7:
+        pytest.skip("Sesja zasadnicza krótsza niż 7 dni")
+    small, big = factory.room(pojemnosc=LICZBA_OSOB + 10), factory.room(pojemnosc=LICZBA_OSOB + 50)
+    exam = factory.exam()
+    # Rocznik ma egzamin czwartego dnia, mała sala jest zajęta pierwszego dnia o 08:00
+    factory.term(exam_id=exam["id"], data=days[3], godzina="12:00")
+    factory.term(data=days[0], godzina="08:00", sala=small["nazwa"])
+
+    response = client.get("/api/exam-terms/suggestions", params={
+        "exam_id": exam["id"], "liczba_osob": LICZBA_OSOB, "limit": 100,
+        "godziny": "08:00,10:00",
+    })
+    assert response.status_code == 200, response.text
+    suggestions = [
+        s for s in response.json()["suggestions"] if s["sesja"] == "zasadnicza" and s["data"] in days
+    ]
+
+    assert days[3] not in {s["data"] for s in suggestions}
+    assert {s["sala"] for s in suggestions} <= {small["nazwa"], big["nazwa"]}
+    # Najpierw po jednej propozycji na dzień: największy odstęp od egzaminu rocznika,
+    # przy równym odstępie mniejsza sala, potem wcześniejsza data
+    first = [(s["data"], s["godzina"], s["sala"], s["spread_days"]) for s in suggestions[:6]]
+    assert first == [
+        (days[6], "08:00", small["nazwa"], 3),
+        (days[0], "08:00", big["nazwa"], 3),
+        (days[1], "08:00", small["nazwa"], 2),
+        (days[5], "08:00", small["nazwa"], 2),
+        (days[2], "08:00", small["nazwa"], 1),
+        (days[4], "08:00", small["nazwa"], 1),
+    ]
+    assert [(s["data"], s["godzina"]) for s in suggestions[6:8]] == [(days[0], "10:00"), (days[6], "10:00")]
+
+
+def test_suggestions_reject_invalid_hours(client, factory):
+    exam = factory.exam()
+    response = client.get("/api/exam-terms/suggestions", params={
+        "exam_id": exam["id"], "liczba_osob": 1, "godziny": "08:00,25:99",
+    })
+    assert response.status_code == 400
+    assert "25:99" in response.json()["detail"]
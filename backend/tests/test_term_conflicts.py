@@ -0,0 +1,55 @@
+"""
+Przywracanie odrzuconych terminów (PUT i zatwierdzanie zbiorcze) sprawdza
+kolizje w bazie - nachodzący przedział w tej samej sali blokuje przywrócenie,
+także gdy walidacja w pamięci go nie widzi.
+"""
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+
+
+def _reject(client, term_id: int) -> None:
+    response = client.put(f"/api/exam-terms/{term_id}", json={**ADMIN, "status": "rejected"})
+    assert response.status_code == 200, response.text
+
+
+def _overlapping_pair(factory, client):
+    """Odrzucony termin 10:00 (90 min) i nowy termin 10:30 w tej samej sali"""
+    first = factory.term(godzina="10:00", czas_trwania=90)
+    _reject(client, first["id"])
+    second = factory.term(godzina="10:30", sala=first["sala"])
+    return first, second
+
+
+def test_put_reopen_rejects_overlapping_interval(client, factory):
+    first, _ = _overlapping_pair(factory, client)
+    response = client.put(f"/api/exam-terms/{first['id']}", json={**ADMIN, "status": "approved"})
+    assert response.status_code == 400
+    assert first["sala"] in response.json()["detail"]
+
+
+def test_bulk_reopen_is_rechecked_in_database(client, factory, monkeypatch):
+    from app import crud
+
+    first, second = _overlapping_pair(factory, client)
+    # Walidacja w pamięci nie widzi sal - kolizję musi znaleźć sprawdzenie w bazie
+    monkeypatch.setattr(crud, "_take_room", lambda rooms, row: None)
+    response = client.put("/api/exam-terms/bulk", json={
+        **ADMIN, "decisions": [{"term_id": first["id"], "status": "approved"}],
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["approved"] == 0 and body["failed"] == 1
+    assert first["sala"] in body["results"][0]["message"]
+    assert client.get(f"/api/exam-terms/{first['id']}").json()["status"] == "rejected"
+    assert client.get(f"/api/exam-terms/{second['id']}").json()["status"] == "proposed"
+
+
+def test_bulk_without_changes_keeps_version(client, factory):
+    term = factory.term()
+    _reject(client, term["id"])
+    version = client.get("/api/exam-terms/", params={"since": 0}).headers["X-Row-Version"]
+    response = client.put("/api/exam-terms/bulk", json={
+        **ADMIN, "decisions": [{"term_id": 10 ** 9, "status": "approved"}],
+    })
+    assert response.json()["failed"] == 1
+    assert client.get("/api/exam-terms/", params={"since": 0}).headers["X-Row-Version"] == version
@@ -0,0 +1,68 @@
+"""
+Harmonogram jako siatka (/api/exam-terms/timetable): osie i komórki, ETag i 304
+oraz cache per filtr przebudowywany dopiero po zmianie wersji terminów.
+"""
+from tests.conftest import TERM_DAY
+
+ADMIN = {"approved_by_role": "admin", "approved_by_name": "Administrator testów"}
+
+
+def _timetable(client, etag: str = None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/api/exam-terms/timetable", params=params, headers=headers)
+
+
+def _cells(grid: dict) -> list:
+    """Komórki z indeksami zamienionymi na wartości osi i słowników"""
+    return [
+        (grid["dates"][date], grid["hours"][hour], grid["rows"][row], grid["exams"][exam]["id"],
+         grid["rooms"][room], term, status)
+        for date, hour, row, exam, room, term, status, _ in grid["cells"]
+    ]
+
+
+def test_timetable_grid_by_rooms_and_cohorts(client, factory):
+    exam = factory.exam()
+    kierunek = exam["subject"]["kierunek"]
+    first = factory.term(exam_id=exam["id"], godzina="08:00")
+    second = factory.term(exam_id=exam["id"], data="2026-02-05", godzina="12:00")
+
+    grid = _timetable(client, kierunek=kierunek).json()
+    assert grid["layout"] == "rooms"
+    assert (grid["dates"], grid["hours"]) == ([TERM_DAY, "2026-02-05"], ["08:00", "12:00"])
+    assert grid["rows"] == grid["rooms"] == sorted([first["sala"], second["sala"]])
+    assert sorted(_cells(grid)) == sorted([
+        (TERM_DAY, "08:00", first["sala"], exam["id"], first["sala"], first["id"], "proposed"),
+        ("2026-02-05", "12:00", second["sala"], exam["id"], second["sala"], second["id"], "proposed"),
+    ])
+
+    grid = _timetable(client, layout="cohorts", kierunek=kierunek).json()
+    cohort = {"kierunek": kierunek, "typ_studiow": exam["subject"]["typ_studiow"], "rok": exam["subject"]["rok"]}
+    assert grid["rows"] == [cohort]
+    assert {cell[2] for cell in grid["cells"]} == {0}
+
+    response = _timetable(client, layout="kalendarz")
+    assert response.status_code == 400
+
+
+def test_timetable_etag_follows_term_version(client, factory, sql_statements):
+    term = factory.term()
+    kierunek = term["exam"]["subject"]["kierunek"]
+    response = _timetable(client, kierunek=kierunek)
+    assert response.status_code == 200, response.text
+    etag, version = response.headers["ETag"], response.json()["version"]
+
+    # Ta sama wersja terminów: gotowy wpis z cache, z bazy tylko odczyt licznika
+    with sql_statements() as statements:
+        assert _timetable(client, etag, kierunek=kierunek).status_code == 304
+        assert _timetable(client, kierunek=kierunek).content == response.content
+    assert statements.count == 2
+
+    response = client.put(f"/api/exam-terms/{term['id']}", json={**ADMIN, "status": "approved"})
+    assert response.status_code == 200, response.text
+    response = _timetable(client, etag, kierunek=kierunek)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    grid = response.json()
+    assert grid["version"] > version
+    assert [cell[6] for cell in grid["cells"]] == ["approved"]
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getExamTerms, approveExamTerm } from '../services/api';
+import { getExamTerms, approveExamTerm, subscribeTermChanges, applyTermChange } from '../services/api';
 
 function ExamList({ currentUser, onRefresh }) {
   const [terms, setTerms] = useState([]);
@@ -10,6 +10,29 @@ function ExamList({ currentUser, onRefresh }) {
     fetchTerms();
   }, [currentUser, filter, onRefresh]);
 
+  // Zmiany z innych kart/uzytkownikow nanoszone sa bez pobierania calej listy
+  useEffect(() => {
+    if (!currentUser) return undefined;
+    return subscribeTermChanges(
+      (type, term) => setTerms(prev => (type === 'deleted'
+        ? prev.filter(t => t.id !== term.id)
+        : applyTermChange(prev, term, matchesFilters))),
+      () => fetchTerms()
+    );
+  }, [currentUser, filter]);
+
+  const matchesFilters = (term) => {
+    if (currentUser.role !== 'admin' && currentUser.role !== 'prowadzacy') {
+      const subject = term.exam.subject;
+      if (subject.kierunek !== currentUser.kierunek ||
+          subject.typ_studiow !== currentUser.typ_studiow ||
+          subject.rok !== currentUser.rok) {
+        return false;
+      }
+    }
+    return filter === 'all' || term.status === filter;
+  };
+
   const fetchTerms = async () => {
     if (!currentUser) return;
     
@@ -39,12 +62,12 @@ function ExamList({ currentUser, onRefresh }) {
 
   const handleApprove = async (termId, status) => {
     try {
-      await approveExamTerm(termId, {
+      const response = await approveExamTerm(termId, {
         approved_by_role: currentUser.role,
         approved_by_name: currentUser.name,
         status: status,
       });
-      fetchTerms(); // Odśwież listę
+      setTerms(prev => applyTermChange(prev, response.data, matchesFilters));
     } catch (error) {
       alert('Błąd zatwierdzania: ' + error.response?.data?.detail);
     }
@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
-import { getExamTerms } from '../services/api';
+import { getTimetable, subscribeTermChanges, timetableTerms } from '../services/api';
+
+const REFRESH_DELAY_MS = 250;
 
 function GanttChart({ currentUser }) {
   const [terms, setTerms] = useState([]);
@@ -8,13 +10,28 @@ function GanttChart({ currentUser }) {
   const [timeSlots, setTimeSlots] = useState([]);
 
   useEffect(() => {
-    fetchTerms();
+    fetchTimetable();
+  }, [currentUser]);
+
+  // Zmiany terminow odswiezaja gotowa siatke - seria zdarzen SSE (np. zatwierdzanie
+  // partiami) to jedno zapytanie po REFRESH_DELAY_MS ciszy, a nie zapytanie na zdarzenie
+  useEffect(() => {
+    if (!currentUser) return undefined;
+    let timer = null;
+    const scheduleRefresh = () => {
+      clearTimeout(timer);
+      timer = setTimeout(fetchTimetable, REFRESH_DELAY_MS);
+    };
+    const unsubscribe = subscribeTermChanges(scheduleRefresh, scheduleRefresh);
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
   }, [currentUser]);
 
-  const fetchTerms = async () => {
+  const fetchTimetable = async () => {
     if (!currentUser) return;
 
-    setLoading(true);
     try {
       const params = {};
 
@@ -25,18 +42,13 @@ function GanttChart({ currentUser }) {
         params.rok = currentUser.rok;
       }
 
-      const response = await getExamTerms(params);
-      const fetchedTerms = response.data;
-      setTerms(fetchedTerms);
-
-      // Generuj unikalne daty i godziny
-      const uniqueDates = [...new Set(fetchedTerms.map(t => t.data))].sort();
-      const uniqueHours = [...new Set(fetchedTerms.map(t => t.godzina))].sort();
-
-      setDates(uniqueDates);
-      setTimeSlots(uniqueHours);
+      // Daty i godziny przychodza z backendu juz posortowane
+      const response = await getTimetable(params);
+      setDates(response.data.dates);
+      setTimeSlots(response.data.hours);
+      setTerms(timetableTerms(response.data));
     } catch (error) {
-      console.error('Błąd pobierania terminów:', error);
+      console.error('Błąd pobierania harmonogramu:', error);
     } finally {
       setLoading(false);
     }
@@ -8,6 +8,7 @@ function ProposeTermForm({ currentUser, onSuccess }) {
     exam_id: '',
     data: '',
     godzina: '',
+    czas_trwania: 90,
     sala: '',
     liczba_osob: 30,
   });
@@ -75,6 +76,7 @@ function ProposeTermForm({ currentUser, onSuccess }) {
         sala: formData.sala,
         data: formData.data,
         godzina: formData.godzina,
+        czas_trwania: parseInt(formData.czas_trwania),
         liczba_osob: parseInt(formData.liczba_osob),
       });
 
@@ -130,12 +132,13 @@ function ProposeTermForm({ currentUser, onSuccess }) {
       await createExamTerm({
         ...formData,
         exam_id: parseInt(formData.exam_id),
+        czas_trwania: parseInt(formData.czas_trwania),
         proposed_by_role: currentUser.role,
         proposed_by_name: currentUser.name,
       });
 
       alert('Propozycja terminu została dodana!');
-      setFormData({ exam_id: '', data: '', godzina: '', sala: '' });
+      setFormData({ exam_id: '', data: '', godzina: '', czas_trwania: 90, sala: '' });
       if (onSuccess) onSuccess();
     } catch (error) {
       setError(error.response?.data?.detail || 'Błąd dodawania propozycji');
@@ -166,7 +169,7 @@ function ProposeTermForm({ currentUser, onSuccess }) {
       }, 500);
       return () => clearTimeout(timer);
     }
-  }, [formData.sala, formData.data, formData.godzina, formData.liczba_osob]);
+  }, [formData.sala, formData.data, formData.godzina, formData.czas_trwania, formData.liczba_osob]);
 
   // Tylko prowadzący i starosta mogą proponować terminy
   if (!currentUser || (currentUser.role !== 'prowadzacy' && currentUser.role !== 'starosta')) {
@@ -248,6 +251,20 @@ function ProposeTermForm({ currentUser, onSuccess }) {
             />
           </div>
 
+          <div style={styles.formGroup}>
+            <label style={styles.label}>Czas trwania (min):</label>
+            <input
+              type="number"
+              name="czas_trwania"
+              value={formData.czas_trwania}
+              onChange={handleChange}
+              min="1"
+              max="1440"
+              style={styles.input}
+              required
+            />
+          </div>
+
           <div style={styles.formGroup}>
             <label style={styles.label}>Liczba osób:</label>
             <input
@@ -10,7 +10,7 @@ const api = axios.create({
 });
 
 // Demo Users
-export const getDemoUsers = () => api.get('/api/demo-users');
+export const getDemoUsers = (params) => api.get('/api/demo-users', { params });
 
 // Subjects
 export const getSubjects = (params) => api.get('/api/subjects', { params });
@@ -22,8 +22,33 @@ export const createExam = (data) => api.post('/api/exams', data);
 
 // Exam Terms
 export const getExamTerms = (params) => api.get('/api/exam-terms', { params });
+// Zmiany od wersji since: { version, changed, deleted }
+export const getExamTermChanges = (since, params) =>
+  api.get('/api/exam-terms', { params: { ...params, since } });
 export const createExamTerm = (data) => api.post('/api/exam-terms', data);
 export const approveExamTerm = (id, data) => api.put(`/api/exam-terms/${id}`, data);
+export const approveExamTerms = (data) => api.put('/api/exam-terms/bulk', data);
+export const suggestFreeSlots = (params) => api.get('/api/exam-terms/suggestions', { params });
+export const solveSession = (data) => api.post('/api/exam-terms/solve', data);
+export const getTimetable = (params) => api.get('/api/exam-terms/timetable', { params });
+
+// Komorki harmonogramu jako terminy { id, data, godzina, sala, status, proposed_by_name, exam }
+export const timetableTerms = (timetable) => timetable.cells.map(([d, h, , e, r, id, status, p]) => {
+  const exam = timetable.exams[e];
+  return {
+    id,
+    data: timetable.dates[d],
+    godzina: timetable.hours[h],
+    sala: timetable.rooms[r],
+    status,
+    proposed_by_name: timetable.people[p],
+    exam: {
+      id: exam.id,
+      prowadzacy_name: exam.prowadzacy_name,
+      subject: { nazwa: exam.nazwa, kierunek: exam.kierunek, typ_studiow: exam.typ_studiow, rok: exam.rok },
+    },
+  };
+});
 
 // Session Periods
 export const getSessionPeriods = () => api.get('/api/session-periods');
@@ -42,9 +67,32 @@ export const checkRoomAvailability = (params) =>
   api.get('/api/exam-terms/validation/check-room', { params });
 export const checkStudentAvailability = (params) =>
   api.get('/api/exam-terms/validation/check-students', { params });
+export const checkSlots = (data) =>
+  api.post('/api/exam-terms/validation/check-slots', data);
+
+// Strumien zmian terminow (SSE). EventSource sam wznawia polaczenie
+// od ostatniego zdarzenia; "deleted" niesie tylko id usunietego terminu,
+// a "reset" oznacza, ze liste trzeba pobrac od nowa.
+export const subscribeTermChanges = (onChange, onReset) => {
+  const source = new EventSource(`${API_URL}/api/exam-terms/changes`);
+  ['created', 'approved', 'rejected', 'updated', 'deleted'].forEach((type) =>
+    source.addEventListener(type, (event) => onChange(type, JSON.parse(event.data)))
+  );
+  source.addEventListener('reset', () => onReset());
+  return () => source.close();
+};
+
+// Wstawia/aktualizuje termin na liscie (lub usuwa, gdy nie pasuje do filtrow)
+export const applyTermChange = (terms, term, matches) => {
+  const rest = terms.filter((t) => t.id !== term.id);
+  if (!matches(term)) return rest;
+  return [...rest, term].sort((a, b) =>
+    a.data.localeCompare(b.data) || a.godzina.localeCompare(b.godzina) || a.id - b.id
+  );
+};
 
 // Rooms
-export const getRooms = () => api.get('/api/rooms');
+export const getRooms = (params) => api.get('/api/rooms', { params });
 export const getRoom = (nazwa) => api.get(`/api/rooms/${nazwa}`);
 export const createRoom = (data) => api.post('/api/rooms', data);
 export const checkRoomCapacityAndAvailability = (data) =>